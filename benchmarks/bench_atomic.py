@@ -0,0 +1,53 @@
+"""Benchmark: many small outputs written in place vs atomically with every fsync policy.
+
+Run from the project folder:
+    python -m benchmarks.bench_atomic --files 500
+"""
+
+import os
+import argparse
+import tempfile
+
+from ui.converters import FileConverter
+from ui.constants import FSYNC_POLICIES
+
+from benchmarks.helpers import best_time, print_table
+
+
+def write_all(converter, csv_path, outs):
+    """Convert csv to every output, 'batch' outputs are flushed at the end like in BatchRunner"""
+    for out in outs:
+        converter.convert(csv_path, out, inp_ext='.csv')
+    converter.output_sync.flush()
+
+
+def main():
+    """Run benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, 'data.csv')
+        with open(csv_path, 'w', encoding='utf-8') as file:
+            file.write('id,name\n' + ''.join(f'{i},name {i}\n' for i in range(200)))
+        outs = [os.path.join(tmp_dir, 'out', f'{index}.json') for index in range(args.files)]
+        os.makedirs(os.path.join(tmp_dir, 'out'))
+
+        # Writer called with the final path, as before atomic outputs
+        converter = FileConverter()
+        rows = [("in place, no fsync",
+                 best_time(lambda: [converter.write_csv_json(csv_path, out) for out in outs],
+                           args.repeat), "truncated files on crash")]
+
+        for policy in FSYNC_POLICIES:
+            converter = FileConverter(fsync=policy)
+            seconds = best_time(lambda c=converter: write_all(c, csv_path, outs), args.repeat)
+            rows.append((f"atomic, fsync {policy}", seconds,
+                         f"{args.files / seconds:8.0f} files/s"))
+        print_table(f"{args.files} csv -> json outputs", rows)
+
+
+if __name__ == '__main__':
+    main()
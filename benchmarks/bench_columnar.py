@@ -0,0 +1,37 @@
+"""Benchmark: csv.DictReader vs pyarrow columnar csv -> json/txt convertation.
+
+Run from the project folder:
+    python -m benchmarks.bench_columnar --size-mb 200
+"""
+
+import os
+import argparse
+import tempfile
+
+from ui.columnar import columnar_available, write_csv_columnar
+
+from benchmarks.helpers import print_table, csv_engine_rows
+from benchmarks.bench_io import make_csv
+
+
+def main():
+    """Run benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size-mb', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    if not columnar_available():
+        print("pyarrow is not installed")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, 'data.csv')
+        make_csv(csv_path, args.size_mb)
+
+        rows = csv_engine_rows("pyarrow", write_csv_columnar, csv_path, args.repeat)
+        print_table(f"CSV engines, {args.size_mb} MB", rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Benchmark: compressed csv -> json output with one and many compression threads.
+
+Run from the project folder:
+    python -m benchmarks.bench_compression --size-mb 100 --threads 8
+"""
+
+import os
+import argparse
+import tempfile
+
+from ui.compression import open_binary, zstd_available
+from ui.converters import FileConverter
+
+from benchmarks.helpers import best_time, print_table
+from benchmarks.bench_io import make_csv
+
+
+def main():
+    """Run benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size-mb', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--threads', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    codecs = ('.gz', '.bz2', '.xz') + (('.zst',) if zstd_available() else ())
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, 'data.csv')
+        make_csv(csv_path, args.size_mb)
+        FileConverter().convert(csv_path, os.path.join(tmp_dir, 'plain.json'))
+        with open(os.path.join(tmp_dir, 'plain.json'), 'rb') as file:
+            expected = file.read()
+
+        rows = []
+        for codec in codecs:
+            out = os.path.join(tmp_dir, f'data.json{codec}')
+            for threads in sorted({1, args.threads}):
+                converter = FileConverter(compress_threads=threads)
+                seconds = best_time(lambda c=converter, o=out: c.convert(csv_path, o), args.repeat)
+                with open_binary(out) as file:
+                    same = file.read() == expected
+                rows.append((f"csv -> json{codec} {threads} threads", seconds,
+                             f"ratio {os.path.getsize(out) / len(expected):6.3f}  identical: {same}"))
+        print_table(f"Compressed output, {args.size_mb} MB csv", rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Benchmark: image encode time vs output size for every format, effort level, profile
+and target size.
+
+Run from the project folder:
+    python -m benchmarks.bench_images --size 2048 --image photo.jpg
+"""
+
+import io
+import argparse
+
+from PIL import Image, ImageDraw, ImageFilter
+
+from ui.converters import FileConverter
+from ui.constants import IMAGE_EFFORT_OPTIONS, IMAGE_PROFILES, IMAGE_TARGET_SIZE_FORMATS
+from ui.imaging import encoder_available, encode_to_size
+
+from benchmarks.helpers import best_time, print_table
+
+
+def make_image(size):
+    """Photo-like image: gradients, shapes and noise"""
+    img = Image.radial_gradient('L').resize((size, size)).convert('RGB')
+    draw = ImageDraw.Draw(img)
+    for i in range(0, size, max(size // 16, 1)):
+        draw.ellipse((i, i // 2, i + size // 4, i // 2 + size // 5),
+                     fill=(i * 7 % 256, i * 3 % 256, 255 - i % 256))
+    noise = Image.effect_noise((size, size), 40).convert('RGB')
+    return Image.blend(img, noise, 0.15).filter(ImageFilter.SMOOTH)
+
+
+def encode_row(name, img, real_format, options, repeat):
+    """Table row with encode time and output size"""
+    buffer = io.BytesIO()
+
+    def encode():
+        buffer.seek(0)
+        buffer.truncate()
+        img.save(buffer, format=real_format, **options)
+
+    seconds = best_time(encode, repeat)
+    size = buffer.tell()
+    return (name, seconds, f"{size / 1024:9.1f} KB  {size * 8 / (img.width * img.height):6.3f} bpp")
+
+
+def encode_rows(img, real_format, efforts, repeat):
+    """Table rows of one format, one row per effort value"""
+    rows = []
+    for effort in efforts:
+        image_effort = {real_format: effort} if effort is not None else None
+        options = FileConverter(image_effort=image_effort).image_save_options(real_format)
+        knob = f" {IMAGE_EFFORT_OPTIONS[real_format][0]}={effort}" if effort is not None else ""
+        rows.append(encode_row(f"{real_format}{knob}", img, real_format, options, repeat))
+    return rows
+
+
+def profile_rows(img, real_format, repeat):
+    """Table rows of one format, one row per profile"""
+    return [encode_row(f"{real_format} {profile}", img, real_format,
+                       FileConverter(image_profile=profile).image_save_options(real_format), repeat)
+            for profile in IMAGE_PROFILES]
+
+
+def target_rows(img, real_format, max_kb, repeat):
+    """Table row of the quality search for max_kb"""
+    options = FileConverter().image_save_options(real_format)
+    result = {}
+
+    def search():
+        result['data'], result['quality'] = encode_to_size(img, real_format, max_kb * 1024, options)
+
+    seconds = best_time(search, repeat)
+    return [(f"{real_format} <= {max_kb} KB", seconds,
+             f"{len(result['data']) / 1024:9.1f} KB  quality {result['quality']}")]
+
+
+def main():
+    """Run benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', type=int, default=1024)
+    parser.add_argument('--image', help="Image file instead of the generated one")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-kb', type=int, default=200)
+    args = parser.parse_args()
+
+    if args.image:
+        with Image.open(args.image) as source:
+            img = source.convert('RGB')
+    else:
+        img = make_image(args.size)
+
+    rows, profiles, targets = [], [], []
+    for real_format in ('JPEG', 'PNG', 'WEBP', 'AVIF', 'JXL'):
+        if not encoder_available(real_format):
+            rows.append((f"{real_format} (not installed)", 0.0, ""))
+            continue
+        option = IMAGE_EFFORT_OPTIONS.get(real_format)
+        efforts = range(option[1], option[2] + 1) if option else [None]
+        rows.extend(encode_rows(img, real_format, efforts, args.repeat))
+        profiles.extend(profile_rows(img, real_format, args.repeat))
+        if real_format in IMAGE_TARGET_SIZE_FORMATS:
+            targets.extend(target_rows(img, real_format, args.max_kb, args.repeat))
+    print_table(f"Image encode, {img.width}x{img.height}", rows)
+    print_table("Image profiles", profiles)
+    print_table(f"Target size {args.max_kb} KB", targets)
+
+
+if __name__ == '__main__':
+    main()
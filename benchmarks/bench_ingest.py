@@ -0,0 +1,87 @@
+"""Benchmark: dropping many files, serial header scan vs background scanner.
+The longest pause of the GUI thread is measured by a 10 ms timer.
+
+Run from the project folder:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_ingest --files 10000
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+from PIL import Image
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QApplication, QListView
+
+from ui.ingest import expand_paths, scan_file, IngestScanner, IngestModel
+from ui.sniffing import FormatSniffer
+
+from benchmarks.helpers import best_time, print_table
+
+
+def make_files(folder, count):
+    """Small images and csv files in a few subfolders"""
+    image = Image.new('RGB', (64, 48))
+    for index in range(count):
+        sub = os.path.join(folder, f'dir{index % 10}')
+        os.makedirs(sub, exist_ok=True)
+        if index % 2:
+            image.save(os.path.join(sub, f'{index}.png'))
+        else:
+            with open(os.path.join(sub, f'{index}.csv'), 'w', encoding='utf-8') as file:
+                file.write('a,b\n1,2\n')
+
+
+def run_scanner(app, folder):
+    """Seconds until all files are listed, longest GUI pause and inserts of the list"""
+    model = IngestModel()
+    view = QListView()
+    view.setUniformItemSizes(True)
+    view.setModel(model)
+    view.show()
+    inserts = []
+    model.rowsInserted.connect(lambda *args: inserts.append(args))
+    scanner = IngestScanner()
+    scanner.scanned.connect(model.add_batch)
+
+    ticks = []
+    timer = QTimer()
+    timer.setInterval(10)
+    timer.timeout.connect(lambda: ticks.append(time.perf_counter()))
+    timer.start()
+
+    start = time.perf_counter()
+    scanner.enqueue([folder])
+    while scanner.is_scanning():
+        app.processEvents()
+        time.sleep(0.001)
+    took = time.perf_counter() - start
+    timer.stop()
+    view.close()
+    pause = max((b - a for a, b in zip(ticks, ticks[1:])), default=took)
+    return took, pause, len(inserts), model.rowCount()
+
+
+def main():
+    """Run benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', type=int, default=10000)
+    args = parser.parse_args()
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        make_files(tmp_dir, args.files)
+        sniffer = FormatSniffer(cache_size=1)
+        serial = best_time(lambda: [scan_file(path, sniffer) for path in expand_paths([tmp_dir])], 1)
+        took, pause, inserts, rows = run_scanner(app, tmp_dir)
+
+    print_table(f"Drop of {args.files} files", [
+        ("serial scan in GUI thread", serial, f"GUI blocked {serial:.3f} s"),
+        ("background scanner", took, f"{rows} rows, {inserts} inserts, longest GUI pause {pause:.3f} s"),
+    ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Benchmark: buffered vs memory mapped reading of CSV/JSON inputs.
+
+Run from the project folder:
+    python -m benchmarks.bench_io --size-mb 200
+"""
+
+import os
+import csv
+import json
+import argparse
+import tempfile
+
+from ui.fileio import MappedInput
+
+from benchmarks.helpers import best_time, print_table
+
+
+def make_csv(path, size_mb):
+    """Write CSV file of about size_mb megabytes"""
+    row = "12345,some text value,\"quoted, value\",3.14159,2025-01-01\n"
+    rows = max(1, size_mb * 1024 * 1024 // len(row))
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        file.write("id,text,quoted,number,date\n")
+        file.write(row * rows)
+
+
+def make_json(csv_path, json_path):
+    """Convert generated CSV to JSON list of objects"""
+    with open(csv_path, newline='', encoding='utf-8') as file:
+        data = list(csv.DictReader(file))
+    with open(json_path, 'w', encoding='utf-8') as file:
+        json.dump(data, file)
+
+
+def csv_buffered(path):
+    """Parse CSV through Python file buffering"""
+    with open(path, newline='', encoding='utf-8') as file:
+        for _ in csv.reader(file):
+            pass
+
+
+def csv_mapped(path):
+    """Parse CSV from memory mapped file"""
+    with MappedInput(path) as mapped:
+        for _ in csv.reader(mapped.lines()):
+            pass
+
+
+def json_buffered(path):
+    """json.load through Python file buffering"""
+    with open(path, 'r', encoding='utf-8') as file:
+        json.load(file)
+
+
+def json_mapped(path):
+    """json.loads from memory mapped file"""
+    with MappedInput(path) as mapped:
+        json.loads(mapped.text())
+
+
+def preview_buffered(path, lines=1000):
+    """Read first lines for preview through file buffering"""
+    with open(path, 'r', encoding='utf-8') as file:
+        for _, _line in zip(range(lines), file):
+            pass
+
+
+def preview_mapped(path, lines=1000):
+    """Read first lines for preview with mapped line index"""
+    with MappedInput(path) as mapped:
+        mapped.read_lines(0, lines)
+
+
+def main():
+    """Run benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size-mb', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, 'data.csv')
+        json_path = os.path.join(tmp_dir, 'data.json')
+        make_csv(csv_path, args.size_mb)
+        make_json(csv_path, json_path)
+
+        rows = []
+        for name, func, path in (("csv buffered", csv_buffered, csv_path),
+                                 ("csv mmap", csv_mapped, csv_path),
+                                 ("json buffered", json_buffered, json_path),
+                                 ("json mmap", json_mapped, json_path),
+                                 ("preview buffered", preview_buffered, csv_path),
+                                 ("preview mmap", preview_mapped, csv_path)):
+            seconds = best_time(lambda f=func, p=path: f(p), args.repeat)
+            size_mb = os.path.getsize(path) / 1024 / 1024
+            rows.append((name, seconds, f"{size_mb / seconds:8.1f} MB/s"))
+
+        print_table(f"Input reading, {args.size_mb} MB CSV", rows)
+
+
+if __name__ == '__main__':
+    main()
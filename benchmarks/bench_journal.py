@@ -0,0 +1,84 @@
+"""Benchmark: restart of a batch run killed near its end, with and without the job journal.
+
+Run from the project folder:
+    python -m benchmarks.bench_journal --files 200 --done 0.9
+"""
+
+import os
+import shutil
+import argparse
+import tempfile
+
+from ui.batch import BatchJob, BatchRunner
+from ui.journal import JobJournal
+
+from benchmarks.helpers import best_time, print_table
+from benchmarks.bench_io import make_csv
+
+
+def make_jobs(folder, count, size_mb):
+    """csv -> json jobs of count copies of one csv file"""
+    source = os.path.join(folder, 'source')
+    os.makedirs(source)
+    make_csv(os.path.join(source, '0.csv'), size_mb)
+    for index in range(1, count):
+        shutil.copy(os.path.join(source, '0.csv'), os.path.join(source, f'{index}.csv'))
+    return [BatchJob(os.path.join(source, f'{index}.csv'),
+                     os.path.join(folder, 'output', f'{index}.json'), {'target': '.json'})
+            for index in range(count)]
+
+
+def fresh(jobs):
+    """Same jobs not run yet"""
+    return [BatchJob(job.inp, job.out, job.options) for job in jobs]
+
+
+def main():
+    """Run benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', type=int, default=200)
+    parser.add_argument('--size-mb', type=int, default=1)
+    parser.add_argument('--done', type=float, default=0.9, help="part of jobs finished before the crash")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        jobs = make_jobs(tmp_dir, args.files, args.size_mb)
+        journal_path = os.path.join(tmp_dir, 'jobs.sqlite3')
+        runner = BatchRunner()
+        finished = int(len(jobs) * args.done)
+
+        def run_all(journal=None):
+            runner.run(fresh(jobs), journal=journal)
+
+        def journaled_run(count):
+            """Run of the first jobs with a new journal"""
+            if os.path.exists(journal_path):
+                os.remove(journal_path)
+            with JobJournal(journal_path) as journal:
+                runner.run(fresh(jobs[:count]), journal=journal)
+
+        def restart():
+            with JobJournal(journal_path) as journal:
+                run_all(journal)
+
+        rows = [("full run, no journal", best_time(run_all, args.repeat), "")]
+        rows.append(("full run, journal", best_time(lambda: journaled_run(len(jobs)), args.repeat),
+                     "checksums of outputs"))
+
+        # Without journal every job is run again after restart
+        rows.append(("restart, no journal", best_time(run_all, args.repeat), f"{len(jobs)} jobs run"))
+        seconds = 0
+        for _ in range(args.repeat):
+            journaled_run(finished)
+            took = best_time(restart, 1)
+            seconds = took if not seconds else min(seconds, took)
+        with JobJournal(journal_path) as journal:
+            counts = journal.counts()
+        rows.append(("restart, journal", seconds, f"{len(jobs) - finished} jobs run, {counts}"))
+        print_table(f"Restart after crash, {args.files} x {args.size_mb} MB csv, "
+                    f"{args.done:.0%} done", rows)
+
+
+if __name__ == '__main__':
+    main()
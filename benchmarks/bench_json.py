@@ -0,0 +1,50 @@
+"""Benchmark: JSON backends on rows produced by csv -> json convertation.
+
+Run from the project folder:
+    python -m benchmarks.bench_json --rows 500000
+"""
+
+import json
+import argparse
+
+from ui.codec import JsonCodec, BACKENDS
+
+from benchmarks.helpers import best_time, print_table
+
+
+def make_rows(count, columns=10):
+    """Rows the same as csv.DictReader gives"""
+    return [{f"column_{i}": f"value {row} {i} é" for i in range(columns)}
+            for row in range(count)]
+
+
+def main():
+    """Run benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    text = json.dumps(rows, ensure_ascii=False, indent=4)
+    data = text.encode('utf-8')
+    size_mb = len(data) / 1024 / 1024
+
+    table = []
+    for name, (_, installed) in BACKENDS.items():
+        if not installed:
+            table.append((f"{name} (not installed)", 0.0, ""))
+            continue
+        codec = JsonCodec((name,))
+        same = codec.dumps(rows) == text and codec.loads(data) == rows
+
+        seconds = best_time(lambda c=codec: c.dumps(rows), args.repeat)
+        table.append((f"dumps {name}", seconds, f"{size_mb / seconds:8.1f} MB/s  identical: {same}"))
+        seconds = best_time(lambda c=codec: c.loads(data), args.repeat)
+        table.append((f"loads {name}", seconds, f"{size_mb / seconds:8.1f} MB/s"))
+
+    print_table(f"JSON backends, {args.rows} rows, {size_mb:.1f} MB", table)
+
+
+if __name__ == '__main__':
+    main()
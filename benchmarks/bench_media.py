@@ -0,0 +1,53 @@
+"""Benchmark: waveform/keyframe strip vs full decode of a media file, first call and cached.
+
+Run from the project folder:
+    python -m benchmarks.bench_media --seconds 600
+"""
+
+import os
+import argparse
+import tempfile
+import subprocess
+
+from ui.media import MediaStrips, ffmpeg_available
+
+from benchmarks.helpers import best_time, print_table
+
+
+def make_media(path, seconds):
+    """Video with sound made by ffmpeg test sources"""
+    subprocess.run(['ffmpeg', '-v', 'error', '-y',
+                    '-f', 'lavfi', '-i', f"testsrc=duration={seconds}:size=640x360:rate=25",
+                    '-f', 'lavfi', '-i', f"sine=frequency=440:duration={seconds}",
+                    '-g', '50', '-shortest', path], check=True)
+
+
+def main():
+    """Run benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--seconds', type=int, default=120)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    if not ffmpeg_available():
+        print("ffmpeg is not installed")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        video = os.path.join(tmp_dir, 'clip.mp4')
+        audio = os.path.join(tmp_dir, 'sound.wav')
+        make_media(video, args.seconds)
+        subprocess.run(['ffmpeg', '-v', 'error', '-y', '-i', video, '-vn', audio], check=True)
+
+        full_decode = ['ffmpeg', '-v', 'error', '-i', video, '-f', 'null', '-']
+        rows = [("full decode of video", best_time(
+            lambda: subprocess.run(full_decode, check=True), 1), "")]
+        for name, path in (("keyframe strip", video), ("waveform", audio)):
+            rows.append((f"{name}, first call", best_time(lambda p=path: MediaStrips().strip(p), 1), ""))
+            strips = MediaStrips()
+            strips.strip(path)
+            rows.append((f"{name}, cached", best_time(lambda s=strips, p=path: s.strip(p), args.repeat), ""))
+    print_table(f"Media strips, {args.seconds} s file", rows)
+
+
+if __name__ == '__main__':
+    main()
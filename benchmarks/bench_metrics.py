@@ -0,0 +1,51 @@
+"""Benchmark: PSNR/SSIM of a converted image, strips vs whole image and cached comparison.
+
+Run from the project folder:
+    python -m benchmarks.bench_metrics --size 4000
+"""
+
+import os
+import argparse
+import tempfile
+
+from PIL import Image
+
+from ui.metrics import numpy_available, psnr, ssim, ImageComparer
+
+from benchmarks.helpers import best_time, print_table
+
+
+def main():
+    """Run benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    if not numpy_available():
+        print("numpy is not installed")
+        return
+
+    img = Image.effect_noise((args.size, args.size), 40).convert('RGB')
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source = os.path.join(tmp_dir, 'source.png')
+        img.save(source)
+        converted = img.quantize(64).convert('RGB')
+        grey, converted_grey = img.convert('L'), converted.convert('L')
+        for strip_rows in (64, 512, args.size):
+            rows.append((f"psnr strips of {strip_rows}", best_time(
+                lambda s=strip_rows: psnr(img, converted, s), args.repeat), ""))
+            rows.append((f"ssim strips of {strip_rows}", best_time(
+                lambda s=strip_rows: ssim(grey, converted_grey, strip_rows=s), args.repeat), ""))
+
+        comparer = ImageComparer()
+        rows.append(("compare, first call", best_time(
+            lambda: ImageComparer().compare(source, converted, 'JPEG', {}), 1), ""))
+        comparer.compare(source, converted, 'JPEG', {})
+        rows.append(("compare, cached", best_time(
+            lambda: comparer.compare(source, converted, 'JPEG', {}), args.repeat), ""))
+    print_table(f"Quality metrics, {args.size}x{args.size} image", rows)
+
+
+if __name__ == '__main__':
+    main()
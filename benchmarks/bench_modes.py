@@ -0,0 +1,53 @@
+"""Benchmark: blind convert() before encoding vs the mode-aware conversion stage.
+
+Run from the project folder:
+    python -m benchmarks.bench_modes --size 2048
+"""
+
+import argparse
+
+from PIL import Image
+
+from ui.constants import IMAGE_ENCODER_MODES, PREVIEW_MODES
+from ui.modes import prepare_image
+
+from benchmarks.helpers import best_time, print_table
+
+# (source mode, target format, mode of the old blind conversion)
+CASES = (
+    ('RGB', 'JPEG', 'RGB'),
+    ('L', 'JPEG', 'RGB'),
+    ('RGBA', 'WEBP', 'RGB'),
+    ('P', 'PNG', None),
+    ('I;16', 'JPEG', 'RGB'),
+    ('CMYK', 'WEBP', 'RGB'),
+)
+
+
+def main():
+    """Run benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', type=int, default=1024)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rows = []
+    for mode, real_format, old_mode in CASES:
+        img = Image.effect_noise((args.size, args.size), 64).convert(mode)
+        blind = best_time(lambda i=img, m=old_mode: i.convert(m) if m else i.copy(), args.repeat)
+        staged = best_time(lambda i=img, f=real_format: prepare_image(i, IMAGE_ENCODER_MODES[f]),
+                           args.repeat)
+        rows.append((f"{mode} -> {real_format} convert", blind, ""))
+        rows.append((f"{mode} -> {real_format} stage", staged,
+                     f"-> {prepare_image(img, IMAGE_ENCODER_MODES[real_format]).mode}"))
+
+    for mode in ('L', 'P', 'RGB'):
+        img = Image.effect_noise((args.size, args.size), 64).convert(mode)
+        rows.append((f"preview {mode} RGBA", best_time(lambda i=img: i.convert('RGBA'), args.repeat), ""))
+        rows.append((f"preview {mode} stage", best_time(
+            lambda i=img: prepare_image(i, PREVIEW_MODES, palette_alpha=False), args.repeat), ""))
+    print_table(f"Mode conversion, {args.size}x{args.size}", rows)
+
+
+if __name__ == '__main__':
+    main()
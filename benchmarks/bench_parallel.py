@@ -0,0 +1,37 @@
+"""Benchmark: serial vs process pool csv -> json/txt convertation.
+
+Run from the project folder:
+    python -m benchmarks.bench_parallel --size-mb 200 --workers 8
+"""
+
+import os
+import argparse
+import tempfile
+
+from ui.parallel import write_csv_parallel
+
+from benchmarks.helpers import print_table, csv_engine_rows
+from benchmarks.bench_io import make_csv
+
+
+def main():
+    """Run benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size-mb', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, 'data.csv')
+        make_csv(csv_path, args.size_mb)
+
+        rows = csv_engine_rows(
+            f"{args.workers} workers",
+            lambda inp, out, out_format: write_csv_parallel(inp, out, out_format, args.workers),
+            csv_path, args.repeat)
+        print_table(f"CSV convertation, {args.size_mb} MB", rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark: player position shown on every signal vs coalesced at a fixed rate.
+
+Positions come every millisecond like from a busy media backend, widgets are
+real and repainted by the event loop. Run from the project folder:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_player_ui --seconds 3
+"""
+
+import sys
+import time
+import argparse
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QApplication, QWidget, QHBoxLayout, QLabel, QSlider
+
+from ui.constants import PLAYER_UI_INTERVAL_MS
+from ui.instrumentation import Instrumentation
+from ui.throttle import Coalescer
+
+from benchmarks.helpers import print_table
+
+
+class PlayerWidgets(QWidget):
+    """Slider and time label of the preview player"""
+
+    def __init__(self, instruments):
+        super().__init__()
+        self.instruments = instruments
+        self.slider = QSlider(Qt.Orientation.Horizontal)
+        self.slider.setRange(0, 3_600_000)
+        self.label = QLabel('00:00.000')
+        layout = QHBoxLayout(self)
+        layout.addWidget(self.label)
+        layout.addWidget(self.slider)
+        self.shown_second = None
+
+    def show_every(self, position):
+        """Old path: slider and label on every position"""
+        with self.instruments.timed('ui update'):
+            self.slider.setValue(position)
+            self.label.setText(f"{position // 60000:02d}:{position // 1000 % 60:02d}")
+
+    def show_changed(self, position):
+        """New path: label only when the second changes"""
+        with self.instruments.timed('ui update'):
+            self.slider.setValue(position)
+            if position // 1000 != self.shown_second:
+                self.shown_second = position // 1000
+                self.label.setText(f"{position // 60000:02d}:{position // 1000 % 60:02d}")
+
+
+def play(app, push, seconds):
+    """Push a position every ms for seconds of wall time, returns positions pushed"""
+    start = time.perf_counter()
+    pushed = 0
+    while (now := time.perf_counter() - start) < seconds:
+        push(int(now * 1000))
+        pushed += 1
+        app.processEvents()
+        time.sleep(0.001)
+    return pushed
+
+
+def main():
+    """Run benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--seconds', type=float, default=2)
+    args = parser.parse_args()
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    rows = []
+    for name in ('every signal', f'coalesced {PLAYER_UI_INTERVAL_MS} ms'):
+        instruments = Instrumentation(enabled=True)
+        widgets = PlayerWidgets(instruments)
+        widgets.show()
+        if name == 'every signal':
+            push = widgets.show_every
+        else:
+            coalescer = Coalescer(PLAYER_UI_INTERVAL_MS, widgets.show_changed)
+            push = coalescer.push
+        pushed = play(app, push, args.seconds)
+        calls, total, _longest = instruments.snapshot()['ui update']
+        rows.append((name, total, f"{pushed} positions, {calls} updates"))
+        widgets.close()
+    print_table(f"Player position updates, {args.seconds} s of playback", rows)
+
+
+if __name__ == '__main__':
+    main()
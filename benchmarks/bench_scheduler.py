@@ -0,0 +1,96 @@
+"""Benchmark: mixed batch (large csv -> json, images, streamed csv -> jsonl)
+run N jobs at once vs by the resource-aware scheduler. Every run is a child
+process, so its peak RSS is measured alone.
+
+Run from the project folder:
+    python -m benchmarks.bench_scheduler --workers 8 --budget-mb 512
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from ui.batch import BatchJob, BatchRunner
+from ui.converters import FileConverter
+from ui.scheduler import JobScheduler
+
+from benchmarks.helpers import print_table
+from benchmarks.bench_io import make_csv
+
+
+def make_jobs(folder, large, size_mb):
+    """Jobs of large csv files, images and streamed csv files"""
+    jobs = []
+    make_csv(os.path.join(folder, 'large.csv'), size_mb)
+    make_csv(os.path.join(folder, 'small.csv'), 2)
+    Image.effect_noise((2000, 1500), 40).convert('RGB').save(os.path.join(folder, 'image.png'))
+    for index in range(large):
+        jobs.append((os.path.join(folder, 'large.csv'), os.path.join(folder, 'out', f'{index}.json')))
+        jobs.append((os.path.join(folder, 'image.png'), os.path.join(folder, 'out', f'{index}.webp')))
+        jobs.append((os.path.join(folder, 'small.csv'), os.path.join(folder, 'out', f'{index}.jsonl')))
+    return jobs
+
+
+def run_child(mode, jobs, workers, budget):
+    """Run jobs in this process, returns (seconds, peak RSS in MB)"""
+    jobs = [BatchJob(inp, out) for inp, out in jobs]
+    runner = BatchRunner(FileConverter(columnar=False, fsync='none'), workers=workers,
+                         scheduler=JobScheduler(workers, memory=budget))
+    start = time.perf_counter()
+    if mode == 'naive':
+        # All workers take the next job, as BatchRunner did before the scheduler
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(runner.run_job, jobs))
+    else:
+        runner.run(jobs)
+    seconds = time.perf_counter() - start
+    if any(job.status != 'done' for job in jobs):
+        raise RuntimeError("Job failed")
+    return seconds, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    """Run benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--large', type=int, default=8, help="number of every kind of jobs")
+    parser.add_argument('--size-mb', type=int, default=20, help="size of large csv files")
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--budget-mb', type=int, default=512)
+    parser.add_argument('--child', choices=('naive', 'scheduled'))
+    parser.add_argument('--jobs')
+    args = parser.parse_args()
+
+    if args.child:
+        with open(args.jobs, encoding='utf-8') as file:
+            jobs = json.load(file)
+        print(json.dumps(run_child(args.child, jobs, args.workers, args.budget_mb * 1024 * 1024)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.makedirs(os.path.join(tmp_dir, 'out'))
+        jobs_path = os.path.join(tmp_dir, 'jobs.json')
+        with open(jobs_path, 'w', encoding='utf-8') as file:
+            json.dump(make_jobs(tmp_dir, args.large, args.size_mb), file)
+
+        rows = []
+        for mode in ('naive', 'scheduled'):
+            result = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.bench_scheduler', '--child', mode, '--jobs', jobs_path,
+                 '--workers', str(args.workers), '--budget-mb', str(args.budget_mb)],
+                capture_output=True, text=True, check=True)
+            seconds, peak_mb = json.loads(result.stdout)
+            rows.append((f"{mode}, {args.workers} workers", seconds, f"peak RSS {peak_mb:7.0f} MB"))
+        print_table(f"{args.large * 3} mixed jobs, {args.size_mb} MB csv, "
+                    f"budget {args.budget_mb} MB", rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Benchmark: whole image QPixmap vs tiled pyramid for a large image.
+
+Run from the project folder:
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_tiles --size 20000
+"""
+
+import sys
+import random
+import argparse
+
+from PIL import Image
+from PyQt6.QtGui import QPixmap
+from PyQt6.QtWidgets import QApplication
+
+from ui.previews import to_qimage
+from ui.tiles import TilePyramid
+
+from benchmarks.helpers import best_time, print_table
+
+
+def main():
+    """Run benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', type=int, default=8000)
+    parser.add_argument('--tiles', type=int, default=200)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)  # pylint: disable=unused-variable
+    img = Image.linear_gradient('L').resize((args.size, args.size)).convert('RGB')
+
+    rows = [("whole image QPixmap", best_time(lambda: QPixmap.fromImage(to_qimage(img)), 1),
+             f"{args.size * args.size * 4 / 1024 / 1024:.0f} MB pixmap")]
+
+    pyramid = TilePyramid(img)
+    rows.append(("pyramid top level", best_time(lambda: pyramid.tile(pyramid.levels - 1, 0, 0), 1),
+                 f"{pyramid.levels} levels"))
+
+    for level in (0, 1, pyramid.levels - 3):
+        cols, rows_count = pyramid.grid(level)
+        keys = [(level, random.randrange(cols), random.randrange(rows_count)) for _ in range(args.tiles)]
+
+        def pan(keys=keys):
+            pyramid.cache.clear()
+            for key in keys:
+                QPixmap.fromImage(to_qimage(pyramid.tile(*key)))
+
+        seconds = best_time(pan, 1)
+        rows.append((f"{args.tiles} tiles at level {level}", seconds,
+                     f"{seconds / args.tiles * 1000:.2f} ms per tile, {len(pyramid.cache)} cached"))
+    print_table(f"Tiled viewer, {args.size}x{args.size}", rows)
+
+
+if __name__ == '__main__':
+    main()
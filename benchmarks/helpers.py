@@ -0,0 +1,49 @@
+"""Helpers shared by benchmark scripts"""
+
+import os
+import time
+import filecmp
+
+from ui.converters import FileConverter
+
+
+def best_time(func, repeat=3):
+    """Best wall-clock time of func() in seconds"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        took = time.perf_counter() - start
+        best = took if best is None else min(best, took)
+    return best
+
+
+def print_table(title, rows):
+    """Print (name, seconds, extra) rows as a table"""
+    print(f"\n{title}")
+    print("-" * len(title))
+    for name, seconds, extra in rows:
+        print(f"{name:<32} {seconds:>9.4f} s   {extra}")
+
+
+def csv_engine_rows(name, engine, csv_path, repeat=3):
+    """Time csv -> json/txt of csv.DictReader writers and engine(inp, out, out_format).
+    Returns table rows, engine output is compared with DictReader output"""
+    folder = os.path.dirname(csv_path)
+    size_mb = os.path.getsize(csv_path) / 1024 / 1024
+    converter = FileConverter(columnar=False)
+
+    rows = []
+    for out_format in ('.json', '.txt'):
+        serial_out = os.path.join(folder, f'serial{out_format}')
+        engine_out = os.path.join(folder, f'engine{out_format}')
+
+        writer = converter.file_writers[('.csv', out_format)]
+        seconds = best_time(lambda w=writer, o=serial_out: w(csv_path, o), repeat)
+        rows.append((f"csv -> {out_format} DictReader", seconds, f"{size_mb / seconds:8.1f} MB/s"))
+
+        seconds = best_time(lambda o=engine_out, f=out_format: engine(csv_path, o, f), repeat)
+        same = filecmp.cmp(serial_out, engine_out, shallow=False)
+        rows.append((f"csv -> {out_format} {name}", seconds,
+                     f"{size_mb / seconds:8.1f} MB/s  identical: {same}"))
+    return rows
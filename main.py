@@ -7,6 +7,8 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import QSize
 
 from ui.main_tab import ConverterTab, AboutTab
+from ui.batch_tab import BatchTab
+from ui.instrumentation import INSTRUMENTS
 
 
 # pylint: disable=too-few-public-methods
@@ -29,10 +31,13 @@ class MainWindow(QMainWindow):
         # Creating tabs
         main_tab1 = ConverterTab(self)
 
+        batch_tab = BatchTab(self)
+
         tab2_info = AboutTab()
 
         # Adding tabs to QTabWidgets
         tabs.addTab(main_tab1, "Main")
+        tabs.addTab(batch_tab, "Batch")
         tabs.addTab(tab2_info, "About")
 
         self.setCentralWidget(tabs)
@@ -44,7 +49,11 @@ class MainWindow(QMainWindow):
 
 
 # Initializing App
-app = QApplication([])
-window = MainWindow()
-window.show()
-sys.exit(app.exec())
+if __name__ == '__main__':
+    app = QApplication([])
+    window = MainWindow()
+    window.show()
+    exit_code = app.exec()
+    if INSTRUMENTS.enabled:
+        print(INSTRUMENTS.report())
+    sys.exit(exit_code)
@@ -0,0 +1,102 @@
+"""Tests for atomic outputs and fsync policies"""
+
+import os
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+import unittest
+
+from ui.atomic import OutputSync, remove_temps, temp_path
+from ui.batch import BatchJob, BatchRunner
+from ui.converters import FileConverter
+from ui.sync import FolderSync
+from ui.constants import ATOMIC_TEMP_PREFIX
+
+from tests.helpers import timing_decorator
+
+
+class TestAtomic(unittest.TestCase):
+    """Tests for outputs written through temporary files"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.folder = Path(self.tmp_dir.name)
+        self.csv_file = self.folder / 'data.csv'
+        self.csv_file.write_text("a,b\n1,2\n", encoding='utf-8')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def temps(self, folder=None):
+        """Temporary files left in the folder"""
+        return list(Path(folder or self.folder).glob(ATOMIC_TEMP_PREFIX + '*'))
+
+    @timing_decorator
+    def test_interrupted_output(self):
+        """Test that failed convertation keeps the old output and leaves no temporary file"""
+        broken = self.folder / 'broken.jsonl'
+        broken.write_text('{"a": 1}\n{"a": 2}\nnot json\n', encoding='utf-8')
+        out = self.folder / 'out.txt'
+        out.write_text("old output", encoding='utf-8')
+
+        with self.assertRaises(ValueError):
+            FileConverter().convert(broken, out)
+        self.assertEqual(out.read_text(encoding='utf-8'), "old output")
+        self.assertEqual(self.temps(), [])
+
+        # Temporary path keeps the extensions used by writers
+        self.assertTrue(temp_path(self.folder / 'data.json.gz').endswith('-data.json.gz'))
+        FileConverter().convert(self.csv_file, self.folder / 'data.json.gz')
+        self.assertEqual(FileConverter().detect_format(self.folder / 'data.json.gz'), '.json')
+
+    @timing_decorator
+    def test_fsync_policies(self):
+        """Test number of fsync calls of every policy"""
+        with self.assertRaises(ValueError):
+            OutputSync('sometimes')
+
+        calls = {}
+        for policy in ('none', 'file', 'batch'):
+            converter = FileConverter(fsync=policy)
+            with mock.patch('ui.atomic.os.fsync') as fsync:
+                for name in 'abc':
+                    converter.convert(self.csv_file, self.folder / f'{name}.json')
+                calls[policy] = fsync.call_count
+                self.assertEqual(converter.output_sync.flush(), 3 if policy == 'batch' else 0)
+                calls[policy + ' flush'] = fsync.call_count - calls[policy]
+
+        # File and its folder for every output, all files and one folder for batch
+        self.assertEqual(calls, {'none': 0, 'none flush': 0, 'file': 6, 'file flush': 0,
+                                 'batch': 0, 'batch flush': 4})
+
+    @timing_decorator
+    def test_batch_run_flush(self):
+        """Test that batch runner flushes outputs at the end of the run"""
+        runner = BatchRunner(FileConverter(fsync='batch'), workers=2)
+        jobs = [BatchJob(self.csv_file, self.folder / 'out' / f'{name}.json') for name in 'ab']
+        with mock.patch('ui.atomic.os.fsync') as fsync:
+            runner.run(jobs)
+        self.assertEqual([job.status for job in jobs], ['done', 'done'])
+        self.assertEqual(fsync.call_count, 3)
+        self.assertEqual(runner.file_converter.output_sync.pending, [])
+
+    @timing_decorator
+    def test_sync_removes_temps(self):
+        """Test that temporary outputs of a killed run are removed by the next sync"""
+        source, output = self.folder / 'source', self.folder / 'output'
+        (source / 'sub').mkdir(parents=True)
+        (source / 'sub' / 'data.csv').write_text("a,b\n1,2\n", encoding='utf-8')
+        (output / 'sub').mkdir(parents=True)
+        stale = Path(temp_path(output / 'sub' / 'data.json'))
+        stale.write_text('[\n    {', encoding='utf-8')
+
+        summary = FolderSync(source, output, {'.csv': '.json'}).run()
+        self.assertEqual(summary['converted'], 1)
+        self.assertEqual(self.temps(output / 'sub'), [])
+        self.assertEqual(remove_temps(output / 'missing'), 0)
+        self.assertTrue(os.path.exists(output / 'sub' / 'data.json'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+"""Tests for the shared LRU cache"""
+
+import threading
+
+import unittest
+
+from ui.cache import LRUCache, MISSING
+
+from tests.helpers import timing_decorator
+
+
+class TestLRUCache(unittest.TestCase):
+    """Tests for eviction order and concurrent use"""
+
+    @timing_decorator
+    def test_least_recent_is_dropped(self):
+        """Test that get marks the entry as recent and the oldest one is dropped"""
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', None)
+        self.assertEqual(cache.get('a'), 1)
+        cache.put('c', 3)
+
+        self.assertEqual(len(cache), 2)
+        self.assertNotIn('b', cache)
+        self.assertIs(cache.get('b', MISSING), MISSING)
+        self.assertEqual((cache.get('a'), cache.get('c')), (1, 3))
+
+        # Stored None is told apart from a missing key
+        cache.put('d', None)
+        self.assertIsNone(cache.get('d', MISSING))
+
+    @timing_decorator
+    def test_threads(self):
+        """Test that the size bound holds with threads putting and reading entries"""
+        cache = LRUCache(8)
+
+        def work(start):
+            for key in range(start, start + 500):
+                cache.put(key, key)
+                cache.get(key - 3)
+
+        threads = [threading.Thread(target=work, args=(start * 1000,)) for start in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(cache), 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""Tests for JSON codec backends"""
+
+import json
+import math
+import tempfile
+from pathlib import Path
+
+import unittest
+from unittest.mock import patch
+
+from ui.codec import JsonCodec, StdlibJson, BACKENDS, plain_json
+from ui.converters import FileConverter
+
+from tests.helpers import timing_decorator
+
+
+SAMPLES = [
+    [],
+    {},
+    [{"a": "1", "b": None, "c": ["x", "y"]}, {"a": "", "b": "", "c": []}],
+    {"text": "ü \x00\x1f\x7f\"\\\n\r\t\b\f/é😀"},
+    [[], {}, [[]], {"a": {}}],
+    [1, -7, True, False, None, 123456789012345678901234567890],
+    {"x": [1, {"y": []}]},
+]
+
+
+class TestJsonCodec(unittest.TestCase):
+    """Every installed backend must give the same result as stdlib json"""
+
+    def installed_codecs(self):
+        """JsonCodec for every installed backend"""
+        return [JsonCodec((name,)) for name, (_, installed) in BACKENDS.items() if installed]
+
+    @timing_decorator
+    def test_dumps_is_the_same_as_json(self):
+        """Test output of dumps for all backends"""
+        for codec in self.installed_codecs():
+            for sample in SAMPLES:
+                with self.subTest(backend=codec.backend.name, sample=sample):
+                    self.assertEqual(codec.dumps(sample),
+                                     json.dumps(sample, ensure_ascii=False, indent=4))
+
+    @timing_decorator
+    def test_dumps_line_is_the_same_as_json(self):
+        """Test one line output used for JSON Lines"""
+        for codec in self.installed_codecs():
+            for sample in SAMPLES + [[1.5, float('nan')]]:
+                with self.subTest(backend=codec.backend.name, sample=sample):
+                    self.assertEqual(codec.dumps_line(sample),
+                                     json.dumps(sample, ensure_ascii=False))
+
+    @timing_decorator
+    def test_loads_is_the_same_as_json(self):
+        """Test loads for str, bytes and memoryview input"""
+        for codec in self.installed_codecs():
+            for sample in SAMPLES:
+                text = json.dumps(sample, ensure_ascii=False)
+                for data in (text, text.encode('utf-8'), memoryview(text.encode('utf-8'))):
+                    self.assertEqual(codec.loads(data), sample)
+
+    @timing_decorator
+    def test_fallback_to_json(self):
+        """Test values only stdlib json handles the stdlib way"""
+        codec = JsonCodec()
+        self.assertTrue(math.isnan(codec.loads('{"a": NaN}')['a']))
+        self.assertEqual(codec.loads('[1e400]'), [math.inf])
+        self.assertEqual(codec.loads('"\\ud800"'), '\ud800')
+
+        for sample in ([1e16, 0.1], {1: "a"}, ("a", "b"), {None: "x"}):
+            self.assertFalse(plain_json(sample))
+            self.assertEqual(codec.dumps(sample), json.dumps(sample, ensure_ascii=False, indent=4))
+
+        with self.assertRaises(json.JSONDecodeError):
+            codec.loads('[1] x')
+        with self.assertRaises(UnicodeDecodeError):
+            codec.loads(b'["\xff"]')
+
+    @timing_decorator
+    def test_backend_is_not_installed(self):
+        """Test that stdlib json is used if no backend is installed"""
+        with patch.dict(BACKENDS, {'msgspec': (BACKENDS['msgspec'][0], False)}):
+            self.assertIs(JsonCodec().backend, StdlibJson)
+        self.assertIs(JsonCodec(('unknown',)).backend, StdlibJson)
+
+    @timing_decorator
+    def test_converter_output_for_every_backend(self):
+        """Test csv -> json -> csv round trip gives the same files for all backends"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            folder = Path(tmp_dir)
+            inp = folder / 'data.csv'
+            inp.write_text('a,b\r\n1,"x\ny"\r\n2,привет\r\n', encoding='utf-8')
+
+            outputs = set()
+            for codec in self.installed_codecs():
+                out_json = folder / f'{codec.backend.name}.json'
+                out_csv = folder / f'{codec.backend.name}.csv'
+                converter = FileConverter(codec=codec)
+                converter.convert(inp, out_json)
+                converter.convert(out_json, out_csv)
+                outputs.add((out_json.read_bytes(), out_csv.read_bytes()))
+
+            self.assertEqual(len(outputs), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+"""Tests for pyarrow columnar csv engine"""
+
+import tempfile
+from pathlib import Path
+
+import unittest
+from unittest.mock import patch
+
+from ui.converters import FileConverter
+from ui.columnar import columnar_available, write_csv_columnar
+
+from tests.helpers import timing_decorator
+
+
+# Files pyarrow must convert exactly like csv.DictReader
+SAME_OUTPUT = {
+    'crlf': 'a,b\r\n1,2\r\n3,4',
+    'cr': 'a,b\r1,2\r3,4\r',
+    'quoted': 'a,b\n"x\ny",2\n"he said ""hi""",x"y\n"a"b,"q\r\nq"\n',
+    'blank_lines': 'a,b\n\n1,2\n\n\n3,4\n',
+    'empty_values': 'a,b,\n,,\n"","",NA\nnull,N/A,NaN\n',
+    'escapes': 'a,b\n"tab\tquote\\""",é😀\n\x01\x1f,\x00\n',
+    'header_only': 'a,b\n',
+    'one_column': 'a\n1\n""\n\n2\n',
+}
+
+# Files pyarrow reads differently, they go to csv.DictReader
+FALLBACK = {
+    'bom': '\ufeffa,b\n1,2\n',
+    'blank_header': '\na,b\n1,2\n',
+    'same_names': 'a,a\n1,2\n',
+    'short_row': 'a,b\n1\n',
+    'long_row': 'a,b\n1,2,3\n',
+    'unclosed_quote': 'a,b\n"1,2\n',
+    'spaces_line': 'a,b\n \n1,2\n',
+}
+
+
+@unittest.skipUnless(columnar_available(), "pyarrow is not installed")
+class TestColumnarCsv(unittest.TestCase):
+    """Columnar output must be the same as csv.DictReader output"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.folder = Path(self.tmp_dir.name)
+        self.inp = self.folder / 'data.csv'
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def serial_output(self, out_format):
+        """Output of csv.DictReader based writer or exception type"""
+        out = self.folder / f'serial{out_format}'
+        try:
+            FileConverter(columnar=False).convert(self.inp, out)
+        except TypeError as e:
+            return type(e)
+        return out.read_bytes()
+
+    @timing_decorator
+    def test_same_output_as_dict_reader(self):
+        """Test json and txt output for tricky csv files"""
+        for name, text in SAME_OUTPUT.items():
+            self.inp.write_bytes(text.encode('utf-8'))
+            for out_format in ('.json', '.txt'):
+                with self.subTest(name=name, out_format=out_format):
+                    out = self.folder / f'columnar{out_format}'
+                    self.assertTrue(write_csv_columnar(self.inp, out, out_format))
+                    self.assertEqual(out.read_bytes(), self.serial_output(out_format))
+
+    @timing_decorator
+    def test_fallback_to_dict_reader(self):
+        """Test that files pyarrow reads differently are not converted by it"""
+        for name, text in FALLBACK.items():
+            self.inp.write_bytes(text.encode('utf-8'))
+            for out_format in ('.json', '.txt'):
+                with self.subTest(name=name, out_format=out_format):
+                    out = self.folder / f'columnar{out_format}'
+                    self.assertFalse(write_csv_columnar(self.inp, out, out_format))
+
+    @timing_decorator
+    def test_converter_uses_columnar_for_large_files(self):
+        """Test FileConverter engine selection and fallback"""
+        out = self.folder / 'out.json'
+        with patch('ui.converters.COLUMNAR_CSV_MIN_SIZE', 0), \
+                patch('ui.converters.write_csv_columnar', wraps=write_csv_columnar) as columnar:
+            self.inp.write_text('a,b\n1,2\n', encoding='utf-8')
+            FileConverter().convert(self.inp, out)
+            self.assertEqual(out.read_bytes(), self.serial_output('.json'))
+
+            self.inp.write_text('a,b\n1,2,3\n', encoding='utf-8')
+            FileConverter().convert(self.inp, out)
+            self.assertEqual(out.read_bytes(), self.serial_output('.json'))
+
+            self.assertEqual(columnar.call_count, 2)
+            FileConverter(columnar=False).convert(self.inp, out)
+            self.assertEqual(columnar.call_count, 2)
+
+    @timing_decorator
+    def test_many_batches(self):
+        """Test that batches are stitched in order"""
+        rows = ''.join(f'{i},"value\n{i}"\n' for i in range(20000))
+        self.inp.write_text('id,text\n' + rows, encoding='utf-8')
+        for out_format in ('.json', '.txt'):
+            out = self.folder / f'columnar{out_format}'
+            with patch('ui.columnar.COLUMNAR_BLOCK_SIZE', 4096):
+                self.assertTrue(write_csv_columnar(self.inp, out, out_format))
+            self.assertEqual(out.read_bytes(), self.serial_output(out_format))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+"""Tests for compressed (gz/bz2/xz/zst) text files"""
+
+import gzip
+import tempfile
+from pathlib import Path
+
+import unittest
+
+from ui.compression import (compression_of, compressed_format, open_binary, zstd_available,
+                            ParallelWriter, COMPRESSORS)
+from ui.converters import FileConverter
+from ui.fileio import read_preview_text
+from ui.sniffing import FormatSniffer
+from ui.tabular import tabular_available
+
+from tests.helpers import timing_decorator
+
+
+CSV_TEXT = 'id,name\n1,a\n2,"x\ny"\n3,привет\n'
+CODECS = ('.gz', '.bz2', '.xz') + (('.zst',) if zstd_available() else ())
+
+
+class TestCompression(unittest.TestCase):
+    """Tests for streaming compressed inputs and outputs"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.folder = Path(self.tmp_dir.name)
+        self.csv_file = self.folder / 'data.csv'
+        self.csv_file.write_text(CSV_TEXT, encoding='utf-8', newline='')
+
+        self.reference = self.folder / 'reference.json'
+        FileConverter().convert(self.csv_file, self.reference)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    @timing_decorator
+    def test_extensions(self):
+        """Test that compressed text files are routed by the inner format"""
+        self.assertEqual(compression_of('data.csv.GZ'), '.gz')
+        self.assertIsNone(compression_of('data.csv'))
+        self.assertEqual(compressed_format('data.jsonl.zst'), '.jsonl')
+        self.assertIsNone(compressed_format('picture.png.gz'))
+        self.assertEqual(FileConverter.detect_extension('data.json.xz'), '.json')
+        self.assertEqual(FileConverter.detect_extension('archive.gz'), '.gz')
+
+    @timing_decorator
+    def test_round_trip(self):
+        """Test csv -> json.<codec> -> csv.<codec> -> json gives the plain output"""
+        for threads in (1, 3):
+            converter = FileConverter(compress_threads=threads)
+            for codec in CODECS:
+                with self.subTest(codec=codec, threads=threads):
+                    json_file = self.folder / f'data.json{codec}'
+                    csv_file = self.folder / f'back.csv{codec}'
+                    result = self.folder / 'result.json'
+
+                    converter.convert(self.csv_file, json_file)
+                    converter.convert(json_file, csv_file)
+                    converter.convert(csv_file, result)
+
+                    self.assertEqual(result.read_bytes(), self.reference.read_bytes())
+
+    @timing_decorator
+    def test_parallel_writer_members(self):
+        """Test that blocks compressed by threads are read back as one stream"""
+        text = ''.join(f"line {i}\n" for i in range(5000)).encode('utf-8')
+        path = self.folder / 'lines.txt.gz'
+
+        writer = ParallelWriter(open(path, 'wb'), COMPRESSORS['.gz'], 3, block_size=1000)  # pylint: disable=consider-using-with
+        with writer:
+            writer.write(text)
+            writer.write(b'')
+        self.assertGreater(writer.members, 1)
+        self.assertEqual(gzip.decompress(path.read_bytes()), text)
+
+        empty = self.folder / 'empty.txt.xz'
+        ParallelWriter(open(empty, 'wb'), COMPRESSORS['.xz'], 2).close()  # pylint: disable=consider-using-with
+        with open_binary(empty) as file:
+            self.assertEqual(file.read(), b'')
+
+    @timing_decorator
+    def test_sniff_compressed(self):
+        """Test that decompressed head is sniffed for compressed file"""
+        path = self.folder / 'data.csv.gz'
+        path.write_bytes(gzip.compress(CSV_TEXT.encode('utf-8')))
+        sniffer = FormatSniffer()
+
+        self.assertEqual(sniffer.sniff(path), '.csv')
+        self.assertEqual(FileConverter(sniffer).detect_format(path), '.csv')
+
+        # gzip content named as plain csv is not read as text
+        misnamed = self.folder / 'misnamed.csv'
+        misnamed.write_bytes(path.read_bytes())
+        self.assertEqual(sniffer.detect(misnamed, '.csv'), '.gz')
+
+        broken = self.folder / 'broken.json.gz'
+        broken.write_bytes(b'\x1f\x8b' + b'\x00' * 20)
+        self.assertIsNone(sniffer.sniff(broken))
+
+    @timing_decorator
+    def test_preview(self):
+        """Test preview of compressed file decompresses only first lines"""
+        path = self.folder / 'lines.txt.bz2'
+        with open_binary(path, 'wb') as file:
+            file.write(''.join(f"{i}\n" for i in range(100000)).encode('utf-8'))
+
+        self.assertEqual(read_preview_text(path, 3), '0\n1\n2\n')
+
+    @unittest.skipUnless(tabular_available(), "pyarrow is not installed")
+    @timing_decorator
+    def test_tabular(self):
+        """Test compressed csv -> parquet -> compressed json lines"""
+        converter = FileConverter()
+        for codec in CODECS:
+            with self.subTest(codec=codec):
+                csv_file = self.folder / f'data.csv{codec}'
+                with open_binary(csv_file, 'wb') as file:
+                    file.write(CSV_TEXT.encode('utf-8'))
+
+                parquet_file = self.folder / 'data.parquet'
+                converter.convert(csv_file, parquet_file)
+                converter.convert(parquet_file, self.folder / f'data.jsonl{codec}')
+                converter.convert(self.folder / f'data.jsonl{codec}', self.folder / 'result.json')
+
+                self.assertEqual((self.folder / 'result.json').read_bytes(),
+                                 self.reference.read_bytes())
+
+
+if __name__ == '__main__':
+    unittest.main()
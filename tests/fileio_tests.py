@@ -0,0 +1,113 @@
+"""Tests for memory mapped input layer"""
+
+import csv
+import json
+import tempfile
+from pathlib import Path
+
+import unittest
+from unittest.mock import patch
+
+from ui.fileio import MappedInput, open_text_lines, load_json, read_preview_text
+from ui.converters import FileConverter
+
+from tests.helpers import timing_decorator
+
+
+CSV_DATA = 'id,text\r\n1,"multi\nline, quoted"\r\n2,привет\r\n3,"a ""b"""\n4,last'
+
+
+class TestMappedInput(unittest.TestCase):
+    """Tests for MappedInput and mapped/buffered switch"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.folder = Path(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_text(self, name, text):
+        """Write utf-8 file without newline translation"""
+        path = self.folder / name
+        path.write_bytes(text.encode('utf-8'))
+        return path
+
+    @timing_decorator
+    def test_lines_match_buffered_file(self):
+        """Test that mapped lines are the same as open(newline='') lines"""
+        path = self.write_text('data.csv', CSV_DATA)
+        with open(path, newline='', encoding='utf-8') as file:
+            expected = list(file)
+
+        for block_size in (1, 7, 1024):
+            with MappedInput(path) as mapped:
+                self.assertEqual(list(mapped.lines(block_size)), expected)
+
+    @timing_decorator
+    def test_csv_rows_match_buffered_file(self):
+        """Test that quoted newlines are parsed the same way"""
+        path = self.write_text('data.csv', CSV_DATA)
+        with open(path, newline='', encoding='utf-8') as file:
+            expected = list(csv.reader(file))
+
+        with MappedInput(path) as mapped:
+            self.assertEqual(list(csv.reader(mapped.lines(block_size=5))), expected)
+
+    @timing_decorator
+    def test_text_and_empty_file(self):
+        """Test full decode and empty file"""
+        path = self.write_text('data.json', '{"a": "ю"}')
+        with MappedInput(path) as mapped:
+            self.assertEqual(json.loads(mapped.text()), {"a": "ю"})
+
+        path = self.write_text('empty.csv', '')
+        with MappedInput(path) as mapped:
+            self.assertEqual(mapped.text(), '')
+            self.assertEqual(list(mapped.lines()), [])
+            self.assertEqual(mapped.read_lines(0, 10), '')
+
+    @timing_decorator
+    def test_line_index_and_read_lines(self):
+        """Test line index used by previews"""
+        path = self.write_text('lines.txt', 'a\nbb\nccc\n')
+        with MappedInput(path) as mapped:
+            self.assertEqual(list(mapped.line_offsets()), [0, 2, 5])
+            self.assertEqual(mapped.read_lines(1, 1), 'bb\n')
+            self.assertEqual(mapped.read_lines(1, 10), 'bb\nccc\n')
+            self.assertEqual(mapped.read_lines(5, 1), '')
+
+    @timing_decorator
+    def test_small_files_use_buffered_path(self):
+        """Test that small files are not mapped"""
+        path = self.write_text('small.csv', 'a\n1\n')
+        with patch('ui.fileio.MappedInput') as mock_mapped, open_text_lines(path) as lines:
+            mock_mapped.assert_not_called()
+            self.assertEqual(list(lines), ['a\n', '1\n'])
+
+    @timing_decorator
+    def test_large_files_use_mmap(self):
+        """Test mapped path for json and preview if file is above threshold"""
+        path = self.write_text('data.json', '[1,\n2,\n3]')
+        with patch('ui.fileio.MMAP_MIN_SIZE', 1), \
+                patch('ui.fileio.MappedInput', wraps=MappedInput) as mock_mapped:
+            self.assertEqual(load_json(path), [1, 2, 3])
+            self.assertEqual(read_preview_text(path, 2), '[1,\n2,\n')
+            self.assertEqual(mock_mapped.call_count, 2)
+
+    @timing_decorator
+    def test_converter_output_is_the_same(self):
+        """Test that csv -> json gives identical output for both paths"""
+        path = self.write_text('data.csv', CSV_DATA)
+        buffered_out = self.folder / 'buffered.json'
+        mapped_out = self.folder / 'mapped.json'
+
+        FileConverter().write_csv_json(path, buffered_out)
+        with patch('ui.fileio.MMAP_MIN_SIZE', 1):
+            FileConverter().write_csv_json(path, mapped_out)
+
+        self.assertEqual(buffered_out.read_bytes(), mapped_out.read_bytes())
+
+
+if __name__ == '__main__':
+    unittest.main()
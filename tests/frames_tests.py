@@ -0,0 +1,126 @@
+"""Tests for animated and multi-page images"""
+
+import tempfile
+from pathlib import Path
+
+import unittest
+
+from PIL import Image, ImageSequence
+
+from ui.converters import FileConverter
+from ui.frames import AnimatedImage, frame_durations
+
+from tests.helpers import timing_decorator
+
+
+DURATIONS = [100, 200, 300]
+COLORS = ['red', 'green', 'blue']
+EXPECTED_COLORS = [(255, 0, 0), (0, 128, 0), (0, 0, 255)]
+
+
+class TestFrames(unittest.TestCase):
+    """Tests for frame by frame convertation of animated images"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.folder = Path(self.tmp_dir.name)
+        self.converter = FileConverter()
+
+        frames = [Image.new('RGB', (16, 8), color) for color in COLORS]
+        self.gif_file = self.folder / 'anim.gif'
+        frames[0].save(self.gif_file, save_all=True, append_images=frames[1:],
+                       duration=DURATIONS, loop=0)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    @timing_decorator
+    def test_animation_is_kept(self):
+        """Test that gif -> webp/png/gif keeps every frame with its duration"""
+        for ext in ('.webp', '.png', '.tiff'):
+            with self.subTest(ext=ext):
+                out = self.folder / f'anim{ext}'
+                self.converter.convert(self.gif_file, out)
+
+                with Image.open(out) as img:
+                    self.assertEqual(img.n_frames, len(COLORS))
+                    if ext != '.tiff':
+                        self.assertEqual(frame_durations(img), DURATIONS)
+                        self.assertEqual(img.tell(), 0)
+                    colors = [frame.convert('RGB').getpixel((0, 0))
+                              for frame in ImageSequence.Iterator(img)]
+                    # Lossy webp changes colors a little
+                    for color, expected in zip(colors, EXPECTED_COLORS, strict=True):
+                        self.assertLessEqual(max(abs(a - b) for a, b in zip(color, expected)), 8)
+
+    @timing_decorator
+    def test_multi_page_tiff(self):
+        """Test that multi-page tiff goes back to animated gif"""
+        tiff_file = self.folder / 'pages.tiff'
+        self.converter.convert(self.gif_file, tiff_file)
+        self.converter.convert(tiff_file, self.folder / 'pages.gif')
+
+        with Image.open(self.folder / 'pages.gif') as img:
+            self.assertEqual(img.n_frames, len(COLORS))
+
+    @timing_decorator
+    def test_frames_get_encoder_modes(self):
+        """Test that every page of CMYK and 16-bit tiff is converted to a mode of the target"""
+        cmyk_file = self.folder / 'cmyk.tiff'
+        pages = [Image.new('CMYK', (8, 8), color) for color in ((0, 255, 255, 0), (255, 0, 255, 0))]
+        pages[0].save(cmyk_file, save_all=True, append_images=pages[1:])
+        for ext in ('.png', '.webp'):
+            with self.subTest(ext=ext):
+                out = self.folder / f'cmyk{ext}'
+                self.converter.convert(cmyk_file, out)
+                with Image.open(out) as img:
+                    colors = [frame.convert('RGB').getpixel((0, 0)) for frame in ImageSequence.Iterator(img)]
+                self.assertEqual(len(colors), 2)
+                self.assertGreater(colors[0][0], 240)
+                self.assertGreater(colors[1][1], 240)
+
+        # 16-bit pages are scaled to 8 bits, not clipped to the same white frame
+        deep_file = self.folder / 'deep.tiff'
+        pages = [Image.new('I;16', (8, 8), value) for value in (1024, 32768, 65535)]
+        pages[0].save(deep_file, save_all=True, append_images=pages[1:])
+        self.converter.convert(deep_file, self.folder / 'deep.webp')
+        with Image.open(self.folder / 'deep.webp') as img:
+            values = [frame.convert('L').getpixel((0, 0)) for frame in ImageSequence.Iterator(img)]
+        self.assertEqual(len(values), 3)
+        for value, expected in zip(values, (4, 128, 255)):
+            self.assertAlmostEqual(value, expected, delta=8)
+
+    @timing_decorator
+    def test_still_target(self):
+        """Test that jpeg gets only the first frame"""
+        out = self.folder / 'first.jpg'
+        self.converter.convert(self.gif_file, out)
+
+        with Image.open(out) as img:
+            self.assertEqual(getattr(img, 'n_frames', 1), 1)
+            self.assertGreater(img.getpixel((0, 0))[0], 200)
+
+    @timing_decorator
+    def test_open_image_is_lazy(self):
+        """Test that animated image is opened as AnimatedImage and frames are decoded on demand"""
+        image, real_format = self.converter.open_image(self.gif_file, '.webp')
+        self.assertIsInstance(image, AnimatedImage)
+        self.assertEqual((real_format, image.n_frames), ('WEBP', 3))
+        self.assertIsNone(image.source)
+
+        frame = image.frame(1)
+        self.assertEqual((frame.mode, frame.size), ('RGBA', (16, 8)))
+        self.assertEqual(frame.getpixel((0, 0))[:3], (0, 128, 0))
+
+        out = self.folder / 'saved.webp'
+        image.save(out, format=real_format, **self.converter.image_save_options(real_format))
+        image.close()
+        with Image.open(out) as img:
+            self.assertEqual(img.n_frames, 3)
+
+        still, _ = self.converter.open_image(self.gif_file, '.jpg')
+        self.assertIsInstance(still, Image.Image)
+
+
+if __name__ == '__main__':
+    unittest.main()
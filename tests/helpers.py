@@ -0,0 +1,18 @@
+"""Helpers shared by all test modules"""
+
+import time
+
+
+def timing_decorator(func):
+    """Timing decorator for performance logging"""
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        final_took_time = time.perf_counter() - start
+        if final_took_time > 1:
+            print(
+                f" WARNING: {func.__name__}: took more than 1.0 second ({final_took_time:.5f})")
+        else:
+            print(f"{func.__name__}: took {final_took_time:.5f} seconds")
+        return result
+    return wrapper
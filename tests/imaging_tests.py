@@ -0,0 +1,162 @@
+"""Tests for optional image encoders and their effort options"""
+
+import tempfile
+from pathlib import Path
+
+import unittest
+from unittest.mock import patch
+
+from PIL import Image
+from PyQt6.QtCore import QSettings
+
+from ui.batch import BatchJob, BatchRunner
+from ui.converters import FileConverter
+from ui.imaging import encoder_available, effort_option, encode, encode_to_size, profile_options
+from ui.settings import load_image_profile, save_image_profile
+from ui.sniffing import FormatSniffer
+
+from tests.helpers import timing_decorator
+
+
+class TestImaging(unittest.TestCase):
+    """Tests for AVIF/JPEG XL targets and encoder speed/effort knobs"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.folder = Path(self.tmp_dir.name)
+        self.png_file = self.folder / 'picture.png'
+        Image.new('P', (32, 16), 3).save(self.png_file)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    @timing_decorator
+    def test_effort_option(self):
+        """Test default and clamped effort values"""
+        self.assertEqual(effort_option('WEBP'), ('method', 6))
+        self.assertEqual(effort_option('AVIF', 99), ('speed', 10))
+        self.assertEqual(effort_option('JXL', 0), ('effort', 1))
+        self.assertIsNone(effort_option('PNG', 3))
+
+    @timing_decorator
+    def test_save_options(self):
+        """Test that effort of the converter goes to the encoder options"""
+        converter = FileConverter(image_effort={'WEBP': 2, 'AVIF': 8})
+
+        self.assertEqual(converter.image_save_options('webp'),
+                         {'quality': 85, 'lossless': False, 'method': 2})
+        self.assertEqual(converter.image_save_options('AVIF'), {'quality': 75, 'speed': 8})
+        self.assertEqual(converter.image_save_options('JXL'), {'quality': 85, 'effort': 7})
+        self.assertEqual(FileConverter().image_save_options('WEBP')['method'], 6)
+
+    @timing_decorator
+    def test_profiles(self):
+        """Test that default profile keeps the smallest settings and effort overrides profile"""
+        converter = FileConverter()
+        self.assertEqual(converter.image_save_options('JPG'),
+                         {'optimize': True, 'quality': 85, 'progressive': True})
+        self.assertEqual(converter.image_save_options('PNG', 'fast'), {'compress_level': 1})
+        self.assertEqual(FileConverter(image_profile='balanced').image_save_options('WEBP')['method'], 4)
+        self.assertEqual(FileConverter(image_profile='fast', image_effort={'WEBP': 5})
+                         .image_save_options('WEBP')['method'], 5)
+        with self.assertRaisesRegex(ValueError, 'profile'):
+            converter.image_save_options('PNG', 'unknown')
+
+        # Options of the profile alone, the effort box shows them without a converter
+        self.assertEqual(profile_options('balanced', 'WEBP')['method'], 4)
+        self.assertEqual(profile_options('fast', 'GIF'), {})
+        with self.assertRaisesRegex(ValueError, 'profile'):
+            profile_options('unknown', 'PNG')
+
+    @timing_decorator
+    def test_job_profile(self):
+        """Test that profile of the batch job is used for its output"""
+        converter = FileConverter()
+        jobs = [BatchJob(self.png_file, self.folder / 'fast.jpg', {'image_profile': 'fast'}),
+                BatchJob(self.png_file, self.folder / 'default.jpg')]
+
+        with patch.object(converter, 'image_save_options', wraps=converter.image_save_options) as options:
+            BatchRunner(converter, workers=1).run(jobs)
+
+        self.assertEqual([job.status for job in jobs], ['done', 'done'])
+        self.assertEqual(sorted(call.args[1] or '' for call in options.call_args_list), ['', 'fast'])
+
+    @timing_decorator
+    def test_encode_to_size(self):
+        """Test that the highest quality which fits the size is chosen"""
+        noise = Image.effect_noise((128, 128), 64).convert('RGB')
+        options = {'quality': 85, 'optimize': True}
+        full_size = len(encode(noise, 'JPEG', options))
+
+        data, quality = encode_to_size(noise, 'JPEG', full_size, options)
+        self.assertEqual((len(data), quality), (full_size, 85))
+
+        max_bytes = full_size // 2
+        data, quality = encode_to_size(noise, 'JPEG', max_bytes, options)
+        self.assertLessEqual(len(data), max_bytes)
+        self.assertGreater(len(encode(noise, 'JPEG', {**options, 'quality': quality + 1})), max_bytes)
+
+        data, quality = encode_to_size(noise, 'JPEG', 10, options)
+        self.assertEqual(quality, 10)
+        self.assertGreater(len(data), 10)
+
+    @timing_decorator
+    def test_write_to_size(self):
+        """Test that converter keeps outputs in max_image_bytes and leaves png as it is"""
+        noise_file = self.folder / 'noise.png'
+        Image.effect_noise((128, 128), 64).convert('RGB').save(noise_file)
+        converter = FileConverter(max_image_bytes=8 * 1024)
+
+        for name in ('small.jpg', 'small.webp'):
+            with self.subTest(name=name):
+                converter.convert(noise_file, self.folder / name)
+                self.assertLessEqual((self.folder / name).stat().st_size, 8 * 1024)
+                with Image.open(self.folder / name) as img:
+                    self.assertEqual(img.size, (128, 128))
+
+        converted_img, _ = converter.open_image(noise_file, '.png')
+        self.assertFalse(converter.uses_target_size(converted_img, 'PNG'))
+        self.assertFalse(FileConverter().uses_target_size(converted_img, 'JPEG'))
+
+    @timing_decorator
+    def test_profile_settings(self):
+        """Test that profile is saved with QSettings and unknown value gives default"""
+        settings = QSettings(str(self.folder / 'settings.ini'), QSettings.Format.IniFormat)
+        with patch('ui.settings.app_settings', return_value=settings):
+            self.assertEqual(load_image_profile(), 'smallest')
+            save_image_profile('fast')
+            self.assertEqual(load_image_profile(), 'fast')
+            save_image_profile('unknown')
+            self.assertEqual(load_image_profile(), 'fast')
+            settings.setValue('images/profile', 'broken')
+            self.assertEqual(load_image_profile(), 'smallest')
+
+    @unittest.skipUnless(encoder_available('AVIF'), "Pillow is built without AVIF")
+    @timing_decorator
+    def test_avif_target(self):
+        """Test palette png -> avif and content detection of the output"""
+        out = self.folder / 'picture.avif'
+        FileConverter(image_effort={'AVIF': 10}).convert(self.png_file, out)
+
+        with Image.open(out) as img:
+            self.assertEqual((img.format, img.size), ('AVIF', (32, 16)))
+        self.assertEqual(FormatSniffer().sniff(out), '.avif')
+
+    @unittest.skipIf(encoder_available('JXL'), "pillow-jxl-plugin is installed")
+    @timing_decorator
+    def test_missing_encoder(self):
+        """Test that missing plugin gives ValueError instead of broken output"""
+        with self.assertRaisesRegex(ValueError, 'not installed'):
+            FileConverter().convert(self.png_file, self.folder / 'picture.jxl')
+        self.assertFalse((self.folder / 'picture.jxl').exists())
+
+    @timing_decorator
+    def test_sniff_jxl(self):
+        """Test JPEG XL codestream and container signatures"""
+        sniffer = FormatSniffer()
+        self.assertEqual(sniffer.sniff_bytes(b'\xff\x0a\xfa\x1f'), '.jxl')
+        self.assertEqual(sniffer.sniff_bytes(b'\x00\x00\x00\x0cJXL \r\n\x87\n\x00'), '.jxl')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""Tests for dropped files scanned in background"""
+
+import sys
+import wave
+import tempfile
+from pathlib import Path
+
+import unittest
+
+from PIL import Image
+from PyQt6.QtTest import QTest
+from PyQt6.QtWidgets import QApplication
+
+from ui.ingest import expand_paths, scan_file, IngestScanner, IngestModel
+from ui.sniffing import FormatSniffer
+
+from tests.helpers import timing_decorator
+
+
+class TestIngest(unittest.TestCase):
+    """Tests for folder walking, header metadata and batched queue updates"""
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication(sys.argv)
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.folder = Path(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def wait_scanned(self, scanner):
+        """Wait until scanner hands over all files"""
+        for _ in range(200):
+            if not scanner.is_scanning():
+                return
+            QTest.qWait(20)
+        self.fail("Scan did not finish")
+
+    @timing_decorator
+    def test_expand_paths(self):
+        """Test that folders are walked and only supported visible files are kept"""
+        (self.folder / 'sub' / '.hidden').mkdir(parents=True)
+        for name in ('a.png', 'sub/b.csv.gz', 'sub/c.doc', '.d.png', 'sub/.hidden/e.png'):
+            (self.folder / name).write_bytes(b'data')
+        single = self.folder / 'sub' / 'c.doc'
+
+        found = [Path(path).relative_to(self.folder).as_posix()
+                 for path in expand_paths([self.folder, single, self.folder / 'missing.png'])]
+        self.assertEqual(found, ['a.png', 'sub/b.csv.gz'])
+
+    @timing_decorator
+    def test_scan_file(self):
+        """Test metadata read from the headers"""
+        sniffer = FormatSniffer()
+        Image.new('RGB', (30, 20)).save(self.folder / 'photo.jpg')
+        info = scan_file(str(self.folder / 'photo.jpg'), sniffer)
+        self.assertEqual((info.format, info.dimensions), ('.jpg', (30, 20)))
+        self.assertIn('30x20', info.describe())
+
+        with wave.open(str(self.folder / 'tone.wav'), 'wb') as wav:
+            wav.setparams((1, 2, 8000, 0, 'NONE', 'not compressed'))  # pylint: disable=no-member
+            wav.writeframes(b'\x00\x00' * 16000)  # pylint: disable=no-member
+        info = scan_file(str(self.folder / 'tone.wav'), sniffer)
+        self.assertEqual(info.duration, 2)
+        self.assertIn('00:02', info.describe())
+
+        # png extension with text inside is reported, not raised
+        (self.folder / 'broken.png').write_text('text', encoding='utf-8')
+        info = scan_file(str(self.folder / 'broken.png'), sniffer)
+        self.assertEqual(info.format, '.txt')
+        self.assertIsNone(info.error)
+        (self.folder / 'cut.png').write_bytes(b'\x89PNG\r\n\x1a\n')
+        self.assertIsNotNone(scan_file(str(self.folder / 'cut.png'), sniffer).error)
+
+    @timing_decorator
+    def test_scanner_batches(self):
+        """Test that many dropped files reach the list in a few inserts, each file once"""
+        for index in range(1000):
+            (self.folder / f'{index:04d}.csv').write_text('a,b\n1,2\n', encoding='utf-8')
+        model = IngestModel()
+        inserts = []
+        model.rowsInserted.connect(lambda *args: inserts.append(args))
+        scanner = IngestScanner(workers=4, flush_ms=50)
+        scanner.scanned.connect(model.add_batch)
+        finished = []
+        scanner.finished.connect(finished.append)
+
+        scanner.enqueue([self.folder])
+        scanner.enqueue([self.folder / '0001.csv'])
+        self.wait_scanned(scanner)
+
+        self.assertEqual(model.rowCount(), 1000)
+        self.assertEqual(finished, [1000])
+        self.assertLess(len(inserts), 100)
+        self.assertEqual(len({info.path for info in model.infos}), 1000)
+
+        scanner.clear()
+        model.clear()
+        scanner.enqueue([self.folder / '0001.csv'])
+        self.wait_scanned(scanner)
+        self.assertEqual(model.rowCount(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+"""Tests for counters and timings of hot GUI paths"""
+
+import unittest
+
+from ui.instrumentation import Instrumentation
+
+from tests.helpers import timing_decorator
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Tests for collected stats"""
+
+    @timing_decorator
+    def test_stats(self):
+        """Test that counts and timings are summed per name"""
+        instruments = Instrumentation(enabled=True)
+        for _ in range(3):
+            instruments.count('player.position')
+        with instruments.timed('player.show_position'):
+            sum(range(1000))
+
+        stats = instruments.snapshot()
+        self.assertEqual(stats['player.position'], (3, 0.0, 0.0))
+        calls, total, longest = stats['player.show_position']
+        self.assertEqual(calls, 1)
+        self.assertGreater(total, 0)
+        self.assertEqual(total, longest)
+        self.assertIn('player.position', instruments.report())
+
+        instruments.reset()
+        self.assertEqual(instruments.snapshot(), {})
+
+    @timing_decorator
+    def test_disabled(self):
+        """Test that nothing is collected when instrumentation is off"""
+        instruments = Instrumentation()
+        instruments.count('player.seek')
+        with instruments.timed('player.show_position'):
+            pass
+        self.assertEqual(instruments.snapshot(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+"""Tests for SQLite job journal and crash-resumable batch runs"""
+
+import os
+import sys
+import sqlite3
+import tempfile
+import subprocess
+from pathlib import Path
+
+import unittest
+
+from ui.batch import BatchJob, BatchRunner
+from ui.journal import JobJournal
+from ui.sync import FolderSync
+from ui.constants import SYNC_JOURNAL_NAME
+
+from tests.helpers import timing_decorator
+
+
+# Sync which dies like a killed process right after the second job is recorded
+CRASHING_SYNC = """
+import os, sys
+from ui.batch import BatchRunner
+from ui.sync import FolderSync
+
+class CrashingSync(FolderSync):
+    recorded = 0
+
+    def record_job(self, job):
+        super().record_job(job)
+        CrashingSync.recorded += 1
+        if CrashingSync.recorded == 2:
+            os._exit(3)
+
+CrashingSync(sys.argv[1], sys.argv[2], {'.csv': '.json'}, runner=BatchRunner(workers=1)).run()
+"""
+
+
+class TestJournal(unittest.TestCase):
+    """Tests for journaled jobs"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.folder = Path(self.tmp_dir.name)
+        self.source = self.folder / 'source'
+        self.output = self.folder / 'output'
+        self.source.mkdir()
+        for name in 'abcd':
+            (self.source / f'{name}.csv').write_text(f"a,b\n{name},1\n", encoding='utf-8')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def make_job(self, name):
+        """Job csv -> json of the source file"""
+        return BatchJob(self.source / f'{name}.csv', self.output / f'{name}.json', {'target': '.json'})
+
+    @timing_decorator
+    def test_resume_after_crash(self):
+        """Test that restart after a killed run converts only unfinished jobs"""
+        project = Path(__file__).resolve().parent.parent
+        result = subprocess.run([sys.executable, '-c', CRASHING_SYNC, str(self.source), str(self.output)],
+                                cwd=project, check=False)
+        self.assertEqual(result.returncode, 3)
+        with JobJournal(self.output / SYNC_JOURNAL_NAME) as journal:
+            self.assertEqual(journal.counts(), {'done': 2, 'pending': 2})
+
+        summary = FolderSync(self.source, self.output, {'.csv': '.json'},
+                             runner=BatchRunner(workers=1)).run()
+        self.assertEqual((summary['resumed'], summary['converted']), (2, 2))
+        self.assertEqual(sorted(path.name for path in self.output.glob('?.json')),
+                         ['a.json', 'b.json', 'c.json', 'd.json'])
+
+        summary = FolderSync(self.source, self.output, {'.csv': '.json'}).run()
+        self.assertEqual((summary['unchanged'], summary['converted']), (4, 0))
+
+    @timing_decorator
+    def test_changed_files_run_again(self):
+        """Test that changed input or damaged output is converted again"""
+        runner = BatchRunner(workers=1)
+        with JobJournal(self.folder / 'jobs.sqlite3') as journal:
+            runner.run([self.make_job(name) for name in 'abc'], journal=journal)
+            self.assertEqual(journal.counts(), {'done': 3})
+
+            (self.source / 'a.csv').write_text("a,b\nchanged,1\n", encoding='utf-8')
+            damaged = self.output / 'b.json'
+            damaged.write_bytes(b'x' * damaged.stat().st_size)
+            os.utime(damaged, ns=(0, 0))
+
+            jobs = runner.run([self.make_job(name) for name in 'abc'], journal=journal)
+            self.assertEqual([job.resumed for job in jobs], [False, False, True])
+            self.assertIn('changed', (self.output / 'a.json').read_text(encoding='utf-8'))
+            self.assertNotEqual(damaged.read_bytes(), b'x' * damaged.stat().st_size)
+
+    @timing_decorator
+    def test_resume_unfinished(self):
+        """Test that jobs written but not finished are run by resume"""
+        path = self.folder / 'jobs.sqlite3'
+        with JobJournal(path) as journal:
+            journal.add([self.make_job('a'), self.make_job('b')])
+            self.assertEqual([Path(job.out).name for job in journal.unfinished()], ['a.json', 'b.json'])
+
+        done = []
+        with JobJournal(path) as journal:
+            BatchRunner(workers=2).resume(journal, on_done=done.append)
+            self.assertEqual(journal.unfinished(), [])
+            self.assertEqual(journal.counts(), {'done': 2})
+        self.assertEqual(len(done), 2)
+
+        # Journal of other version is started anew
+        with sqlite3.connect(path) as connection:
+            connection.execute("PRAGMA user_version=99")
+        connection.close()
+        with JobJournal(path) as journal:
+            self.assertEqual(journal.counts(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+"""Tests for JSON Lines (NDJSON) format"""
+
+import json
+import tempfile
+from pathlib import Path
+
+import unittest
+from unittest.mock import patch
+
+from ui.converters import FileConverter
+from ui.fileio import iter_json_lines
+from ui.sniffing import FormatSniffer
+from ui.tabular import tabular_available
+
+from tests.helpers import timing_decorator
+
+
+ROWS = [
+    {"id": 1, "name": "a"},
+    {"id": 2, "name": "привет", "extra": None},
+    {"id": 3.5, "name": "x\ny"},
+]
+
+
+class TestJsonLines(unittest.TestCase):
+    """Tests for streaming JSON Lines readers and writers"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.folder = Path(self.tmp_dir.name)
+        self.converter = FileConverter()
+
+        self.jsonl_file = self.folder / 'data.jsonl'
+        self.jsonl_file.write_text(
+            '\n'.join(json.dumps(row) for row in ROWS[:2]) + '\n\n' + json.dumps(ROWS[2]) + '\n',
+            encoding='utf-8')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def convert(self, inp, ext):
+        """Convert inp to the file with ext extension"""
+        out = self.folder / f'{Path(inp).stem}_{ext.lstrip(".")}{ext}'
+        self.converter.convert(inp, out)
+        return out
+
+    @timing_decorator
+    def test_iter_json_lines(self):
+        """Test line by line reading for buffered and mapped files"""
+        self.assertEqual(list(iter_json_lines(self.jsonl_file)), ROWS)
+        with patch('ui.fileio.MMAP_MIN_SIZE', 1):
+            self.assertEqual(list(iter_json_lines(self.jsonl_file)), ROWS)
+
+        self.jsonl_file.write_text('{"a": 1}\n{"a": \n', encoding='utf-8')
+        with self.assertRaisesRegex(ValueError, 'Line 2'):
+            list(iter_json_lines(self.jsonl_file))
+
+    @timing_decorator
+    def test_to_json(self):
+        """Test json lines -> json gives the same file as json.dumps"""
+        with patch('ui.converters.JSON_LINES_CHUNK_ROWS', 2):
+            out = self.convert(self.jsonl_file, '.json')
+
+        self.assertEqual(out.read_text(encoding='utf-8'),
+                         json.dumps(ROWS, ensure_ascii=False, indent=4))
+
+    @timing_decorator
+    def test_to_csv_and_txt(self):
+        """Test that columns of all rows are in csv"""
+        out = self.convert(self.jsonl_file, '.csv')
+        self.assertEqual(out.read_text(encoding='utf-8'),
+                         'id,name,extra\n1,a,\n2,привет,\n3.5,"x\ny",\n')
+
+        out = self.convert(self.jsonl_file, '.txt')
+        self.assertTrue(out.read_text(encoding='utf-8').startswith('id: 1\nname: a\n\nid: 2\n'))
+
+    @timing_decorator
+    def test_from_csv_and_json(self):
+        """Test csv/json -> json lines -> json"""
+        csv_file = self.folder / 'data.csv'
+        csv_file.write_text('a,b\n1,"x\ny"\n', encoding='utf-8')
+        out = self.convert(csv_file, '.ndjson')
+        self.assertEqual(out.read_text(encoding='utf-8'), '{"a": "1", "b": "x\\ny"}\n')
+
+        json_file = self.folder / 'rows.json'
+        json_file.write_text(json.dumps(ROWS), encoding='utf-8')
+        out = self.convert(json_file, '.jsonl')
+        self.assertEqual(list(iter_json_lines(out)), ROWS)
+
+    @timing_decorator
+    def test_sniffing(self):
+        """Test that json lines are told apart from json"""
+        sniffer = FormatSniffer()
+        self.assertEqual(sniffer.sniff(self.jsonl_file), '.jsonl')
+
+        mislabelled = self.folder / 'logs.json'
+        mislabelled.write_bytes(self.jsonl_file.read_bytes())
+        self.assertEqual(sniffer.detect(mislabelled, '.json'), '.jsonl')
+
+        one_line = self.folder / 'one.ndjson'
+        one_line.write_text('{"a": 1}\n', encoding='utf-8')
+        self.assertEqual(sniffer.detect(one_line, '.ndjson'), '.ndjson')
+
+        pretty = self.folder / 'pretty.json'
+        pretty.write_text(json.dumps(ROWS, indent=4), encoding='utf-8')
+        self.assertEqual(sniffer.sniff(pretty), '.json')
+
+    @unittest.skipUnless(tabular_available(), "pyarrow is not installed")
+    @timing_decorator
+    def test_parquet_schema_is_merged(self):
+        """Test that types of all rows are used for parquet columns"""
+        out = self.convert(self.convert(self.jsonl_file, '.parquet'), '.jsonl')
+
+        self.assertEqual(list(iter_json_lines(out)), [
+            {"id": 1.0, "name": "a", "extra": None},
+            {"id": 2.0, "name": "привет", "extra": None},
+            {"id": 3.5, "name": "x\ny", "extra": None},
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,7 +8,6 @@
 
 import sys
 import json
-import time
 from pathlib import Path
 
 import unittest
@@ -22,23 +21,13 @@ from PyQt6.QtMultimediaWidgets import QVideoWidget
 from PyQt6.QtWidgets import QApplication, QPlainTextEdit
 
 from ui.main_tab import ConverterTab
+from ui.atomic import OutputSync
+from ui.converters import FileConverter
+from ui.ingest import FileInfo
 from ui.constants import (SUPPORTED_CONVERT_EXTENSIONS_PICTURES, SUPPORTED_CONVERT_EXTENSIONS_FILES,
                           SUPPORTED_CONVERT_EXTENSIONS_VIDEO_AUDIO)
 
-
-def timing_decorator(func):
-    """Timing decorator for performance logging"""
-    def wrapper(*args, **kwargs):
-        start = time.perf_counter()
-        result = func(*args, **kwargs)
-        final_took_time = time.perf_counter() - start
-        if final_took_time > 1:
-            print(
-                f" WARNING: {func.__name__}: took more than 1.0 second ({final_took_time:.5f})")
-        else:
-            print(f"{func.__name__}: took {final_took_time:.5f} seconds")
-        return result
-    return wrapper
+from tests.helpers import timing_decorator
 
 
 class TestMainTab(unittest.TestCase):
@@ -67,6 +56,17 @@ class TestMainTab(unittest.TestCase):
 
         self.mock_audio_video_player()
 
+        # Outputs are written to temporary files which are renamed to the chosen path
+        commit = patch.object(OutputSync, 'commit')
+        self.commit = commit.start()
+        self.addCleanup(commit.stop)
+
+    def written_path(self, out):
+        """Temporary path written instead of out, it replaces out when complete"""
+        tmp, committed = self.commit.call_args.args
+        self.assertEqual(committed, out)
+        return tmp
+
     def mock_audio_video_player(self):
         """Mock audio/video player methods"""
         self.previewer.player = Mock()
@@ -127,12 +127,34 @@ class TestMainTab(unittest.TestCase):
     @timing_decorator
     def test_get_output_list_file(self):
         """Test for doc-type file extension"""
+        with patch('ui.converters.tabular_available', return_value=True):
+            self.conv_tab.converter.file_converter = FileConverter()
         self.side_funcs.extension_format = '.csv'
         result = self.side_funcs.get_output_file_format_list()
         self.assertNotIn('.csv', result)
         self.assertEqual(set(result), set(
             SUPPORTED_CONVERT_EXTENSIONS_FILES) - {'.csv'})
 
+    @timing_decorator
+    def test_get_output_list_without_pyarrow(self):
+        """Test that parquet/arrow targets are not offered without pyarrow"""
+        with patch('ui.converters.tabular_available', return_value=False):
+            self.conv_tab.converter.file_converter = FileConverter()
+        self.side_funcs.extension_format = '.csv'
+        result = self.side_funcs.get_output_file_format_list()
+        self.assertEqual(set(result), {'.txt', '.json', '.jsonl', '.ndjson'})
+
+        self.side_funcs.current_file = 'test.csv'
+        self.conv_tab.drop_down_list.currentText.return_value = '.parquet'
+        self.side_funcs._convert_files = Mock()
+        self.conv_tab.converter.convert_files()
+
+        self.side_funcs._convert_files.assert_not_called()
+        message_call = [call.args[0]
+                        for call in self.fake_main_window.statusBar.return_value.showMessage.call_args_list]
+        self.assertIn("Convertation .csv -> .parquet is not supported", message_call)
+        self.assertNotIn("Successfully converted", message_call)
+
     @timing_decorator
     def test_get_output_list_video_audio(self):
         """Test for video-type file extension"""
@@ -167,6 +189,45 @@ class TestMainTab(unittest.TestCase):
 
     # Tests for upload_inpt_file method
 
+    @timing_decorator
+    @patch('pathlib.Path.is_file', return_value=True)
+    def test_enqueue_one_dropped_file(self, _mock_is_file):
+        """Test that one dropped file is opened and scanned for the queue"""
+        self.conv_tab.ingest.enqueue = Mock()
+
+        self.side_funcs.enqueue_files(['photo.png'])
+
+        self.assertEqual(self.side_funcs.current_file, 'photo.png')
+        self.assertEqual(self.side_funcs.extension_format, '.png')
+        self.conv_tab.ingest.enqueue.assert_called_once_with(['photo.png'])
+
+    @timing_decorator
+    def test_enqueue_nothing_dropped(self):
+        """Test that drop without local files is reported"""
+        self.conv_tab.ingest.enqueue = Mock()
+        self.side_funcs.enqueue_files([])
+
+        self.conv_tab.ingest.enqueue.assert_not_called()
+        self.fake_main_window.statusBar().showMessage.assert_called_with(
+            "Only local files can be dropped")
+
+    @timing_decorator
+    def test_queue_batches_shown_and_cleared(self):
+        """Test that scanned batches fill the queue list and clear empties it"""
+        infos = [FileInfo(f'/data/{index}.csv', '.csv', 10) for index in range(3)]
+        self.side_funcs.on_files_scanned(infos[:2])
+        self.side_funcs.on_files_scanned(infos[2:])
+
+        self.assertEqual(self.conv_tab.queue_model.rowCount(), 3)
+        self.assertFalse(self.conv_tab.queue_view.isHidden())
+
+        self.side_funcs.open_queued_file(self.conv_tab.queue_model.index(1))
+        self.assertEqual(self.side_funcs.current_file, '/data/1.csv')
+
+        self.side_funcs.clear_queue()
+        self.assertEqual(self.conv_tab.queue_model.rowCount(), 0)
+        self.assertTrue(self.conv_tab.queue_view.isHidden())
+
     @timing_decorator
     @patch("PyQt6.QtWidgets.QFileDialog.getOpenFileName")
     def test_upload_inpt_file_no_choosen(self, mock_dialog):
@@ -311,28 +372,57 @@ class TestMainTab(unittest.TestCase):
 
     @timing_decorator
     def test_clear_video_prev(self):
-        """Test for clear_vid_preview method"""
+        """Test for clear_vid_preview method, player and widgets are kept for the next file"""
+        player = self.previewer.player
         self.previewer.clear_vid_preview()
 
-        self.previewer.player.stop.assert_called_once()
-        self.previewer.player.setVideoOutput.assert_called_once_with(None)
-        self.previewer.player.setAudioOutput.assert_called_once_with(None)
-        self.previewer.player.setSource.assert_called_once_with(QUrl())
-        self.previewer.player.positionChanged.disconnect.assert_called_once()
-        self.previewer.player.durationChanged.disconnect.assert_called_once()
-        self.previewer.player.disconnect.assert_called_once()
+        player.stop.assert_called_once()
+        player.setSource.assert_called_once_with(QUrl())
+        player.setVideoOutput.assert_not_called()
+        player.setAudioOutput.assert_not_called()
+        player.disconnect.assert_not_called()
+        self.assertIs(self.previewer.player, player)
 
         widgets = [self.previewer.video_preview_widget, self.previewer.play_btn,
                    self.previewer.pause_btn, self.previewer.current_vid_time,
-                   self.previewer.total_vid_time, self.previewer.vid_slider_layout]
+                   self.previewer.total_vid_time]
 
         for elem in widgets:
-            elem.setParent.assert_called_once_with(None)
-            elem.deleteLater.assert_called_once()
+            elem.hide.assert_called()
+            elem.setParent.assert_not_called()
+            elem.deleteLater.assert_not_called()
 
         # Reset mock for next tests
         self.previewer.player.setSource.reset_mock()
 
+    @timing_decorator
+    @patch('pathlib.Path.exists', return_value=True)
+    def test_preview_widgets_reused(self, _mock_exists):
+        """Test that switching video -> text -> video reuses the same widgets"""
+        self.previewer.check_file_to_play = Mock(side_effect=['first.mp4', 'second.mp4'])
+        self.previewer.set_up_video_audio_output = Mock()
+        video_widget = self.previewer.video_preview_widget
+
+        self.previewer.preview_video(prev_title=self.conv_tab.preview_title,
+                                     prev_info=self.conv_tab.preview_info,
+                                     prev_label=self.conv_tab.preview_label, curr_file='first.mp4')
+        self.assertEqual(self.previewer.pool.active, 'video')
+
+        self.previewer.show_ui_for_doc_type_files(prev_title=self.conv_tab.preview_title,
+                                                  prev_info=self.conv_tab.preview_info,
+                                                  prev_label=self.conv_tab.preview_label, content='text')
+        self.assertEqual(self.previewer.pool.active, 'text')
+        self.previewer.player.stop.assert_called()
+        video_widget.hide.assert_called()
+
+        self.previewer.preview_video(prev_title=self.conv_tab.preview_title,
+                                     prev_info=self.conv_tab.preview_info,
+                                     prev_label=self.conv_tab.preview_label, curr_file='second.mp4')
+        self.assertIs(self.previewer.video_preview_widget, video_widget)
+        self.previewer.text_file_prev.hide.assert_called()
+        self.assertIsNone(self.previewer.last_loaded_file)
+        self.assertEqual(self.previewer.set_up_video_audio_output.call_count, 2)
+
     # Tests for convertation logic
     @timing_decorator
     def test_save_converted_file(self):
@@ -403,7 +493,7 @@ class TestMainTab(unittest.TestCase):
 
         mock_open_file.assert_any_call(
             'test.csv', newline='', encoding='utf-8')
-        mock_open_file.assert_any_call('output.txt', 'w', encoding='utf-8')
+        mock_open_file.assert_any_call(self.written_path('output.txt'), 'w', encoding='utf-8')
 
         self.fake_main_window.statusBar.return_value.showMessage.assert_called_with(
             "Finished converting csv to txt")
@@ -419,7 +509,7 @@ class TestMainTab(unittest.TestCase):
         self.conv_tab.converter.get_save_filename.assert_called_once()
 
         mock_open_file.assert_any_call('test.json', 'r', encoding='utf-8')
-        mock_open_file.assert_any_call('output.txt', 'w', encoding='utf-8')
+        mock_open_file.assert_any_call(self.written_path('output.txt'), 'w', encoding='utf-8')
 
         self.fake_main_window.statusBar.return_value.showMessage.assert_called_with(
             "Finished converting json to txt")
@@ -439,7 +529,7 @@ class TestMainTab(unittest.TestCase):
         self.conv_tab.converter.get_save_filename.assert_called_once()
 
         mock_open_file.assert_any_call('test.json', 'r', encoding='utf-8')
-        mock_open_file.assert_any_call('output.txt', 'w', encoding='utf-8')
+        mock_open_file.assert_any_call(self.written_path('output.txt'), 'w', encoding='utf-8')
 
         self.fake_main_window.statusBar.return_value.showMessage.assert_called_with(
             "Finished converting json to txt")
@@ -456,7 +546,7 @@ class TestMainTab(unittest.TestCase):
 
         mock_open_file.assert_any_call(
             'test.csv', newline='', encoding='utf-8')
-        mock_open_file.assert_any_call('output.json', 'w', encoding='utf-8')
+        mock_open_file.assert_any_call(self.written_path('output.json'), 'w', encoding='utf-8')
 
         # file_handle = mock_open_file.return_value.__enter__()
         file_handle = mock_open_file.return_value
@@ -484,7 +574,7 @@ class TestMainTab(unittest.TestCase):
 
         mock_open_file.assert_any_call('test.json', 'r', encoding='utf-8')
         mock_open_file.assert_any_call(
-            'output.csv', 'w', newline='', encoding='utf-8')
+            self.written_path('output.csv'), 'w', newline='', encoding='utf-8')
 
         # file_handle = mock_open_file.return_value.__enter__()
         file_handle = mock_open_file.return_value
@@ -506,7 +596,7 @@ class TestMainTab(unittest.TestCase):
         self.conv_tab.converter.convert_json_csv('input.json')
 
         mock_open_file.assert_any_call(
-            'output.csv', 'w', newline='', encoding='utf-8')
+            self.written_path('output.csv'), 'w', newline='', encoding='utf-8')
 
         # file_handle = mock_open_file.return_value.__enter__()
         file_handle = mock_open_file.return_value
@@ -544,6 +634,7 @@ class TestMainTab(unittest.TestCase):
         called_cmd = mock_run.call_args[0][0]
         self.assertIn('ffmpeg', called_cmd[0])
         self.assertIn('-i', called_cmd)
+        self.assertIn(self.written_path('output.mp4'), called_cmd)
         status_bar_calls = [
             call.args[0] for call in self.fake_main_window.statusBar.return_value.showMessage.call_args_list]
         self.assertIn("Finished ffmpeg", status_bar_calls)
@@ -701,7 +792,7 @@ class TestMainTab(unittest.TestCase):
         self.conv_tab.converter.save_img('jpeg', mock_img)
 
         mock_img.save.assert_called_with(
-            'out.jpeg', format='jpeg', optimize=True, quality=85, progressive=True)
+            self.written_path('out.jpeg'), format='jpeg', optimize=True, quality=85, progressive=True)
 
         message_call = [call.args[0]
                         for call in self.fake_main_window.statusBar.return_value.showMessage.call_args_list]
@@ -716,7 +807,7 @@ class TestMainTab(unittest.TestCase):
         self.conv_tab.converter.save_img('png', mock_img)
 
         mock_img.save.assert_called_with(
-            'out.png', format='png', optimize=True, compress_level=8)
+            self.written_path('out.png'), format='png', optimize=True, compress_level=8)
 
         message_call = [call.args[0]
                         for call in self.fake_main_window.statusBar.return_value.showMessage.call_args_list]
@@ -731,7 +822,7 @@ class TestMainTab(unittest.TestCase):
         self.conv_tab.converter.save_img('webp', mock_img)
 
         mock_img.save.assert_called_with(
-            'out.webp', format='webp', quality=85, lossless=False, method=6)
+            self.written_path('out.webp'), format='webp', quality=85, lossless=False, method=6)
 
         message_call = [call.args[0]
                         for call in self.fake_main_window.statusBar.return_value.showMessage.call_args_list]
@@ -888,15 +979,43 @@ class TestMainTab(unittest.TestCase):
     def test_update_slider_pos_set_range_and_total_text(self):
         """Testing ifupdate_slide_pos updating normaly if all expected inputs are right (slder and text)"""
         self.previewer.video_slider = Mock(name='video_slider')
+        self.previewer.video_slider.isSliderDown.return_value = False
         duration = 65000
         expected_time = self.previewer.format_time(duration)
 
         self.previewer.update_slider_pos(duration)
+        self.previewer.position_updates.flush()
 
         self.previewer.video_slider.setValue.assert_called_once_with(duration)
         self.previewer.current_vid_time.setText.assert_called_once_with(
             expected_time)
 
+    @timing_decorator
+    def test_update_slider_pos_coalesced(self):
+        """Testing that many positions between two ticks redraw slider once and label once per second"""
+        self.previewer.video_slider = Mock(name='video_slider')
+        self.previewer.video_slider.isSliderDown.return_value = False
+
+        for position in range(60000, 60900, 10):
+            self.previewer.update_slider_pos(position)
+        self.previewer.position_updates.flush()
+        self.previewer.update_slider_pos(60950)
+        self.previewer.position_updates.flush()
+
+        self.assertEqual(self.previewer.video_slider.setValue.call_count, 2)
+        self.previewer.video_slider.setValue.assert_called_with(60950)
+        self.previewer.current_vid_time.setText.assert_called_once_with('01:00')
+
+    @timing_decorator
+    def test_slider_drag_seeks_once(self):
+        """Testing that slider drag seeks to the last position when it is released"""
+        for position in (1000, 2000, 3000):
+            self.previewer.video_slider.sliderMoved.emit(position)
+        self.previewer.player.setPosition.assert_not_called()
+
+        self.previewer.video_slider.sliderReleased.emit()
+        self.previewer.player.setPosition.assert_called_once_with(3000)
+
     @timing_decorator
     def test_format_time_return_correct_vals(self):
         """Checking if format_time method converts time correctly"""
@@ -983,6 +1102,22 @@ class TestMainTab(unittest.TestCase):
         mock_fromimage.assert_called_once_with(mock_imgqt.return_value)
         self.assertEqual(result, mock_fromimage.return_value)
 
+    @timing_decorator
+    @patch('ui.utils.QPixmap.fromImage')
+    @patch('ui.utils.ImageQt')
+    def test_pil_to_pixmap_native_mode(self, mock_imgqt, mock_fromimage):
+        """Test if pil_to_pixmap method shows grey and palette images without convertation"""
+        for mode in ('L', 'P'):
+            with self.subTest(mode=mode):
+                pil_img = Image.new(mode, (10, 10))
+                pil_img.convert = Mock(wraps=pil_img.convert)
+
+                result = self.previewer.pil_to_pixmap(pil_img)
+
+                pil_img.convert.assert_not_called()
+                mock_imgqt.assert_called_with(pil_img)
+                self.assertEqual(result, mock_fromimage.return_value)
+
     @timing_decorator
     @patch('ui.utils.QPixmap.fromImage')
     @patch('ui.utils.ImageQt')
@@ -1100,15 +1235,18 @@ class TestMainTab(unittest.TestCase):
         self.previewer.convtd_file_content = "TEST"
 
         with patch.object(self.previewer, "read_convtd_data_from_doc_type_files") as mock_read, \
-                patch.object(self.previewer, "show_ui_for_doc_type_files") as mock_show:
+                patch.object(self.previewer, "show_ui_for_doc_type_files") as mock_show, \
+                patch('ui.utils.load_document', return_value="LOADED") as mock_load:
 
             self.previewer.preview_file(prev_title=self.conv_tab.preview_title,
                                         prev_info=self.conv_tab.preview_info,
                                         prev_label=self.conv_tab.preview_label,
                                         curr_file=self.conv_tab.converter.current_file)
+            self.previewer.preview_loader.wait()
 
+            mock_load.assert_called_once_with(Path("/test/output.txt").resolve())
             mock_read.assert_called_once_with(
-                target_file=Path("/test/output.txt").resolve())
+                target_file=Path("/test/output.txt").resolve(), content="LOADED")
             mock_show.assert_called_with(prev_title=self.conv_tab.preview_title,
                                          prev_info=self.conv_tab.preview_info,
                                          prev_label=self.conv_tab.preview_label, content="TEST")
@@ -1119,16 +1257,37 @@ class TestMainTab(unittest.TestCase):
         self.previewer.converter.doc_file_path = None
         self.conv_tab.converter.current_file = "/test/current.json"
 
-        with patch.object(self.previewer,
-                          "read_convtd_data_from_doc_type_files", side_effect=Exception('fail')), \
+        with patch('ui.utils.load_document', side_effect=Exception('fail')), \
+                patch.object(self.previewer, "show_ui_for_doc_type_files") as mock_show:
+
+            self.previewer.preview_file(prev_title=self.conv_tab.preview_title,
+                                        prev_info=self.conv_tab.preview_info,
+                                        prev_label=self.conv_tab.preview_label,
+                                        curr_file=self.conv_tab.converter.current_file)
+            self.previewer.preview_loader.wait()
+
+            mock_show.assert_not_called()
+            message_call = [call.args[0]
+                            for call in self.fake_main_window.statusBar.return_value.showMessage.call_args_list]
+            self.assertIn("Failed to load preview: fail", message_call)
+
+    @timing_decorator
+    def test_preview_file_cancelled_on_reset(self):
+        """Test that preview of reset file is not shown"""
+        self.previewer.converter.doc_file_path = None
+
+        with patch('ui.utils.load_document', return_value="LOADED"), \
                 patch.object(self.previewer, "show_ui_for_doc_type_files") as mock_show:
 
-            with self.assertRaises(Exception):
-                self.previewer.preview_file(prev_title=self.conv_tab.preview_title,
-                                            prev_info=self.conv_tab.preview_info,
-                                            prev_label=self.conv_tab.preview_label,
-                                            curr_file=self.conv_tab.converter.current_file)
-                mock_show.assert_not_called()
+            self.previewer.preview_file(prev_title=self.conv_tab.preview_title,
+                                        prev_info=self.conv_tab.preview_info,
+                                        prev_label=self.conv_tab.preview_label,
+                                        curr_file="/test/current.json")
+            self.side_funcs.reset_current_file()
+            self.previewer.preview_loader.wait()
+
+            mock_show.assert_not_called()
+            self.assertFalse(self.conv_tab.loading_bar.isVisibleTo(self.conv_tab))
 
     # Tests for help_funcs: set_up_video_audio_output; check_file_to_play
     @timing_decorator
@@ -1274,6 +1433,37 @@ class TestMainTab(unittest.TestCase):
     #         self.assertEqual(result, 'test.png')
     #         self.assertEqual(self.previewer.new_pixmap, 'pixmap')
 
+    @timing_decorator
+    def test_open_zoom_view_without_image(self):
+        """Test that zoom window needs uploaded image"""
+        self.side_funcs.current_file = 'test.json'
+        self.side_funcs.extension_format = '.json'
+
+        with patch('ui.utils.ImageViewerDialog') as mock_dialog:
+            self.previewer.open_zoom_view()
+            self.previewer.zoom_loader.wait()
+
+        mock_dialog.assert_not_called()
+        message_call = [call.args[0]
+                        for call in self.fake_main_window.statusBar.return_value.showMessage.call_args_list]
+        self.assertIn("Upload image first", message_call)
+
+    @timing_decorator
+    def test_open_compare_view_without_conversion(self):
+        """Test that compare window needs converted image"""
+        self.side_funcs.current_file = 'test.png'
+        self.side_funcs.extension_format = '.png'
+        self.previewer.converter.converted_output_image = None
+
+        with patch('ui.utils.CompareDialog') as mock_dialog:
+            self.previewer.open_compare_view()
+            self.previewer.compare_loader.wait()
+
+        mock_dialog.assert_not_called()
+        message_call = [call.args[0]
+                        for call in self.fake_main_window.statusBar.return_value.showMessage.call_args_list]
+        self.assertIn("Convert image first", message_call)
+
     # Tests for preview_picture method
 
     @timing_decorator
@@ -1301,6 +1491,7 @@ class TestMainTab(unittest.TestCase):
                                        prev_info=self.conv_tab.preview_info,
                                        prev_label=self.conv_tab.preview_label,
                                        curr_file='fake.png', convert_file=None)
+        self.previewer.preview_loader.wait()
 
         message_call = [call.args[0]
                         for call in self.fake_main_window.statusBar.return_value.showMessage.call_args_list]
@@ -1319,6 +1510,7 @@ class TestMainTab(unittest.TestCase):
                                        prev_info=self.conv_tab.preview_info,
                                        prev_label=self.conv_tab.preview_label,
                                        curr_file='fake.png', convert_file=None)
+        self.previewer.preview_loader.wait()
 
         message_call = [call.args[0]
                         for call in self.fake_main_window.statusBar.return_value.showMessage.call_args_list]
@@ -1338,6 +1530,7 @@ class TestMainTab(unittest.TestCase):
                                        prev_info=self.conv_tab.preview_info,
                                        prev_label=self.conv_tab.preview_label,
                                        curr_file='fake.png', convert_file=None)
+        self.previewer.preview_loader.wait()
 
         self.previewer.setup_ui_preview_picture.assert_called_once_with(
             prev_title=self.conv_tab.preview_title, prev_info=self.conv_tab.preview_info,
@@ -0,0 +1,168 @@
+"""Tests for waveform and thumbnail strips of audio/video files"""
+
+import sys
+import time
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+from unittest.mock import patch
+
+import unittest
+
+from PIL import Image
+from PyQt6.QtWidgets import QApplication
+
+from ui.media import (FrameSampler, MediaStrips, ffmpeg_available, thumbnail_strip, waveform,
+                      thumbnails_command)
+from ui.previews import load_media_strip
+from ui.scrub import ScrubStrip
+
+from tests.helpers import timing_decorator
+
+
+class TestMedia(unittest.TestCase):
+    """Tests for strips made by one ffmpeg pass and scrubbing"""
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication(sys.argv)
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.folder = Path(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def make_media(self, name, sources):
+        """Media file made by ffmpeg from lavfi sources"""
+        path = self.folder / name
+        command = ['ffmpeg', '-v', 'error', '-y']
+        for source in sources:
+            command += ['-f', 'lavfi', '-i', source]
+        subprocess.run(command + ['-g', '10', str(path)], check=True)
+        return path
+
+    @timing_decorator
+    def test_sampler_even(self):
+        """Test that kept frames are evenly spaced for any stream length"""
+        for total in (0, 3, 12, 13, 100, 1001):
+            with self.subTest(total=total):
+                sampler = FrameSampler(5)
+                for index in range(total):
+                    sampler.add(index)
+                self.assertLess(len(sampler.frames), 10)
+                picked = sampler.picked()
+                self.assertEqual(len(picked), min(total, 5))
+                self.assertEqual(picked, sorted(picked))
+                if total > 10:
+                    self.assertEqual(picked[0], 0)
+                    self.assertGreaterEqual(picked[-1], total // 2)
+
+    @timing_decorator
+    def test_strips_cached(self):
+        """Test that ffmpeg runs once per file until it is changed"""
+        video = self.folder / 'clip.mp4'
+        video.write_bytes(b'video')
+        audio = self.folder / 'song.mp3'
+        audio.write_bytes(b'audio')
+        strips = MediaStrips(cache_size=1)
+        frame = Image.new('RGB', (4, 2))
+
+        with patch('ui.media.thumbnail_strip', return_value=frame) as thumbnails, \
+                patch('ui.media.waveform', return_value=frame) as wave:
+            self.assertIs(strips.strip(video), frame)
+            self.assertIs(strips.strip(video), frame)
+            thumbnails.assert_called_once()
+
+            strips.strip(audio)
+            wave.assert_called_once()
+            thumbnails.assert_called_once()
+
+            # Video without picture gets waveform, cache keeps one strip
+            thumbnails.return_value = None
+            strips.strip(video)
+            self.assertEqual(thumbnails.call_count, 2)
+            self.assertEqual(wave.call_count, 2)
+            self.assertEqual(len(strips.cache), 1)
+
+        self.assertIn('nokey', thumbnails_command(video))
+
+    @timing_decorator
+    def test_unreadable_file_cached(self):
+        """Test that ffmpeg is not run again for the file it can not read"""
+        audio = self.folder / 'broken.mp3'
+        audio.write_bytes(b'audio')
+        strips = MediaStrips()
+
+        with patch('ui.media.waveform', side_effect=RuntimeError("Invalid data")) as wave:
+            self.assertIsNone(strips.strip(audio))
+            with self.assertRaises(RuntimeError):
+                load_media_strip(strips, audio)
+            wave.assert_called_once()
+
+    @timing_decorator
+    def test_cancel_kills_ffmpeg(self):
+        """Test that ffmpeg of the cancelled strip is killed and nothing is cached"""
+        video = self.folder / 'clip.mp4'
+        video.write_bytes(b'video')
+        strips = MediaStrips()
+        errors = []
+
+        def load():
+            try:
+                strips.strip(video)
+            except RuntimeError as e:
+                errors.append(e)
+
+        slow = [sys.executable, '-c', 'import time; time.sleep(30)']
+        with patch('ui.media.thumbnails_command', return_value=slow), \
+                patch('ui.media.waveform') as wave:
+            thread = threading.Thread(target=load)
+            thread.start()
+            while not any(runs.processes for runs in list(strips.runs)):
+                time.sleep(0.01)
+            strips.cancel()
+            thread.join(5)
+
+            self.assertFalse(thread.is_alive())
+            self.assertEqual(len(errors), 1)
+            wave.assert_not_called()
+        self.assertEqual((len(strips.cache), len(strips.runs)), (0, 0))
+
+    @timing_decorator
+    def test_scrub_strip(self):
+        """Test that click on the strip picks position of the media"""
+        strip = ScrubStrip()
+        strip.resize(200, strip.height())
+        picked = []
+        strip.position_picked.connect(picked.append)
+
+        strip.pick(50)
+        self.assertEqual(picked, [])
+
+        strip.set_duration(8000)
+        strip.pick(50)
+        strip.pick(500)
+        self.assertEqual(picked, [2000, 8000])
+        strip.clear_strip()
+        self.assertEqual(strip.duration, 0)
+        self.assertTrue(strip.isHidden())
+
+    @unittest.skipUnless(ffmpeg_available(), "ffmpeg is not installed")
+    @timing_decorator
+    def test_ffmpeg_strips(self):
+        """Test waveform and keyframes made by ffmpeg"""
+        audio = self.make_media('tone.wav', ['sine=frequency=440:duration=2'])
+        self.assertEqual(waveform(audio, (200, 40)).size, (200, 40))
+
+        video = self.make_media('clip.mp4', ['testsrc=duration=4:size=160x90:rate=10'])
+        strip = thumbnail_strip(video, 3, (32, 18))
+        self.assertEqual(strip.size, (96, 18))
+        self.assertIsNone(thumbnail_strip(audio, 3, (32, 18)))
+
+        self.assertEqual(load_media_strip(MediaStrips(), audio).width(), 800)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+"""Tests for image quality metrics and compare view"""
+
+import sys
+import math
+import tempfile
+from pathlib import Path
+
+import unittest
+
+from PIL import Image, ImageFilter
+from PyQt6.QtWidgets import QApplication
+
+from ui.compare import CompareDialog, metrics_text
+from ui.metrics import numpy_available, psnr, ssim, ImageComparer
+
+from tests.helpers import timing_decorator
+
+
+def brute_ssim(ref, dist, size):  # pylint: disable=too-many-locals
+    """SSIM by definition, every window computed on its own"""
+    ref, dist = list(ref.getdata()), list(dist.getdata())
+    width = int(math.sqrt(len(ref)))
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+    total, windows = 0.0, 0
+    for top in range(width - size + 1):
+        for left in range(width - size + 1):
+            xs = [ref[(top + r) * width + left + c] for r in range(size) for c in range(size)]
+            ys = [dist[(top + r) * width + left + c] for r in range(size) for c in range(size)]
+            n = len(xs)
+            mx, my = sum(xs) / n, sum(ys) / n
+            vx = sum(x * x for x in xs) / n - mx * mx
+            vy = sum(y * y for y in ys) / n - my * my
+            cov = sum(x * y for x, y in zip(xs, ys)) / n - mx * my
+            total += ((2 * mx * my + c1) * (2 * cov + c2)) / ((mx * mx + my * my + c1) * (vx + vy + c2))
+            windows += 1
+    return total / windows
+
+
+class TestMetrics(unittest.TestCase):
+    """Tests for PSNR/SSIM, comparison cache and compare window"""
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication(sys.argv)
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.source = Path(self.tmp_dir.name) / 'source.png'
+        self.img = Image.effect_noise((120, 80), 40).convert('RGB')
+        self.img.save(self.source)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    @unittest.skipUnless(numpy_available(), "numpy is not installed")
+    @timing_decorator
+    def test_psnr(self):
+        """Test PSNR of equal images and of known error"""
+        self.assertEqual(psnr(self.img, self.img.copy()), math.inf)
+        flat = Image.new('RGB', (10, 10), (100, 100, 100))
+        shifted = Image.new('RGB', (10, 10), (110, 100, 100))
+        # mse = 100 / 3
+        self.assertAlmostEqual(psnr(flat, shifted, strip_rows=3), 10 * math.log10(255 ** 2 * 3 / 100))
+
+    @unittest.skipUnless(numpy_available(), "numpy is not installed")
+    @timing_decorator
+    def test_ssim(self):
+        """Test SSIM matches the definition and does not depend on strips"""
+        ref = Image.effect_noise((24, 24), 50)
+        dist = ref.filter(ImageFilter.GaussianBlur(1))
+        expected = brute_ssim(ref, dist, 7)
+        for strip_rows in (1, 5, 100):
+            with self.subTest(strip_rows=strip_rows):
+                self.assertAlmostEqual(ssim(ref, dist, 7, strip_rows), expected, places=6)
+        self.assertAlmostEqual(ssim(ref, ref.copy()), 1.0)
+
+    @timing_decorator
+    def test_compare_cached(self):
+        """Test comparison of round trip is cached per pair and options"""
+        comparer = ImageComparer(cache_size=2)
+        first = comparer.compare(self.source, self.img, 'JPEG', {'quality': 50})
+        self.assertIs(comparer.compare(self.source, self.img, 'JPEG', {'quality': 50}), first)
+        other = comparer.compare(self.source, self.img, 'JPEG', {'quality': 90})
+        self.assertIsNot(other, first)
+
+        self.assertEqual(first.original_size, self.source.stat().st_size)
+        self.assertLess(first.size, other.size)
+        self.assertAlmostEqual(first.size_ratio, first.size / first.original_size)
+        self.assertEqual(first.converted.size, self.img.size)
+        if numpy_available():
+            self.assertLess(first.psnr, other.psnr)
+            self.assertLess(first.ssim, 1)
+
+        lossless = comparer.compare(self.source, self.img, 'PNG', {})
+        self.assertEqual(len(comparer.cache), 2)
+        if numpy_available():
+            self.assertEqual(lossless.psnr, math.inf)
+            self.assertIn("identical", metrics_text(lossless))
+
+        small = comparer.compare(self.source, self.img, 'JPEG', {'quality': 90}, max_bytes=3000)
+        self.assertLessEqual(small.size, 3000)
+
+    @timing_decorator
+    def test_compare_dialog(self):
+        """Test compare window switches modes"""
+        comparison = ImageComparer().compare(self.source, self.img, 'JPEG', {})
+        dialog = CompareDialog(comparison, 'source.png')
+        dialog.show()
+        for mode in ('Overlay', 'Difference', 'Split'):
+            dialog.mode_box.setCurrentText(mode)
+            self.app.processEvents()
+            self.assertEqual(dialog.view.mode, mode)
+        self.assertFalse(dialog.opacity_slider.isEnabled())
+        dialog.view.move_split(dialog.view.image_rect().left())
+        self.assertEqual(dialog.view.split, 0)
+        dialog.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
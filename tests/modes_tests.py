@@ -0,0 +1,111 @@
+"""Tests for the mode-aware conversion stage"""
+
+import tempfile
+from pathlib import Path
+
+import unittest
+from unittest.mock import patch
+
+from PIL import Image, ImageSequence
+
+from ui.constants import IMAGE_ENCODER_MODES, PREVIEW_MODES, PIC_EXTENSION_MAP
+from ui.converters import FileConverter
+from ui.modes import prepare_image, srgb_transform, cms_available, ImageCms
+
+from tests.helpers import timing_decorator
+
+
+class TestModes(unittest.TestCase):
+    """Tests for no-op, palette, alpha, CMYK, 16-bit and ICC conversions"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.folder = Path(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    @timing_decorator
+    def test_no_op(self):
+        """Test that image already in a mode of the target is not converted"""
+        for mode, real_format in (('RGB', 'JPEG'), ('L', 'JPEG'), ('RGBA', 'WEBP'), ('I;16', 'PNG')):
+            with self.subTest(mode=mode, real_format=real_format):
+                img = Image.new(mode, (4, 4))
+                with patch.object(img, 'convert') as convert:
+                    self.assertIs(prepare_image(img, IMAGE_ENCODER_MODES[real_format]), img)
+                convert.assert_not_called()
+        img = Image.new('CMYK', (4, 4))
+        self.assertIs(prepare_image(img, IMAGE_ENCODER_MODES['TIFF']), img)
+        self.assertIs(prepare_image(img, None), img)
+        self.assertEqual(set(PIC_EXTENSION_MAP.values()) - set(IMAGE_ENCODER_MODES), set())
+
+    @timing_decorator
+    def test_cheapest_mode(self):
+        """Test that grey, alpha and palette transparency are kept when the target can"""
+        transparent = Image.new('P', (4, 4))
+        transparent.info['transparency'] = 0
+        cases = ((Image.new('LA', (4, 4)), 'JPEG', 'L'), (Image.new('LA', (4, 4)), 'WEBP', 'RGBA'),
+                 (Image.new('CMYK', (4, 4)), 'PNG', 'RGB'), (Image.new('1', (4, 4)), 'JPEG', 'L'),
+                 (transparent, 'WEBP', 'RGBA'), (transparent, 'JPEG', 'RGB'), (transparent, 'PNG', 'P'))
+        for img, real_format, mode in cases:
+            with self.subTest(mode=img.mode, real_format=real_format):
+                self.assertEqual(prepare_image(img, IMAGE_ENCODER_MODES[real_format]).mode, mode)
+
+        self.assertEqual(prepare_image(transparent, PREVIEW_MODES, palette_alpha=False).mode, 'RGBA')
+        self.assertEqual(prepare_image(Image.new('P', (4, 4)), PREVIEW_MODES, palette_alpha=False).mode, 'P')
+
+    @timing_decorator
+    def test_16bit(self):
+        """Test that 16-bit grey is scaled to 8 bits instead of clipped"""
+        img = Image.new('I;16', (4, 4), 32768)
+        self.assertEqual(prepare_image(img, IMAGE_ENCODER_MODES['JPEG']).getpixel((0, 0)), 128)
+        self.assertEqual(prepare_image(Image.new('I', (4, 4), 65535), ('RGB',)).getpixel((0, 0)),
+                         (255, 255, 255))
+
+        png_file = self.folder / 'deep.png'
+        img.save(png_file)
+        FileConverter().convert(png_file, self.folder / 'deep.jpg')
+        with Image.open(self.folder / 'deep.jpg') as result:
+            self.assertEqual(result.mode, 'L')
+            self.assertAlmostEqual(result.getpixel((0, 0)), 128, delta=2)
+
+    @unittest.skipUnless(cms_available(), "Pillow is built without littlecms")
+    @timing_decorator
+    def test_icc_transform_cache(self):
+        """Test that ICC transform is built once per profile and profile is dropped"""
+        icc_profile = ImageCms.ImageCmsProfile(ImageCms.createProfile('sRGB')).tobytes()
+        srgb_transform.cache_clear()
+
+        for color in ((200, 10, 10), (10, 200, 10)):
+            img = Image.new('RGB', (4, 4), color)
+            img.info['icc_profile'] = icc_profile
+            managed = prepare_image(img, IMAGE_ENCODER_MODES['JPEG'], color_manage=True)
+            self.assertNotIn('icc_profile', managed.info)
+            self.assertTrue(all(abs(a - b) <= 2 for a, b in zip(managed.getpixel((0, 0)), color)))
+
+        info = srgb_transform.cache_info()  # pylint: disable=no-value-for-parameter
+        self.assertEqual((info.misses, info.hits), (1, 1))
+
+        broken = Image.new('RGB', (4, 4))
+        broken.info['icc_profile'] = b'broken'
+        self.assertIs(prepare_image(broken, IMAGE_ENCODER_MODES['JPEG'], color_manage=True), broken)
+
+    @timing_decorator
+    def test_cmyk_to_gif(self):
+        """Test that single and multi-page CMYK TIFF is converted to GIF through RGB"""
+        tiff_file = self.folder / 'print.tiff'
+        Image.new('CMYK', (8, 8), (0, 255, 255, 0)).save(tiff_file)
+        FileConverter().convert(tiff_file, self.folder / 'print.gif')
+        with Image.open(self.folder / 'print.gif') as result:
+            self.assertEqual(result.convert('RGB').getpixel((0, 0)), (255, 0, 0))
+
+        pages = [Image.new('CMYK', (8, 8), color) for color in ((0, 255, 255, 0), (255, 255, 0, 0))]
+        pages[0].save(tiff_file, save_all=True, append_images=pages[1:])
+        FileConverter().convert(tiff_file, self.folder / 'pages.gif')
+        with Image.open(self.folder / 'pages.gif') as result:
+            colors = [frame.convert('RGB').getpixel((0, 0)) for frame in ImageSequence.Iterator(result)]
+        self.assertEqual(colors, [(255, 0, 0), (0, 0, 255)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+"""Tests for parallel chunked csv convertation"""
+
+import io
+import csv
+import tempfile
+from pathlib import Path
+
+import unittest
+
+from ui.converters import FileConverter
+from ui.parallel import csv_chunk_bounds, convert_csv_chunk, write_csv_parallel
+
+from tests.helpers import timing_decorator
+
+
+CSV_DATA = ('id,text,name\r\n'
+            '1,"multi\nline\n""quoted"" text",Ann\r\n'
+            '2,привет,"Bob, Jr"\r\n'
+            '\r\n'
+            '3,"a\n\n\nb",Kate\n'
+            '4,,\n'
+            '5,"last, one","x\ny"')
+# Quote inside of unquoted field is a plain char, it does not open a quoted field
+BARE_QUOTE_DATA = 'h0,h1\nx,5" screen\ny,"multi\nline"\nz,ok\n' * 3
+
+
+class TestParallelCsv(unittest.TestCase):
+    """Tests for csv chunking and stitched output"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.folder = Path(self.tmp_dir.name)
+        self.inp = self.folder / 'data.csv'
+        self.inp.write_bytes(CSV_DATA.encode('utf-8'))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    @timing_decorator
+    def test_bounds_are_row_boundaries(self):
+        """Test that chunks cover the file and never cut quoted fields"""
+        for text in (CSV_DATA, BARE_QUOTE_DATA):
+            self.inp.write_bytes(text.encode('utf-8'))
+            data = self.inp.read_bytes()
+            rows = list(csv.reader(io.StringIO(text, newline='')))
+            for chunk_size in range(1, len(data) + 2):
+                bounds = csv_chunk_bounds(self.inp, chunk_size)
+
+                self.assertEqual(bounds[0][0], 0)
+                self.assertEqual(bounds[-1][1], len(data))
+                for (_, end), (begin, _) in zip(bounds, bounds[1:]):
+                    self.assertEqual(end, begin)
+                    self.assertEqual(data[end - 1:end], b'\n')
+                chunk_rows = [row for begin, end in bounds
+                              for row in csv.reader(io.StringIO(data[begin:end].decode('utf-8'), newline=''))]
+                self.assertEqual(chunk_rows, rows)
+
+    @timing_decorator
+    def test_chunks_give_serial_output(self):
+        """Test that stitched chunks are the same as serial convertation"""
+        for out_format in ('.json', '.txt'):
+            serial_out = self.folder / f'serial{out_format}'
+            FileConverter().convert(self.inp, serial_out)
+            expected = serial_out.read_text(encoding='utf-8')
+
+            bounds = csv_chunk_bounds(self.inp, 10)
+            fieldnames = ['id', 'text', 'name']
+            chunks = [convert_csv_chunk(self.inp, begin, end, fieldnames if begin else None,
+                                        out_format) for begin, end in bounds]
+            if out_format == '.txt':
+                self.assertEqual(''.join(chunks), expected)
+            else:
+                self.assertEqual('[\n' + ',\n'.join(filter(None, chunks)) + '\n]', expected)
+
+    @timing_decorator
+    def test_process_pool_output_is_identical(self):
+        """Test write_csv_parallel with real worker processes"""
+        for out_format in ('.json', '.txt'):
+            serial_out = self.folder / f'serial{out_format}'
+            parallel_out = self.folder / f'parallel{out_format}'
+            FileConverter().convert(self.inp, serial_out)
+            write_csv_parallel(self.inp, parallel_out, out_format, workers=2, chunk_size=16)
+
+            self.assertEqual(parallel_out.read_bytes(), serial_out.read_bytes())
+
+    @timing_decorator
+    def test_bare_quotes_in_unquoted_fields(self):
+        """Test that quote inside of unquoted field does not shift chunk bounds"""
+        self.inp.write_text(BARE_QUOTE_DATA, encoding='utf-8')
+        for out_format in ('.json', '.txt'):
+            serial_out = self.folder / f'serial{out_format}'
+            parallel_out = self.folder / f'parallel{out_format}'
+            FileConverter(columnar=False).convert(self.inp, serial_out)
+            write_csv_parallel(self.inp, parallel_out, out_format, workers=2, chunk_size=8)
+
+            self.assertEqual(parallel_out.read_bytes(), serial_out.read_bytes())
+
+    @timing_decorator
+    def test_ragged_rows_to_json(self):
+        """Test rows with missing and extra fields are dumped like json.dump does"""
+        self.inp.write_text('a,b\n1\n2,3,4,5\n6,7\n', encoding='utf-8')
+        serial_out = self.folder / 'serial.json'
+        parallel_out = self.folder / 'parallel.json'
+
+        FileConverter().convert(self.inp, serial_out)
+        write_csv_parallel(self.inp, parallel_out, '.json', workers=2, chunk_size=4)
+
+        self.assertEqual(parallel_out.read_bytes(), serial_out.read_bytes())
+
+    @timing_decorator
+    def test_header_only_file(self):
+        """Test that csv without rows gives empty json list"""
+        self.inp.write_text('id,text\n', encoding='utf-8')
+        out = self.folder / 'out.json'
+
+        write_csv_parallel(self.inp, out, '.json', workers=2, chunk_size=4)
+
+        self.assertEqual(out.read_text(encoding='utf-8'), '[]')
+
+    @timing_decorator
+    def test_worker_errors_are_raised(self):
+        """Test that bad rows fail like in the serial convertation"""
+        self.inp.write_text('a,b\n1,2\n3\n', encoding='utf-8')
+        out = self.folder / 'out.txt'
+
+        with self.assertRaises(TypeError):
+            FileConverter().write_csv_txt(self.inp, out)
+        with self.assertRaises(TypeError):
+            write_csv_parallel(self.inp, out, '.txt', workers=2, chunk_size=4)
+
+
+if __name__ == '__main__':
+    unittest.main()
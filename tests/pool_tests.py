@@ -0,0 +1,66 @@
+"""Tests for pooled preview widgets"""
+
+import sys
+
+import unittest
+
+from PyQt6.QtWidgets import QApplication, QLabel, QWidget, QVBoxLayout
+
+from ui.pool import PreviewPool
+
+from tests.helpers import timing_decorator
+
+
+class TestPool(unittest.TestCase):
+    """Tests for showing one preview kind and resetting the others"""
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication(sys.argv)
+
+    def setUp(self):
+        self.window = QWidget()
+        layout = QVBoxLayout(self.window)
+        self.text, self.image = QLabel(), QLabel()
+        layout.addWidget(self.text)
+        layout.addWidget(self.image)
+        self.window.show()
+
+        self.resets = []
+        self.pool = PreviewPool()
+        self.pool.register('text', lambda: [self.text], lambda: self.resets.append('text'))
+        self.pool.register('image', lambda: [self.image], lambda: self.resets.append('image'))
+        self.pool.register('video', lambda: [None], lambda: self.resets.append('video'))
+
+    def tearDown(self):
+        self.window.close()
+
+    @timing_decorator
+    def test_activate(self):
+        """Test that only the active kind is visible and others are reset"""
+        self.pool.activate('text')
+        self.assertEqual(self.pool.active, 'text')
+        self.assertTrue(self.text.isVisible())
+        self.assertFalse(self.image.isVisible())
+        self.assertEqual(sorted(self.resets), ['image', 'video'])
+
+        text = self.text
+        self.pool.activate('image')
+        self.assertIs(self.text, text)
+        self.assertFalse(self.text.isVisible())
+        self.assertTrue(self.image.isVisible())
+        self.assertIn('text', self.resets)
+
+    @timing_decorator
+    def test_release_all(self):
+        """Test that release keeps widgets and hides them"""
+        self.pool.activate('image')
+        self.resets.clear()
+        self.pool.release_all()
+
+        self.assertIsNone(self.pool.active)
+        self.assertFalse(self.image.isVisible())
+        self.assertEqual(sorted(self.resets), ['image', 'text', 'video'])
+
+
+if __name__ == '__main__':
+    unittest.main()
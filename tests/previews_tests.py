@@ -0,0 +1,143 @@
+"""Tests for previews loaded outside of the GUI thread"""
+
+import sys
+import gzip
+import time
+import threading
+import tempfile
+from pathlib import Path
+
+import unittest
+
+from PIL import Image
+from PyQt6.QtCore import QThreadPool
+from PyQt6.QtWidgets import QApplication
+
+from ui.constants import PREVIEW_MAX_LINES
+from ui.frames import AnimatedImage
+from ui.previews import load_picture, load_document
+from ui.workers import PreviewLoader
+
+from tests.helpers import timing_decorator
+
+
+def slow(value, seconds):
+    """Loading which takes a while"""
+    time.sleep(seconds)
+    return value
+
+
+def broken():
+    """Loading which fails"""
+    raise OSError("broken file")
+
+
+class TestPreviews(unittest.TestCase):
+    """Tests for preview loaders and for dropping outdated results"""
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication(sys.argv)
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.folder = Path(self.tmp_dir.name)
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(1)
+        self.loader = PreviewLoader(self.pool)
+        self.results = []
+
+    def tearDown(self):
+        self.loader.wait()
+        self.tmp_dir.cleanup()
+
+    def load(self, fn, *args):
+        """Start loading, results and errors go to self.results"""
+        self.loader.load(fn, args, self.results.append, lambda message: self.results.append(('error', message)))
+
+    @timing_decorator
+    def test_load_picture(self):
+        """Test that source, converted and animated pictures are decoded to QImage"""
+        png_file = self.folder / 'picture.png'
+        Image.new('RGB', (8, 4), (255, 0, 0)).save(png_file)
+        gif_file = self.folder / 'frames.gif'
+        frames = [Image.new('RGB', (6, 6), color) for color in ((255, 0, 0), (0, 0, 255))]
+        frames[0].save(gif_file, save_all=True, append_images=frames[1:])
+
+        identifier, image = load_picture(None, str(png_file))
+        self.assertEqual((identifier, image.width(), image.height()), (str(png_file), 8, 4))
+
+        identifier, image = load_picture(Image.new('L', (3, 3), 7), str(png_file))
+        self.assertTrue(identifier.startswith('Converted_'))
+        self.assertEqual(image.pixelColor(0, 0).red(), 7)
+
+        identifier, image = load_picture(AnimatedImage(gif_file, 'GIF', 2), str(gif_file))
+        self.assertEqual(identifier, f"Converted_{gif_file}_GIF")
+        self.assertEqual(image.pixelColor(0, 0).red(), 255)
+
+        self.assertTrue(load_picture(None, str(self.folder / 'missing.png'))[1].isNull())
+
+    @timing_decorator
+    def test_load_document(self):
+        """Test that text and compressed text documents are read for preview"""
+        text = ''.join(f"{i}\n" for i in range(PREVIEW_MAX_LINES * 2))
+        text_file = self.folder / 'lines.txt'
+        text_file.write_text(text, encoding='utf-8')
+        self.assertEqual(load_document(text_file), text)
+
+        gz_file = self.folder / 'lines.txt.gz'
+        gz_file.write_bytes(gzip.compress(text.encode('utf-8')))
+        self.assertEqual(len(load_document(gz_file).splitlines()), PREVIEW_MAX_LINES)
+
+    @timing_decorator
+    def test_latest_result_only(self):
+        """Test that result of the replaced loading is dropped"""
+        self.load(slow, 'old', 0.2)
+        self.load(slow, 'new', 0)
+        self.assertTrue(self.loader.is_loading())
+        self.loader.wait()
+
+        self.assertEqual(self.results, ['new'])
+        self.assertFalse(self.loader.is_loading())
+
+    @timing_decorator
+    def test_cancel(self):
+        """Test that cancelled loading is not delivered and queued one is not started"""
+        started = []
+        self.load(slow, 'running', 0.2)
+        self.loader.cancel()
+        self.loader.wait()
+
+        self.pool.start(lambda: time.sleep(0.2))
+        self.load(lambda: started.append(True))
+        self.loader.cancel()
+        self.loader.wait()
+
+        self.assertEqual((self.results, started), ([], []))
+
+    @timing_decorator
+    def test_busy_global_pool(self):
+        """Test that previews are loaded while syncs take every thread of the global pool"""
+        global_pool = QThreadPool.globalInstance()
+        release = threading.Event()
+        for _ in range(global_pool.maxThreadCount()):
+            global_pool.start(release.wait)
+
+        loader = PreviewLoader()
+        try:
+            loader.load(slow, ('preview', 0), self.results.append, self.results.append)
+            loader.wait(5000)
+        finally:
+            release.set()
+            global_pool.waitForDone()
+        self.assertEqual(self.results, ['preview'])
+
+    @timing_decorator
+    def test_error(self):
+        """Test that error message is delivered"""
+        self.load(broken)
+        self.loader.wait()
+        self.assertEqual(self.results, [('error', 'broken file')])
+
+
+if __name__ == '__main__':
+    unittest.main()
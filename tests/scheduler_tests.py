@@ -0,0 +1,180 @@
+"""Tests for resource-aware batch job scheduler"""
+
+import time
+import tempfile
+import threading
+from pathlib import Path
+
+import unittest
+
+from PIL import Image
+
+from ui.batch import BatchJob, BatchRunner
+from ui.converters import FileConverter
+from ui.scheduler import JobLoad, JobScheduler, estimate_load
+from ui.constants import (SCHEDULER_HEAVY_MEMORY, SCHEDULER_FFMPEG_MEMORY, SCHEDULER_IMAGE_RSS_FACTORS,
+                          SCHEDULER_IMAGE_RSS_DEFAULT, SCHEDULER_LOOKAHEAD)
+
+from tests.helpers import timing_decorator
+
+
+# pylint: disable=too-few-public-methods
+class Tracker():
+    """run_job which counts jobs running at the same time"""
+
+    def __init__(self, loads):
+        self.loads = loads
+        self.lock = threading.Lock()
+        self.running = []
+        self.peak_memory = 0
+        self.order = []
+
+    def __call__(self, job):
+        with self.lock:
+            self.running.append(job)
+            self.order.append(job)
+            self.peak_memory = max(self.peak_memory, sum(self.loads[name].memory for name in self.running))
+        time.sleep(0.02)
+        with self.lock:
+            self.running.remove(job)
+        return job
+
+
+class TestScheduler(unittest.TestCase):
+    """Tests for job classification and admission"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.folder = Path(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def run_loads(self, loads, scheduler):
+        """Run named jobs with given loads, returns tracker"""
+        tracker = Tracker(loads)
+        finished = list(scheduler.run(list(loads), tracker, loads.get))
+        self.assertEqual(sorted(finished), sorted(loads))
+        return tracker
+
+    @timing_decorator
+    def test_estimate_load(self):
+        """Test that jobs are classified by converter and input size"""
+        converter = FileConverter(columnar=False)
+        csv_file = self.folder / 'data.csv'
+        csv_file.write_text("a,b\n" + "1,2\n" * 1000, encoding='utf-8')
+        image_file = self.folder / 'image.png'
+        Image.new('RGB', (300, 200)).save(image_file)
+        media_file = self.folder / 'sound.wav'
+        media_file.write_bytes(b'RIFF')
+
+        load = estimate_load(BatchJob(csv_file, self.folder / 'data.json'), converter)
+        self.assertEqual((load.kind, load.memory), ('cpu', csv_file.stat().st_size * 16))
+        self.assertEqual(estimate_load(BatchJob(csv_file, self.folder / 'data.jsonl'), converter).kind, 'io')
+
+        load = estimate_load(BatchJob(image_file, self.folder / 'image.webp'), converter)
+        self.assertEqual(load.memory, 300 * 200 * 4 * SCHEDULER_IMAGE_RSS_FACTORS['WEBP'])
+        animation = self.folder / 'animation.gif'
+        frames = [Image.new('RGB', (30, 20), (index * 50, 0, 0)) for index in range(5)]
+        frames[0].save(animation, save_all=True, append_images=frames[1:])
+        load = estimate_load(BatchJob(animation, self.folder / 'animation.png'), converter)
+        self.assertEqual(load.memory, 30 * 20 * 4 * SCHEDULER_IMAGE_RSS_DEFAULT * 5)
+        load = estimate_load(BatchJob(animation, self.folder / 'animation.webp'), converter)
+        self.assertEqual(load.memory, 30 * 20 * 4 * SCHEDULER_IMAGE_RSS_FACTORS['WEBP'])
+        load = estimate_load(BatchJob(media_file, self.folder / 'sound.mp3'), converter, cpu_slots=4)
+        self.assertEqual((load.kind, load.memory, load.slots), ('cpu', SCHEDULER_FFMPEG_MEMORY, 4))
+
+        self.assertEqual(JobLoad('cpu', SCHEDULER_HEAVY_MEMORY).kind, 'memory')
+        self.assertEqual(estimate_load(BatchJob(self.folder / 'missing.csv', 'out.json'), converter).memory, 0)
+
+    @timing_decorator
+    def test_memory_budget(self):
+        """Test that memory-heavy jobs are limited by the budget and io jobs run beside them"""
+        loads = {f'heavy{i}': JobLoad('memory', 60) for i in range(4)}
+        loads.update({f'io{i}': JobLoad('io', 10) for i in range(4)})
+        scheduler = JobScheduler(cpu_slots=4, io_slots=2, memory=100)
+
+        tracker = self.run_loads(loads, scheduler)
+        self.assertLessEqual(tracker.peak_memory, 100)
+        self.assertEqual(scheduler.peak_memory, 80)
+        self.assertEqual(scheduler.reserved, 0)
+        self.assertEqual(set(tracker.order[:3]), {'heavy0', 'io0', 'io1'})
+
+    @timing_decorator
+    def test_large_job_not_starved(self):
+        """Test that small jobs do not overtake the job waiting for memory, too large job runs alone"""
+        loads = {'first': JobLoad('cpu', 50), 'large': JobLoad('memory', 80)}
+        loads.update({f'small{i}': JobLoad('cpu', 10) for i in range(6)})
+        loads['huge'] = JobLoad('memory', 500)
+        scheduler = JobScheduler(cpu_slots=8, memory=100)
+
+        tracker = self.run_loads(loads, scheduler)
+        # Memory of 'large' is held, small jobs start only beside it
+        self.assertEqual(tracker.order[0], 'first')
+        self.assertEqual(set(tracker.order[1:4]), {'large', 'small0', 'small1'})
+        self.assertEqual(tracker.order[-1], 'huge')
+        self.assertEqual(scheduler.peak_memory, 500)
+
+    @timing_decorator
+    def test_loads_estimated_lazily(self):
+        """Test that only jobs at the head of the queue are estimated before the first one starts"""
+        loads = {f'job{i}': JobLoad('io', 10) for i in range(SCHEDULER_LOOKAHEAD * 3)}
+        estimated = []
+        started = []
+
+        def load_of(job):
+            estimated.append(job)
+            return loads[job]
+
+        def run_job(job):
+            started.append(len(estimated))
+            return job
+
+        finished = list(JobScheduler(cpu_slots=2, memory=100).run(list(loads), run_job, load_of))
+        self.assertEqual(sorted(finished), sorted(loads))
+        self.assertEqual(started[0], SCHEDULER_LOOKAHEAD)
+        self.assertEqual(sorted(estimated), sorted(loads))
+
+    @timing_decorator
+    def test_failed_consumer_releases_slots(self):
+        """Test that slots of running jobs are freed when the consumer of results raises"""
+        loads = {name: JobLoad('cpu', 10) for name in 'abc'}
+        scheduler = JobScheduler(cpu_slots=2, memory=100)
+
+        with self.assertRaises(RuntimeError):
+            for _ in scheduler.run(list(loads), Tracker(loads), loads.get):
+                raise RuntimeError("on_done failed")
+        self.assertEqual((scheduler.used_slots, scheduler.reserved), (0, 0))
+
+        # Next run of the same scheduler gets every slot
+        self.run_loads(loads, scheduler)
+        self.assertEqual(scheduler.peak_running, 2)
+
+    @timing_decorator
+    def test_batch_runner(self):
+        """Test that batch runner finishes every job when each one is larger than the budget"""
+        source = self.folder / 'source'
+        source.mkdir()
+        jobs = []
+        for name in 'abcd':
+            (source / f'{name}.csv').write_text("a,b\n1,2\n", encoding='utf-8')
+            jobs.append(BatchJob(source / f'{name}.csv', self.folder / 'out' / f'{name}.json'))
+
+        runner = BatchRunner(workers=2, scheduler=JobScheduler(cpu_slots=2, memory=1))
+        runner.run(jobs)
+        self.assertEqual([job.status for job in jobs], ['done'] * 4)
+        self.assertEqual(runner.scheduler.peak_running, 1)
+
+        def failed_on_done(_job):
+            raise RuntimeError("on_done failed")
+
+        runner = BatchRunner(workers=2)
+        try:
+            runner.run(jobs, on_done=failed_on_done)
+        except RuntimeError:
+            # Slots are free while the error is still being handled
+            self.assertEqual((runner.scheduler.used_slots, runner.scheduler.io_running), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+"""Tests for content sniffing format detection"""
+
+import io
+import os
+import json
+import tempfile
+from pathlib import Path
+
+import unittest
+from unittest.mock import patch
+
+from PIL import Image
+
+from ui.sniffing import FormatSniffer
+from ui.converters import FileConverter
+from ui.constants import SNIFF_BYTES
+
+from tests.helpers import timing_decorator
+
+
+class TestFormatSniffer(unittest.TestCase):
+    """Tests for FormatSniffer"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.folder = Path(self.tmp_dir.name)
+        self.sniffer = FormatSniffer()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_bytes(self, name, data):
+        """Write file to temp folder"""
+        path = self.folder / name
+        path.write_bytes(data)
+        return path
+
+    def image_bytes(self, img_format):
+        """Encode small image to bytes"""
+        buf = io.BytesIO()
+        Image.new('RGB', (4, 4), 'red').save(buf, format=img_format)
+        return buf.getvalue()
+
+    @timing_decorator
+    def test_sniff_images(self):
+        """Test magic bytes of all picture formats"""
+        for img_format, ext in (('PNG', '.png'), ('JPEG', '.jpg'), ('WEBP', '.webp'),
+                                ('GIF', '.gif'), ('TIFF', '.tiff')):
+            self.assertEqual(self.sniffer.sniff_bytes(self.image_bytes(img_format)), ext)
+
+    @timing_decorator
+    def test_sniff_media_containers(self):
+        """Test magic bytes of audio/video containers"""
+        self.assertEqual(self.sniffer.sniff_bytes(b'RIFF\x00\x00\x00\x00WAVEfmt '), '.wav')
+        self.assertEqual(self.sniffer.sniff_bytes(b'\x00\x00\x00\x18ftypmp42'), '.mp4')
+        self.assertEqual(self.sniffer.sniff_bytes(b'ID3\x04\x00'), '.mp3')
+        # MPEG-1 layer III, 128 kbit/s, 44.1 kHz: frames of 417 bytes
+        frame = b'\xff\xfb\x90\x00'.ljust(417, b'\x00')
+        self.assertEqual(self.sniffer.sniff_bytes(frame * 3), '.mp3')
+        self.assertIsNone(self.sniffer.sniff_binary(frame[:4] + frame))
+        # Reserved version and sample rate
+        self.assertIsNone(self.sniffer.sniff_binary(b'\xff\xeb\x90\x00'.ljust(417, b'\x00') * 3))
+        self.assertIsNone(self.sniffer.sniff_binary(b'\xff\xfb\x9c\x00'.ljust(417, b'\x00') * 3))
+
+    @timing_decorator
+    def test_sniff_text_formats(self):
+        """Test JSON/CSV/TXT detection"""
+        self.assertEqual(self.sniffer.sniff_bytes(b'\xef\xbb\xbf  [{"a": 1}]'), '.json')
+        self.assertEqual(self.sniffer.sniff_bytes(b'a,b,c\n1,2,3\n4,5,6\n'), '.csv')
+        self.assertEqual(self.sniffer.sniff_bytes(b'just some words\nand more\n'), '.txt')
+        self.assertIsNone(self.sniffer.sniff_bytes(b'\x00\x01\x02binary'))
+
+    @timing_decorator
+    def test_sniff_json_is_parsed(self):
+        """Test that text starting with a bracket is json only if it parses"""
+        self.assertEqual(self.sniffer.sniff_bytes(b'[INFO] started\n[INFO] done\n'), '.txt')
+        self.assertEqual(self.sniffer.sniff_bytes(b'{not json}'), '.txt')
+        self.assertEqual(self.sniffer.sniff_bytes(b'{"a": 1}\n{"a": 2}\n'), '.jsonl')
+
+        # Head of a longer document is cut in the middle of a value
+        document = json.dumps([{'name': 'x' * 30, 'values': [1.5, True, None]}] * 200)
+        for shift in range(40):
+            head = (' ' * shift + document).encode('utf-8')[:SNIFF_BYTES]
+            self.assertEqual(self.sniffer.sniff_bytes(head), '.json')
+
+        path = self.write_bytes('app.txt', b'[INFO] started\n[WARN] slow\n')
+        self.assertEqual(self.sniffer.detect(path, '.txt'), '.txt')
+
+    @timing_decorator
+    def test_sniff_utf16_text(self):
+        """Test that UTF-16LE BOM is not taken for MP3 frame sync"""
+        data = ('hello world\n' * 100).encode('utf-16')
+        self.assertIsNone(self.sniffer.sniff_bytes(data))
+
+        path = self.write_bytes('notes.txt', data)
+        self.assertEqual(self.sniffer.detect(path, '.txt'), '.txt')
+
+    @timing_decorator
+    def test_sniff_cut_utf8_char(self):
+        """Test that multibyte char cut at SNIFF_BYTES is not a decode error"""
+        data = ('a,b\n' + 'я,ю\n' * SNIFF_BYTES).encode('utf-8')[:SNIFF_BYTES - 1]
+        self.assertEqual(self.sniffer.sniff_bytes(data), '.csv')
+
+    @timing_decorator
+    def test_detect_mislabelled_file(self):
+        """Test that content wins over wrong extension"""
+        path = self.write_bytes('photo.jpg', self.image_bytes('PNG'))
+        self.assertEqual(self.sniffer.detect(path, '.jpg'), '.png')
+
+        path = self.write_bytes('data.csv', b'[{"a": "1"}]')
+        self.assertEqual(self.sniffer.detect(path, '.csv'), '.json')
+
+    @timing_decorator
+    def test_detect_trusts_equivalent_extensions(self):
+        """Test that .jpeg and text extensions are kept"""
+        path = self.write_bytes('photo.jpeg', self.image_bytes('JPEG'))
+        self.assertEqual(self.sniffer.detect(path, '.jpeg'), '.jpeg')
+
+        path = self.write_bytes('table.txt', b'a,b\n1,2\n')
+        self.assertEqual(self.sniffer.detect(path, '.txt'), '.txt')
+
+    @timing_decorator
+    def test_detect_missing_file_uses_extension(self):
+        """Test that extension is used if file can not be read"""
+        self.assertEqual(self.sniffer.detect(self.folder / 'none.png', '.png'), '.png')
+
+    @timing_decorator
+    def test_cache_is_invalidated_by_change(self):
+        """Test that cached result is used until file changes"""
+        path = self.write_bytes('file.dat', b'[1, 2]')
+        self.assertEqual(self.sniffer.sniff(path), '.json')
+
+        with patch.object(self.sniffer, 'sniff_bytes') as mock_sniff:
+            self.assertEqual(self.sniffer.sniff(path), '.json')
+            mock_sniff.assert_not_called()
+
+        path.write_bytes(self.image_bytes('PNG'))
+        os.utime(path, ns=(0, path.stat().st_mtime_ns + 10**9))
+        self.assertEqual(self.sniffer.sniff(path), '.png')
+
+    @timing_decorator
+    def test_file_converter_routes_by_content(self):
+        """Test that FileConverter converts mislabelled csv by its content"""
+        inp = self.write_bytes('table.json', b'a,b\n1,2\n')
+        out = self.folder / 'table.txt'
+
+        self.assertEqual(FileConverter().detect_format(inp), '.json')
+        inp = self.write_bytes('table.dat', b'a,b\n1,2\n3,4\n')
+        FileConverter().convert(inp, out)
+        self.assertEqual(out.read_text(encoding='utf-8'), "a\tb\n1\t2\n3\t4\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
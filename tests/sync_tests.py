@@ -0,0 +1,187 @@
+"""Tests for folder sync mode and batch runner"""
+
+import os
+import json
+import tempfile
+from pathlib import Path
+
+import unittest
+from unittest.mock import Mock
+
+from ui.batch import BatchJob, BatchRunner
+from ui.sync import FolderSync, file_hash
+from ui.constants import SYNC_MANIFEST_NAME
+
+from tests.helpers import timing_decorator
+
+
+class TestFolderSync(unittest.TestCase):
+    """Tests for FolderSync and BatchRunner"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.source = Path(self.tmp_dir.name) / 'source'
+        self.output = Path(self.tmp_dir.name) / 'output'
+        (self.source / 'nested').mkdir(parents=True)
+
+        self.write_file('a.csv', "a,b\n1,2\n")
+        self.write_file('nested/b.csv', "a,b\n3,4\n")
+        self.write_file('notes.md', "not converted")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_file(self, rel, content):
+        """Write file to the source folder"""
+        path = self.source / rel
+        path.write_text(content, encoding='utf-8')
+        return path
+
+    def make_sync(self, targets=None, options=None):
+        """Create FolderSync with one worker"""
+        return FolderSync(self.source, self.output, targets or {'.csv': '.json'},
+                          runner=BatchRunner(workers=1), options=options)
+
+    @timing_decorator
+    def test_first_sync_converts_all_files(self):
+        """Test that first sync converts every mapped file"""
+        summary = self.make_sync().run()
+
+        self.assertEqual(summary['converted'], 2)
+        self.assertEqual(summary['failed'], [])
+        data = json.loads((self.output / 'nested' / 'b.json').read_text(encoding='utf-8'))
+        self.assertEqual(data, [{"a": "3", "b": "4"}])
+        self.assertFalse((self.output / 'notes.md').exists())
+        self.assertTrue((self.output / SYNC_MANIFEST_NAME).exists())
+
+    @timing_decorator
+    def test_second_sync_skips_unchanged_files(self):
+        """Test that nothing is converted if nothing changed"""
+        self.make_sync().run()
+        runner = Mock()
+        sync = FolderSync(self.source, self.output, {'.csv': '.json'}, runner=runner)
+
+        summary = sync.run()
+
+        self.assertEqual(summary['converted'], 0)
+        self.assertEqual(summary['unchanged'], 2)
+        runner.run.assert_called_once()
+        self.assertEqual(runner.run.call_args.args[0], [])
+
+    @timing_decorator
+    def test_modified_file_is_reconverted(self):
+        """Test that only modified file is converted again"""
+        self.make_sync().run()
+        path = self.write_file('a.csv', "a,b\n5,6\n7,8\n")
+        os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10**9))
+
+        summary = self.make_sync().run()
+
+        self.assertEqual(summary['converted'], 1)
+        self.assertEqual(summary['unchanged'], 1)
+        data = json.loads((self.output / 'a.json').read_text(encoding='utf-8'))
+        self.assertEqual(len(data), 2)
+
+    @timing_decorator
+    def test_touched_file_is_not_reconverted(self):
+        """Test that file with new mtime but same content is skipped by hash"""
+        self.make_sync().run()
+        path = self.source / 'a.csv'
+        os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10**9))
+
+        summary = self.make_sync().run()
+
+        self.assertEqual(summary['converted'], 0)
+        self.assertEqual(summary['unchanged'], 2)
+
+    @timing_decorator
+    def test_deleted_input_removes_output(self):
+        """Test that output of deleted input is removed with empty folders"""
+        self.make_sync().run()
+        (self.source / 'nested' / 'b.csv').unlink()
+
+        summary = self.make_sync().run()
+
+        self.assertEqual(summary['removed'], 1)
+        self.assertFalse((self.output / 'nested').exists())
+        self.assertTrue((self.output / 'a.json').exists())
+
+    @timing_decorator
+    def test_changed_options_reconvert_and_remove_old_output(self):
+        """Test that changing target format reconverts files"""
+        self.make_sync().run()
+
+        summary = self.make_sync(targets={'.csv': '.txt'}).run()
+
+        self.assertEqual(summary['converted'], 2)
+        self.assertTrue((self.output / 'a.txt').exists())
+        self.assertFalse((self.output / 'a.json').exists())
+
+    @timing_decorator
+    def test_colliding_outputs_keep_source_extension(self):
+        """Test that a.csv and a.jsonl are not both converted to a.json"""
+        self.write_file('a.jsonl', '{"a": "5"}\n')
+        targets = {'.csv': '.json', '.jsonl': '.json'}
+        summary = self.make_sync(targets).run()
+
+        self.assertEqual((summary['converted'], summary['failed']), (3, []))
+        self.assertFalse((self.output / 'a.json').exists())
+        data = json.loads((self.output / 'a.jsonl.json').read_text(encoding='utf-8'))
+        self.assertEqual(data, [{"a": "5"}])
+        self.assertTrue((self.output / 'a.csv.json').exists())
+        self.assertTrue((self.output / 'nested' / 'b.json').exists())
+
+        summary = self.make_sync(targets).run()
+        self.assertEqual((summary['converted'], summary['unchanged']), (0, 3))
+
+        # Watcher syncs only the new file, its output does not replace b.json
+        self.write_file('nested/b.jsonl', '{"a": "6"}\n')
+        sync = self.make_sync(targets)
+        sync.load_manifest()
+        summary = sync.sync_paths(['nested/b.jsonl'])
+        self.assertEqual(summary['converted'], 1)
+        self.assertTrue((self.output / 'nested' / 'b.jsonl.json').exists())
+        data = json.loads((self.output / 'nested' / 'b.json').read_text(encoding='utf-8'))
+        self.assertEqual(data, [{"a": "3", "b": "4"}])
+
+    @timing_decorator
+    def test_failed_job_is_not_saved_to_manifest(self):
+        """Test that failed file is retried on the next sync"""
+        self.write_file('broken.json', "{not json")
+        sync = self.make_sync(targets={'.json': '.csv'})
+
+        summary = sync.run()
+
+        self.assertEqual(len(summary['failed']), 1)
+        self.assertNotIn('broken.json', sync.manifest)
+
+    @timing_decorator
+    def test_broken_manifest_means_full_sync(self):
+        """Test that broken manifest file is ignored"""
+        self.output.mkdir()
+        (self.output / SYNC_MANIFEST_NAME).write_text("[broken", encoding='utf-8')
+
+        summary = self.make_sync().run()
+        self.assertEqual(summary['converted'], 2)
+
+    @timing_decorator
+    def test_file_hash_depends_on_content(self):
+        """Test content hash helper"""
+        first = file_hash(self.source / 'a.csv')
+        self.write_file('copy.csv', "a,b\n1,2\n")
+        self.assertEqual(first, file_hash(self.source / 'copy.csv'))
+        self.assertNotEqual(first, file_hash(self.source / 'nested' / 'b.csv'))
+
+    @timing_decorator
+    def test_batch_runner_unsupported_job(self):
+        """Test that unsupported job is marked as failed"""
+        job = BatchJob(self.source / 'notes.md', self.output / 'notes.json')
+
+        BatchRunner(workers=1).run_job(job)
+
+        self.assertEqual(job.status, 'failed')
+        self.assertIn("not supported", job.error)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+"""Tests for parquet/arrow tabular convertations"""
+
+import json
+import warnings
+import tempfile
+from pathlib import Path
+
+import unittest
+from unittest.mock import patch
+
+from ui.converters import FileConverter
+from ui.sniffing import FormatSniffer
+from ui.tabular import tabular_available, preview_text
+
+from tests.helpers import timing_decorator
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from pyarrow import feather
+except ImportError:
+    pa = pq = feather = None
+
+
+CSV_DATA = '\ufeffid,name\r\n1,"multi\nline"\r\n2,привет\r\n3,\r\n'
+JSON_ROWS = [
+    {"id": 1, "name": "a", "score": 1.5, "tags": ["x", "y"], "note": None},
+    {"id": 2, "name": "é", "score": None, "tags": [], "note": None},
+]
+
+
+@unittest.skipUnless(tabular_available(), "pyarrow is not installed")
+class TestTabular(unittest.TestCase):
+    """Tests for parquet/arrow sources and targets"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.folder = Path(self.tmp_dir.name)
+        self.converter = FileConverter()
+
+        self.csv_file = self.folder / 'data.csv'
+        self.csv_file.write_bytes(CSV_DATA.encode('utf-8'))
+        self.json_file = self.folder / 'data.json'
+        self.json_file.write_text(json.dumps(JSON_ROWS), encoding='utf-8')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def convert(self, inp, ext):
+        """Convert inp to the file with ext extension"""
+        out = self.folder / f'{Path(inp).stem}_{ext.lstrip(".")}{ext}'
+        self.converter.convert(inp, out)
+        return out
+
+    @timing_decorator
+    def test_csv_round_trip(self):
+        """Test csv -> parquet/arrow/feather -> csv keeps all values as strings"""
+        for ext in ('.parquet', '.arrow', '.feather'):
+            with self.subTest(ext=ext):
+                out = self.convert(self.convert(self.csv_file, ext), '.csv')
+                self.assertEqual(out.read_text(encoding='utf-8'),
+                                 'id,name\n1,"multi\nline"\n2,привет\n3,\n')
+
+    @timing_decorator
+    def test_json_types_are_kept(self):
+        """Test json -> parquet -> json gives the same data"""
+        parquet_file = self.convert(self.json_file, '.parquet')
+        schema = pq.read_schema(parquet_file)
+        self.assertEqual(schema.field('id').type, pa.int64())
+        self.assertEqual(schema.field('score').type, pa.float64())
+
+        out = self.convert(parquet_file, '.json')
+        self.assertEqual(out.read_text(encoding='utf-8'),
+                         json.dumps(JSON_ROWS, ensure_ascii=False, indent=4))
+
+        out = self.convert(parquet_file, '.txt')
+        self.assertEqual(out.read_text(encoding='utf-8').splitlines()[1],
+                         "1\ta\t1.5\t['x', 'y']\t")
+
+    @timing_decorator
+    def test_row_groups(self):
+        """Test that output is written in row groups"""
+        rows = ''.join(f'{i},name {i}\n' for i in range(1000))
+        self.csv_file.write_text('id,name\n' + rows, encoding='utf-8')
+
+        with patch('ui.tabular.TABULAR_ROW_GROUP_ROWS', 300):
+            parquet_file = self.convert(self.csv_file, '.parquet')
+            arrow_file = self.convert(parquet_file, '.arrow')
+
+        metadata = pq.ParquetFile(parquet_file).metadata
+        self.assertEqual(metadata.num_rows, 1000)
+        self.assertEqual(metadata.num_row_groups, 4)
+        with pa.ipc.open_file(arrow_file) as reader:
+            self.assertEqual(reader.num_record_batches, 4)
+
+    @timing_decorator
+    def test_empty_and_invalid_sources(self):
+        """Test header only csv and json which is not a table"""
+        self.csv_file.write_text('a,b\n', encoding='utf-8')
+        out = self.convert(self.convert(self.csv_file, '.parquet'), '.json')
+        self.assertEqual(out.read_text(encoding='utf-8'), '[]')
+
+        self.json_file.write_text('{"a": 1}', encoding='utf-8')
+        with self.assertRaises(ValueError):
+            self.convert(self.json_file, '.parquet')
+
+    @timing_decorator
+    def test_feather_v1_source(self):
+        """Test that old feather files are read too"""
+        feather_file = self.folder / 'old.feather'
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', DeprecationWarning)
+            feather.write_feather(pa.table({'a': [1, 2]}), feather_file, version=1)
+            out = self.convert(feather_file, '.csv')
+
+        self.assertEqual(out.read_text(encoding='utf-8'), 'a\n1\n2\n')
+
+    @timing_decorator
+    def test_preview_and_sniffing(self):
+        """Test preview of the first rows and detection by magic bytes"""
+        parquet_file = self.convert(self.json_file, '.parquet')
+        arrow_file = self.convert(self.json_file, '.arrow')
+
+        text = preview_text(parquet_file, '.parquet', max_rows=1)
+        self.assertEqual(text.splitlines()[0],
+                         'id (int64)\tname (string)\tscore (double)\t'
+                         'tags (list<element: string>)\tnote (null)')
+        self.assertEqual(len(text.splitlines()), 2)
+
+        sniffer = FormatSniffer()
+        self.assertEqual(sniffer.sniff(parquet_file), '.parquet')
+        self.assertEqual(sniffer.detect(arrow_file, '.feather'), '.feather')
+        self.assertTrue(self.converter.can_convert('.parquet', '.feather'))
+        self.assertFalse(self.converter.can_convert('.txt', '.parquet'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+"""Tests for coalesced and debounced GUI updates"""
+
+import sys
+
+import unittest
+
+from PyQt6.QtTest import QTest
+from PyQt6.QtWidgets import QApplication
+
+from ui.throttle import Coalescer, Debouncer
+
+from tests.helpers import timing_decorator
+
+
+class TestThrottle(unittest.TestCase):
+    """Tests for fewer updates of fast signals"""
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication(sys.argv)
+
+    def setUp(self):
+        self.applied = []
+
+    @timing_decorator
+    def test_coalescer(self):
+        """Test that only the latest value is applied on a tick and the timer sleeps when idle"""
+        coalescer = Coalescer(20, self.applied.append)
+        for value in range(100):
+            coalescer.push(value)
+        self.assertEqual(self.applied, [])
+
+        QTest.qWait(100)
+        self.assertEqual(self.applied, [99])
+        self.assertFalse(coalescer.timer.isActive())
+
+        coalescer.push(100)
+        coalescer.flush()
+        coalescer.flush()
+        self.assertEqual(self.applied, [99, 100])
+
+        coalescer.push(101)
+        coalescer.cancel()
+        QTest.qWait(50)
+        self.assertEqual(self.applied, [99, 100])
+
+    @timing_decorator
+    def test_debouncer(self):
+        """Test that value is applied once the pushes stop"""
+        debouncer = Debouncer(40, self.applied.append)
+        for value in range(5):
+            debouncer.push(value)
+            QTest.qWait(5)
+        self.assertEqual(self.applied, [])
+
+        QTest.qWait(120)
+        self.assertEqual(self.applied, [4])
+
+        debouncer.push(5)
+        debouncer.flush()
+        self.assertEqual(self.applied, [4, 5])
+        QTest.qWait(60)
+        self.assertEqual(self.applied, [4, 5])
+
+
+if __name__ == '__main__':
+    unittest.main()
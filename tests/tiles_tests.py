@@ -0,0 +1,98 @@
+"""Tests for image pyramid and tiled viewer"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import unittest
+
+from PIL import Image, ImageChops
+from PyQt6.QtWidgets import QApplication
+
+from ui.previews import load_pyramid
+from ui.tiles import TilePyramid
+from ui.viewer import TiledImageView
+
+from tests.helpers import timing_decorator
+
+
+class TestTiles(unittest.TestCase):
+    """Tests for tiles decoded on demand and bounded memory"""
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication(sys.argv)
+
+    def setUp(self):
+        self.img = Image.effect_noise((1000, 600), 60).convert('RGB')
+        self.pyramid = TilePyramid(self.img, tile_size=128, cache_size=8, level_pixels=300 * 300)
+
+    @timing_decorator
+    def test_levels(self):
+        """Test sizes and grids of the levels"""
+        self.assertEqual(self.pyramid.levels, 4)
+        self.assertEqual([self.pyramid.level_size(level) for level in range(4)],
+                         [(1000, 600), (500, 300), (250, 150), (125, 75)])
+        self.assertEqual(self.pyramid.grid(0), (8, 5))
+        self.assertEqual(self.pyramid.grid(3), (1, 1))
+        self.assertEqual([self.pyramid.level_for_scale(scale) for scale in (4, 1, 0.6, 0.3, 0.01)],
+                         [0, 0, 0, 1, 3])
+        self.assertEqual(TilePyramid(Image.new('L', (10, 10))).levels, 1)
+
+    @timing_decorator
+    def test_tile_content(self):
+        """Test that tiles of fine and coarse levels match the reduced image"""
+        tile = self.pyramid.tile(0, 7, 4)
+        self.assertEqual(tile.tobytes(), self.img.crop((896, 512, 1000, 600)).tobytes())
+
+        tile = self.pyramid.tile(1, 1, 0)
+        self.assertFalse(self.pyramid.is_coarse(1))
+        self.assertEqual(tile.tobytes(), self.img.crop((256, 0, 512, 256)).reduce(2).tobytes())
+
+        tile = self.pyramid.tile(3, 0, 0)
+        self.assertTrue(self.pyramid.is_coarse(3))
+        difference = ImageChops.difference(tile, self.img.reduce(8))
+        self.assertLessEqual(max(high for _, high in difference.getextrema()), 2)
+
+    @timing_decorator
+    def test_cache_bounded(self):
+        """Test that only the latest tiles are kept"""
+        first = self.pyramid.tile(0, 0, 0)
+        self.assertIs(self.pyramid.tile(0, 0, 0), first)
+        for col in range(8):
+            for row in range(5):
+                self.pyramid.tile(0, col, row)
+        self.assertEqual(len(self.pyramid.cache), 8)
+        self.assertNotIn((0, 0, 0), self.pyramid.cache)
+
+    @timing_decorator
+    def test_view_shows_visible_tiles(self):
+        """Test that view keeps only tiles under the viewport"""
+        view = TiledImageView(self.pyramid)
+        view.resize(300, 200)
+        view.show()
+        self.app.processEvents()
+        view.fit()
+        self.assertEqual(view.level, 1)
+        self.assertEqual(set(view.items), {(1, col, row) for col in range(4) for row in range(3)})
+
+        view.zoom(8 / view.scale_factor())
+        self.assertEqual(view.level, 0)
+        self.assertLessEqual(len(view.items), 4)
+        self.assertEqual({key[0] for key in view.items}, {0})
+        self.assertEqual(len(view.scene().items()), len(view.items))
+        view.close()
+
+    @timing_decorator
+    def test_load_pyramid(self):
+        """Test that pyramid of the source file is made by the loader"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            png_file = Path(tmp_dir) / 'picture.png'
+            self.img.save(png_file)
+            pyramid = load_pyramid(None, png_file)
+        self.assertEqual(pyramid.size, (1000, 600))
+        self.assertEqual(pyramid.pixel(5, 5), self.img.getpixel((5, 5)))
+        self.assertIsNone(pyramid.pixel(1000, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
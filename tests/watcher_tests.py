@@ -0,0 +1,157 @@
+"""Tests for hot folder watcher"""
+
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+import unittest
+from unittest.mock import Mock
+
+from PyQt6.QtCore import QCoreApplication
+
+from ui.sync import FolderSync
+from ui.watcher import HotFolderWatcher
+
+from tests.helpers import timing_decorator
+
+
+class TestHotFolderWatcher(unittest.TestCase):
+    """Tests for HotFolderWatcher debounce logic"""
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.source = Path(self.tmp_dir.name) / 'source'
+        self.output = Path(self.tmp_dir.name) / 'output'
+        self.source.mkdir()
+        (self.source / 'old.csv').write_text("a\n1\n", encoding='utf-8')
+
+        folder_sync = FolderSync(self.source, self.output, {'.csv': '.json'})
+        self.watcher = HotFolderWatcher(folder_sync, debounce_ms=10)
+        self.watcher.submit = Mock()
+        self.watcher.start()
+        self.watcher.submit.reset_mock()
+
+    def tearDown(self):
+        self.watcher.stop()
+        self.tmp_dir.cleanup()
+
+    def changed(self):
+        """Simulate QFileSystemWatcher event and debounce timeout"""
+        self.watcher.on_directory_changed(str(self.source))
+        self.watcher.process_changes()
+
+    @timing_decorator
+    def test_existing_files_are_not_pending(self):
+        """Test that files existing before start are left for full sync"""
+        self.assertEqual(self.watcher.pending, {})
+        self.assertIn('old.csv', self.watcher.snapshots[str(self.source)])
+
+    @timing_decorator
+    def test_new_file_waits_for_stable_size(self):
+        """Test that new file is converted only after second check"""
+        (self.source / 'new.csv').write_text("a\n1\n", encoding='utf-8')
+
+        self.changed()
+        self.assertIn('new.csv', self.watcher.pending)
+        self.watcher.submit.assert_not_called()
+
+        self.watcher.process_changes()
+        self.assertEqual(self.watcher.ready, {'new.csv'})
+        self.watcher.submit.assert_called_once()
+
+    @timing_decorator
+    def test_growing_file_stays_pending(self):
+        """Test that file which is still being written is not converted"""
+        path = self.source / 'big.csv'
+        path.write_text("a\n1\n", encoding='utf-8')
+        self.changed()
+
+        with open(path, 'a', encoding='utf-8') as file:
+            file.write("2\n")
+        self.watcher.process_changes()
+
+        self.assertIn('big.csv', self.watcher.pending)
+        self.assertEqual(self.watcher.ready, set())
+
+    @timing_decorator
+    def test_deleted_file_is_removed(self):
+        """Test that deleted file is submitted for output removal"""
+        (self.source / 'old.csv').unlink()
+
+        self.changed()
+
+        self.assertEqual(self.watcher.removed, {'old.csv'})
+        self.watcher.submit.assert_called_once()
+
+    @timing_decorator
+    def test_new_subfolder_is_watched(self):
+        """Test that files of new subfolder are picked up"""
+        nested = self.source / 'nested'
+        nested.mkdir()
+        (nested / 'inner.csv').write_text("a\n1\n", encoding='utf-8')
+
+        self.changed()
+        self.watcher.process_changes()
+
+        self.assertIn(str(nested), self.watcher.fs_watcher.directories())
+        self.assertIn('nested/inner.csv', self.watcher.ready)
+
+    @timing_decorator
+    def test_ignored_files(self):
+        """Test that hidden and partial files are ignored"""
+        self.assertTrue(self.watcher.is_ignored('.hidden.csv'))
+        self.assertTrue(self.watcher.is_ignored('video.mp4.part'))
+        self.assertFalse(self.watcher.is_ignored('data.csv'))
+
+    @timing_decorator
+    def test_events_do_not_delay_check(self):
+        """Test that continuous events do not restart the debounce timer"""
+        self.watcher.debounce_timer.setInterval(1000)
+        self.watcher.on_directory_changed(str(self.source))
+        remaining = self.watcher.debounce_timer.remainingTime()
+        time.sleep(0.05)
+
+        self.watcher.on_directory_changed(str(self.source))
+        self.assertLess(self.watcher.debounce_timer.remainingTime(), remaining)
+
+    @timing_decorator
+    def test_stop_waits_for_running_sync(self):
+        """Test that stopped watcher drops collected files and reports the end of its last sync"""
+        stopped = Mock()
+        self.watcher.stopped.connect(stopped)
+        self.watcher.worker = Mock()
+        self.watcher.ready.add('new.csv')
+        self.watcher.dirty_dirs.add(str(self.source))
+
+        self.watcher.stop()
+        self.assertEqual((self.watcher.ready, self.watcher.removed, self.watcher.dirty_dirs), (set(), set(), set()))
+        stopped.assert_not_called()
+
+        # Files collected after stop are not synced, stopped is emitted by the last sync
+        self.watcher.removed.add('old.csv')
+        self.watcher.on_sync_finished({'converted': 0})
+        HotFolderWatcher.submit(self.watcher)
+        self.assertIsNone(self.watcher.worker)
+        self.assertEqual(self.watcher.removed, {'old.csv'})
+        stopped.assert_called_once()
+
+    @timing_decorator
+    def test_sync_paths_converts_only_given_files(self):
+        """Test FolderSync.sync_paths used by the watcher"""
+        folder_sync = self.watcher.folder_sync
+        folder_sync.load_manifest()
+        (self.source / 'new.csv').write_text("a\n1\n", encoding='utf-8')
+
+        summary = folder_sync.sync_paths(['new.csv'])
+
+        self.assertEqual(summary['converted'], 1)
+        self.assertTrue((self.output / 'new.json').exists())
+        self.assertFalse((self.output / 'old.json').exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
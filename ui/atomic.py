@@ -0,0 +1,105 @@
+"""Atomic - outputs are written to a temporary file in the folder of the output
+and renamed over it only when they are complete, an interrupted convertation
+never leaves a truncated output. OutputSync decides when written data is
+flushed to the disk (see FSYNC_POLICIES)"""
+
+import os
+import secrets
+import threading
+from contextlib import contextmanager
+
+from ui.constants import ATOMIC_TEMP_PREFIX, FSYNC_POLICIES, FSYNC_POLICY_DEFAULT
+
+
+def temp_path(out):
+    """Hidden temporary path next to out. Whole name of out is kept at the end,
+    so writers still see its extension (data.json.gz)"""
+    folder, name = os.path.split(os.fspath(out))
+    return os.path.join(folder, f"{ATOMIC_TEMP_PREFIX}{secrets.token_hex(4)}-{name}")
+
+
+def fsync_path(path):
+    """Flush file or folder to the disk.
+    Folders can not be opened on Windows, rename is durable there by itself"""
+    if os.name == 'nt' and os.path.isdir(path):
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def remove_temps(folder):
+    """Remove temporary files left in the folder by an interrupted run. Returns their number"""
+    removed = 0
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if not entry.name.startswith(ATOMIC_TEMP_PREFIX) or not entry.is_file():
+                    continue
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    continue
+                removed += 1
+    except OSError:
+        pass
+    return removed
+
+
+class OutputSync():
+    """Writes outputs through temporary files and flushes them by the policy:
+    'none' - data is left to the OS, 'file' - every output is flushed before
+    it is renamed, 'batch' - outputs are flushed together by flush().
+    With 'batch' outputs renamed after the last flush can be incomplete after
+    a power loss (not after a crash of the app)"""
+
+    def __init__(self, policy=FSYNC_POLICY_DEFAULT):
+        if policy not in FSYNC_POLICIES:
+            raise ValueError(f"Fsync policy {policy} is not supported")
+        self.policy = policy
+        self.pending = []
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def output(self, out):
+        """Yield temporary path to write instead of out.
+        It replaces out when the block succeeds and is removed when it fails"""
+        out = os.fspath(out)
+        tmp = temp_path(out)
+        try:
+            yield tmp
+            self.commit(tmp, out)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def commit(self, tmp, out):
+        """Rename complete temporary file to out"""
+        if self.policy == 'file':
+            fsync_path(tmp)
+        os.replace(tmp, out)
+        if self.policy == 'file':
+            fsync_path(os.path.dirname(out) or os.curdir)
+        elif self.policy == 'batch':
+            with self.lock:
+                self.pending.append(out)
+
+    def flush(self):
+        """Flush outputs renamed since the last flush and their folders.
+        Returns number of flushed files"""
+        with self.lock:
+            pending, self.pending = self.pending, []
+
+        flushed = 0
+        for path in pending:
+            # Output can be removed or replaced by the next run already
+            if os.path.exists(path):
+                fsync_path(path)
+                flushed += 1
+        for folder in {os.path.dirname(path) or os.curdir for path in pending}:
+            if os.path.isdir(folder):
+                fsync_path(folder)
+        return flushed
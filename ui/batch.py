@@ -0,0 +1,77 @@
+"""Batch - running many convertation jobs through FileConverter"""
+
+import os
+import csv
+from pathlib import Path
+
+from ui.converters import FileConverter
+from ui.scheduler import JobScheduler, estimate_load
+
+
+# pylint: disable=too-few-public-methods
+class BatchJob():
+    """One convertation job: input file, output file and job options"""
+
+    def __init__(self, inp, out, options=None):
+        self.inp = str(inp)
+        self.out = str(out)
+        self.options = options or {}
+
+        self.status = 'pending'
+        self.error = None
+        # Done by an earlier run which was recorded in the journal
+        self.resumed = False
+
+
+class BatchRunner():
+    """Runs convertation jobs in a pool of worker threads.
+    Jobs are started by JobScheduler: workers CPU-bound jobs at a time and
+    no more memory-heavy jobs than fit the memory budget"""
+
+    def __init__(self, file_converter=None, workers=None, scheduler=None):
+        self.file_converter = file_converter or FileConverter()
+        self.workers = workers or os.cpu_count() or 1
+        self.scheduler = scheduler or JobScheduler(cpu_slots=self.workers)
+
+    def run_job(self, job):
+        """Convert one job, errors are saved to the job instead of raising"""
+        try:
+            Path(job.out).parent.mkdir(parents=True, exist_ok=True)
+            self.file_converter.convert(job.inp, job.out, profile=job.options.get('image_profile'))
+            job.status = 'done'
+        except (OSError, ValueError, TypeError, RuntimeError, csv.Error) as e:
+            job.status = 'failed'
+            job.error = str(e)
+        return job
+
+    def run(self, jobs, on_done=None, journal=None):
+        """Run all jobs, on_done(job) is called in the calling thread.
+        With JobJournal jobs finished by an earlier run are not run again"""
+        if not jobs:
+            return jobs
+
+        to_run = jobs
+        if journal:
+            to_run = journal.add(jobs)
+            for job in jobs:
+                if job.resumed and on_done:
+                    on_done(job)
+
+        try:
+            for job in self.scheduler.run(to_run, self.run_job, self.job_load):
+                if journal:
+                    journal.finish(job)
+                if on_done:
+                    on_done(job)
+        finally:
+            # Outputs of the 'batch' fsync policy are flushed once per run
+            self.file_converter.output_sync.flush()
+        return jobs
+
+    def job_load(self, job):
+        """Resources the job needs, see ui.scheduler"""
+        return estimate_load(job, self.file_converter, self.scheduler.cpu_slots)
+
+    def resume(self, journal, on_done=None):
+        """Run jobs of the journal which did not finish"""
+        return self.run(journal.unfinished(), on_done, journal)
@@ -0,0 +1,301 @@
+"""Batch_tab - module with BatchTab for folder sync on PyQt6"""
+
+from PyQt6.QtCore import Qt, QThreadPool
+from PyQt6.QtWidgets import (QWidget, QLabel, QPushButton, QVBoxLayout, QHBoxLayout,
+                             QComboBox, QLineEdit, QFileDialog, QGridLayout, QSpinBox)
+
+from ui.batch import BatchRunner
+from ui.converters import FileConverter
+from ui.imaging import profile_options
+from ui.settings import load_image_profile, save_image_profile, load_fsync_policy, save_fsync_policy
+from ui.sync import FolderSync
+from ui.watcher import HotFolderWatcher
+from ui.workers import Worker
+from ui.constants import (SUPPORTED_CONVERT_EXTENSIONS_PICTURES, SUPPORTED_CONVERT_EXTENSIONS_FILES,
+                          SUPPORTED_CONVERT_EXTENSIONS_VIDEO_AUDIO, PIC_EXTENSION_MAP,
+                          IMAGE_EFFORT_OPTIONS, IMAGE_PROFILES, IMAGE_PROFILE_DEFAULT, FSYNC_POLICIES)
+
+
+SKIP_TARGET = "Skip"
+
+
+class BatchTab(QWidget):
+    """BatchTab initializing and showing folder sync widgets"""
+
+    def __init__(self, main_window):
+        super().__init__()
+        self.main_window = main_window
+
+        self.setup_default_values()
+        self.init_folder_rows()
+        self.init_target_boxes()
+        self.init_buttons()
+        self.setup_widgets_to_layout()
+
+    def setup_default_values(self):
+        """Values by default"""
+        self.file_converter = FileConverter()
+        self.sync_worker = None
+        self.hot_folder = None
+
+    def init_folder_rows(self):
+        """Creating source/output folder fields"""
+        self.source_field = QLineEdit()
+        self.source_field.setReadOnly(True)
+        self.source_field.setPlaceholderText("Source folder")
+        self.source_btn = QPushButton("Source")
+        self.source_btn.setFixedSize(100, 30)
+        self.source_btn.clicked.connect(
+            lambda: self.choose_folder(self.source_field))
+
+        self.output_field = QLineEdit()
+        self.output_field.setReadOnly(True)
+        self.output_field.setPlaceholderText("Output folder")
+        self.output_btn = QPushButton("Output")
+        self.output_btn.setFixedSize(100, 30)
+        self.output_btn.clicked.connect(
+            lambda: self.choose_folder(self.output_field))
+
+    def init_target_boxes(self):
+        """Creating QComboBoxes with output format for every group"""
+        self.target_boxes = {}
+        groups = (("Pictures to", SUPPORTED_CONVERT_EXTENSIONS_PICTURES),
+                  ("Files to", SUPPORTED_CONVERT_EXTENSIONS_FILES),
+                  ("Media to", SUPPORTED_CONVERT_EXTENSIONS_VIDEO_AUDIO))
+        for title, group in groups:
+            box = QComboBox()
+            box.addItems([SKIP_TARGET] + group)
+            box.setFixedSize(100, 30)
+            self.target_boxes[title] = (box, group)
+
+        # Image encoder profile and speed/effort of the pictures target
+        self.profile_box = QComboBox()
+        self.profile_box.addItems(list(IMAGE_PROFILES))
+        self.profile_box.setCurrentText(load_image_profile())
+        self.profile_box.setFixedSize(100, 30)
+        self.profile_box.currentTextChanged.connect(self.on_profile_changed)
+
+        self.effort_box = QSpinBox()
+        self.effort_box.setFixedSize(60, 30)
+        self.effort_box.setEnabled(False)
+        self.target_boxes["Pictures to"][0].currentTextChanged.connect(self.update_effort_box)
+
+    def init_buttons(self):
+        """Creating buttons"""
+        self.sync_btn = QPushButton("Sync")
+        self.sync_btn.setFixedSize(100, 40)
+        self.sync_btn.clicked.connect(self.start_sync)
+
+        self.watch_btn = QPushButton("Watch")
+        self.watch_btn.setFixedSize(100, 40)
+        self.watch_btn.setCheckable(True)
+        self.watch_btn.setToolTip("Convert files dropped into source folder automatically")
+        self.watch_btn.toggled.connect(self.toggle_hot_folder)
+
+        # Durability vs throughput of the outputs
+        self.fsync_box = QComboBox()
+        self.fsync_box.addItems(list(FSYNC_POLICIES))
+        self.fsync_box.setCurrentText(load_fsync_policy())
+        self.fsync_box.setFixedSize(100, 30)
+        self.fsync_box.setToolTip("none - fastest, file - every output is flushed to disk, "
+                                  "batch - outputs are flushed once at the end of the run")
+        self.fsync_box.currentTextChanged.connect(save_fsync_policy)
+
+        self.result_label = QLabel(
+            "Choose folders and output formats. Press 'Sync' to convert new and changed files.")
+        self.result_label.setWordWrap(True)
+
+    def setup_widgets_to_layout(self):
+        """Adding all widgets to the layout"""
+        folders_layout = QGridLayout()
+        folders_layout.addWidget(self.source_field, 0, 0)
+        folders_layout.addWidget(self.source_btn, 0, 1)
+        folders_layout.addWidget(self.output_field, 1, 0)
+        folders_layout.addWidget(self.output_btn, 1, 1)
+
+        targets_layout = QHBoxLayout()
+        targets_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        for title, (box, _) in self.target_boxes.items():
+            targets_layout.addWidget(QLabel(title))
+            targets_layout.addWidget(box)
+            if title == "Pictures to":
+                targets_layout.addWidget(QLabel("Profile"))
+                targets_layout.addWidget(self.profile_box)
+                targets_layout.addWidget(QLabel("Effort"))
+                targets_layout.addWidget(self.effort_box)
+            targets_layout.addSpacing(10)
+
+        buttons_layout = QHBoxLayout()
+        buttons_layout.addStretch(1)
+        buttons_layout.addWidget(QLabel("Fsync"))
+        buttons_layout.addWidget(self.fsync_box)
+        buttons_layout.addSpacing(10)
+        buttons_layout.addWidget(self.sync_btn)
+        buttons_layout.addSpacing(10)
+        buttons_layout.addWidget(self.watch_btn)
+        buttons_layout.addStretch(1)
+
+        main_layout = QVBoxLayout()
+        main_layout.addLayout(folders_layout)
+        main_layout.addLayout(targets_layout)
+        main_layout.addLayout(buttons_layout)
+        main_layout.addWidget(self.result_label)
+        main_layout.addStretch(1)
+        main_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
+        self.setLayout(main_layout)
+
+    # pylint: disable=broad-exception-caught
+    def choose_folder(self, field):
+        """Folder dialog for source/output field"""
+        folder = None
+        try:
+            folder = QFileDialog.getExistingDirectory(self.main_window, "Select Folder")
+        except Exception as e:
+            self.main_window.statusBar().showMessage(str(e))
+
+        if not folder:
+            self.main_window.statusBar().showMessage("Folder is not choosen")
+            return
+        field.setText(folder)
+
+    def pictures_format(self):
+        """PIL format of the pictures target or None"""
+        target = self.target_boxes["Pictures to"][0].currentText()
+        return PIC_EXTENSION_MAP.get(target.lstrip('.').upper())
+
+    def update_effort_box(self):
+        """Show encoder speed/effort range of the pictures target"""
+        option = IMAGE_EFFORT_OPTIONS.get(self.pictures_format())
+        if not option:
+            self.effort_box.setEnabled(False)
+            return
+
+        name, low, high, default = option
+        options = profile_options(self.profile_box.currentText(), self.pictures_format())
+        self.effort_box.setRange(low, high)
+        self.effort_box.setValue(options.get(name, default))
+        self.effort_box.setToolTip(f"Encoder {name}: {low}-{high}")
+        self.effort_box.setEnabled(True)
+
+    def on_profile_changed(self, profile):
+        """Profile box logic, effort is reset to the value of the profile"""
+        save_image_profile(profile)
+        self.update_effort_box()
+
+    def image_effort(self):
+        """{PIL format: effort} of the pictures target, empty if it has no effort knob"""
+        real_format = self.pictures_format()
+        if real_format not in IMAGE_EFFORT_OPTIONS:
+            return {}
+        return {real_format: self.effort_box.value()}
+
+    def get_targets(self):
+        """Build {source extension: output extension} from QComboBoxes"""
+        targets = {}
+        for box, group in self.target_boxes.values():
+            target = box.currentText()
+            if target == SKIP_TARGET:
+                continue
+            for ext in group:
+                if self.file_converter.can_convert(ext, target):
+                    targets[ext] = target
+        return targets
+
+    def create_folder_sync(self):
+        """Create FolderSync from chosen folders and formats or None"""
+        source, output = self.source_field.text(), self.output_field.text()
+        if not source or not output:
+            self.main_window.statusBar().showMessage("Choose source and output folders first")
+            return None
+
+        targets = self.get_targets()
+        if not targets:
+            self.main_window.statusBar().showMessage("Choose at least one output format")
+            return None
+
+        # Image options are saved to the manifest, changing them reconverts the files.
+        # Profile goes to every job, effort is set for the whole runner
+        options = {}
+        image_effort = self.image_effort()
+        if image_effort:
+            options['image_effort'] = image_effort
+        if self.profile_box.currentText() != IMAGE_PROFILE_DEFAULT:
+            options['image_profile'] = self.profile_box.currentText()
+        runner = BatchRunner(FileConverter(image_effort=image_effort,
+                                           fsync=self.fsync_box.currentText()))
+        return FolderSync(source, output, targets, runner=runner, options=options)
+
+    def start_sync(self):
+        """Sync button logic"""
+        if self.sync_worker or self.hot_folder:
+            self.main_window.statusBar().showMessage("Sync is already running")
+            return
+
+        folder_sync = self.create_folder_sync()
+        if not folder_sync:
+            return
+
+        self.sync_worker = Worker(folder_sync.run)
+        self.sync_worker.signals.finished.connect(self.on_sync_finished)
+        self.sync_worker.signals.error.connect(self.on_sync_error)
+        self.sync_btn.setEnabled(False)
+        self.main_window.statusBar().showMessage("Sync started")
+        QThreadPool.globalInstance().start(self.sync_worker)
+
+    def on_sync_finished(self, summary):
+        """Sync is finished"""
+        self.sync_worker = None
+        self.sync_btn.setEnabled(True)
+        self.show_summary(summary)
+        self.main_window.statusBar().showMessage("Sync finished")
+
+    def show_summary(self, summary):
+        """Show sync summary"""
+        text = (f"Converted: {summary['converted']}, resumed: {summary['resumed']}, "
+                f"removed: {summary['removed']}, unchanged: {summary['unchanged']}, "
+                f"failed: {len(summary['failed'])}")
+        for inp, error in summary['failed'][:10]:
+            text += f"\n{inp}: {error}"
+        self.result_label.setText(text)
+
+    def on_sync_error(self, error):
+        """Show sync error"""
+        self.sync_worker = None
+        self.sync_btn.setEnabled(not self.hot_folder)
+        self.main_window.statusBar().showMessage(f"Sync error: {error}")
+
+    def toggle_hot_folder(self, checked):
+        """Watch button logic"""
+        if not checked:
+            if self.hot_folder:
+                # Sync of the watcher can still be running, it must finish before the next sync
+                hot_folder, self.hot_folder = self.hot_folder, None
+                self.watch_btn.setEnabled(False)
+                hot_folder.stopped.connect(self.on_hot_folder_stopped)
+                hot_folder.stop()
+                self.main_window.statusBar().showMessage("Stopped watching source folder")
+                return
+            self.sync_btn.setEnabled(not self.sync_worker)
+            return
+
+        folder_sync = self.create_folder_sync() if not self.sync_worker else None
+        if not folder_sync:
+            self.watch_btn.setChecked(False)
+            return
+
+        self.hot_folder = HotFolderWatcher(folder_sync, parent=self)
+        self.hot_folder.synced.connect(self.on_hot_folder_synced)
+        self.hot_folder.error.connect(self.on_sync_error)
+        self.hot_folder.start()
+        self.sync_btn.setEnabled(False)
+        self.main_window.statusBar().showMessage(f"Watching: {folder_sync.source_dir}")
+
+    def on_hot_folder_stopped(self):
+        """Last sync of the stopped watcher is finished"""
+        self.sender().deleteLater()
+        self.watch_btn.setEnabled(True)
+        self.sync_btn.setEnabled(not self.sync_worker)
+
+    def on_hot_folder_synced(self, summary):
+        """Show summary of the last hot folder sync"""
+        self.show_summary(summary)
@@ -0,0 +1,40 @@
+"""Cache - bounded LRU cache shared by workers, the least recently used
+entry is dropped when the cache is full"""
+
+import threading
+from collections import OrderedDict
+
+# Default of get() for caches which keep None values
+MISSING = object()
+
+
+class LRUCache():
+    """Thread-safe mapping of at most size entries"""
+
+    def __init__(self, size):
+        self.size = size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.entries
+
+    def get(self, key, default=None):
+        """Cached value of the key, marked as the most recent one"""
+        with self.lock:
+            if key not in self.entries:
+                return default
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+    def put(self, key, value):
+        """Store value, the oldest entry is dropped when the cache is full"""
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.size:
+                self.entries.popitem(last=False)
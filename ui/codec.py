@@ -0,0 +1,120 @@
+"""Codec - JSON encode/decode with the fastest installed backend.
+Output is always the same as json.dumps(obj, ensure_ascii=False, indent=4)
+or json.dumps(obj, ensure_ascii=False) for JSON Lines"""
+
+import json
+
+from ui.constants import JSON_BACKENDS
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+class StdlibJson():
+    """Standard library json, always available"""
+    name = 'json'
+
+    @staticmethod
+    def loads(data):
+        """Decode json str or utf-8 bytes"""
+        return json.loads(data if isinstance(data, str) else str(data, 'utf-8'))
+
+    @staticmethod
+    def dumps(obj):
+        """Encode obj with indent=4 and non-ascii chars as is"""
+        return json.dumps(obj, ensure_ascii=False, indent=4)
+
+    @staticmethod
+    def dumps_line(obj):
+        """Encode obj in one line with non-ascii chars as is"""
+        return json.dumps(obj, ensure_ascii=False)
+
+
+class MsgspecJson():
+    """msgspec.json, decodes bytes and memoryview without copying"""
+    name = 'msgspec'
+
+    @staticmethod
+    def loads(data):
+        """Decode json str, bytes or memoryview"""
+        return msgspec.json.decode(data)
+
+    @staticmethod
+    def dumps(obj):
+        """Encode obj and reformat it the same way as json.dumps(indent=4)"""
+        return msgspec.json.format(msgspec.json.encode(obj), indent=4).decode('utf-8')
+
+    @staticmethod
+    def dumps_line(obj):
+        """Encode obj in one line the same way as json.dumps"""
+        return msgspec.json.format(msgspec.json.encode(obj), indent=0).decode('utf-8')
+
+
+# name -> (backend, installed)
+BACKENDS = {
+    'msgspec': (MsgspecJson, msgspec is not None),
+    'json': (StdlibJson, True),
+}
+
+
+# Types encoded the same way by every backend
+PLAIN_SCALARS = frozenset((str, int, bool, type(None)))
+PLAIN_CONTAINERS = frozenset((list, dict))
+PLAIN_TYPES = PLAIN_SCALARS | PLAIN_CONTAINERS
+
+
+def plain_json(obj):
+    """Check that obj is encoded the same way by every backend.
+    Floats (1e+16 vs 1e16, NaN), tuples and non-str keys are left for json.
+    Types are checked per container with set operations to keep it cheap"""
+    stack = [[obj]]
+    while stack:
+        items = stack.pop()
+        if isinstance(items, dict):
+            if not set(map(type, items)) <= {str}:
+                return False
+            items = items.values()
+
+        types = set(map(type, items))
+        if types <= PLAIN_SCALARS:
+            continue
+        if not types <= PLAIN_TYPES:
+            return False
+        stack.extend(item for item in items if type(item) in PLAIN_CONTAINERS)
+    return True
+
+
+class JsonCodec():
+    """loads/dumps through the first installed backend from JSON_BACKENDS.
+    Anything the fast backend can not handle the same way goes to stdlib json"""
+
+    def __init__(self, backends=JSON_BACKENDS):
+        self.backend = next((BACKENDS[name][0] for name in backends
+                             if name in BACKENDS and BACKENDS[name][1]), StdlibJson)
+
+    def loads(self, data):
+        """Decode json str, bytes or memoryview"""
+        if self.backend is not StdlibJson:
+            try:
+                return self.backend.loads(data)
+            except ValueError:
+                # NaN/Infinity, lone surrogates, huge floats: json decides
+                pass
+        return StdlibJson.loads(data)
+
+    def dumps(self, obj):
+        """Encode obj as json.dumps(obj, ensure_ascii=False, indent=4)"""
+        if self.backend is not StdlibJson and plain_json(obj):
+            return self.backend.dumps(obj)
+        return StdlibJson.dumps(obj)
+
+    def dumps_line(self, obj):
+        """Encode obj as json.dumps(obj, ensure_ascii=False), used for JSON Lines"""
+        if self.backend is not StdlibJson and plain_json(obj):
+            return self.backend.dumps_line(obj)
+        return StdlibJson.dumps_line(obj)
+
+
+json_codec = JsonCodec()
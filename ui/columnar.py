@@ -0,0 +1,100 @@
+"""Columnar - csv -> json/txt through pyarrow column buffers.
+Rows are never turned into dicts: output text is built per column with
+pyarrow.compute and joined per batch. Used for large files when pyarrow is
+installed, anything pyarrow reads differently is left to csv.DictReader"""
+
+# pylint: disable=no-member
+
+from json.encoder import encode_basestring
+
+from ui.parallel import read_fieldnames, INDENT
+from ui.constants import COLUMNAR_BLOCK_SIZE
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.compute as pc
+except ImportError:
+    pa = None
+
+# Chars escaped by json.dumps(ensure_ascii=False)
+JSON_ESCAPE_RE = r'[\x00-\x1f"\\]'
+
+
+def columnar_available():
+    """Check if pyarrow is installed"""
+    return pa is not None
+
+
+def open_csv_reader(path, fieldnames):
+    """Streaming pyarrow reader with excel dialect and all columns as strings"""
+    return pa_csv.open_csv(
+        path,
+        read_options=pa_csv.ReadOptions(block_size=COLUMNAR_BLOCK_SIZE),
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True, ignore_empty_lines=True),
+        convert_options=pa_csv.ConvertOptions(
+            column_types={name: pa.string() for name in fieldnames},
+            strings_can_be_null=False, quoted_strings_can_be_null=False))
+
+
+def join_all(values, sep):
+    """All values of the string array joined with sep into one str"""
+    lists = pa.ListArray.from_arrays(pa.array([0, len(values)], pa.int32()), values)
+    return pc.binary_join(lists, sep)[0].as_py()
+
+
+def json_values(column):
+    """Column values as json strings"""
+    if pc.any(pc.match_substring_regex(column, JSON_ESCAPE_RE)).as_py():
+        return pa.array([encode_basestring(value) for value in column.to_pylist()], pa.string())
+    return pc.binary_join_element_wise('"', column, '"', '')
+
+
+def batch_json(batch):
+    """Rows of the batch as items of the json list dumped with indent=4"""
+    fields = [pc.binary_join_element_wise(f"{INDENT * 2}{encode_basestring(name)}: ",
+                                          json_values(column), '')
+              for name, column in zip(batch.schema.names, batch.columns)]
+    rows = pc.binary_join_element_wise(*fields, ',\n')
+    items = pc.binary_join_element_wise(f"{INDENT}{{\n", rows, f"\n{INDENT}}}", '')
+    return join_all(items, ',\n')
+
+
+def batch_txt(batch):
+    """Rows of the batch as tab separated lines"""
+    rows = pc.binary_join_element_wise(*batch.columns, '\t')
+    return join_all(rows, '\n') + '\n'
+
+
+def write_csv_columnar(inp, out, out_format):
+    """Convert csv file to .json or .txt with pyarrow.
+    Returns False if the file has to be converted by csv.DictReader instead"""
+    fieldnames = read_fieldnames(inp)
+    # pyarrow drops BOM and can not keep the last of the same named columns
+    if (not fieldnames or len(set(fieldnames)) != len(fieldnames)
+            or fieldnames[0].startswith('\ufeff')):
+        return False
+
+    try:
+        with open_csv_reader(inp, fieldnames) as reader, \
+                open(out, 'w', encoding='utf-8') as out_file:
+            if reader.schema.names != fieldnames:
+                return False
+
+            if out_format == '.txt':
+                out_file.write('\t'.join(fieldnames) + '\n')
+                for batch in reader:
+                    if batch.num_rows:
+                        out_file.write(batch_txt(batch))
+                return True
+
+            first = True
+            for batch in reader:
+                if batch.num_rows:
+                    out_file.write(('[\n' if first else ',\n') + batch_json(batch))
+                    first = False
+            out_file.write('[]' if first else '\n]')
+    except pa.ArrowInvalid:
+        # Ragged rows, unclosed quotes, bad utf-8: csv.DictReader decides
+        return False
+    return True
@@ -0,0 +1,135 @@
+"""Compare - source and converted image in one view with quality metrics.
+Split mode shows the source on the left of the movable line and the
+converted image on the right, overlay blends them, difference shows
+changed pixels"""
+
+import math
+
+from PyQt6.QtCore import Qt, QRect
+from PyQt6.QtGui import QPixmap, QPainter, QPen
+from PyQt6.QtWidgets import QWidget, QDialog, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QSlider
+
+from ui.constants import COMPARE_MODES
+from ui.previews import to_qimage
+
+
+def metrics_text(comparison):
+    """One line summary of the comparison"""
+    parts = []
+    if comparison.psnr is None:
+        parts.append("PSNR/SSIM need numpy")
+    else:
+        psnr_text = "inf (identical)" if math.isinf(comparison.psnr) else f"{comparison.psnr:.2f} dB"
+        parts.append(f"PSNR {psnr_text}  SSIM {comparison.ssim:.4f}")
+    parts.append(f"Size {comparison.size / 1024:.1f} KB of {comparison.original_size / 1024:.1f} KB")
+    if comparison.size_ratio is not None:
+        parts.append(f"({comparison.size_ratio:.2f})")
+    return "  ".join(parts)
+
+
+class SplitView(QWidget):
+    """Source and converted image drawn over each other, mouse moves the split line"""
+
+    def __init__(self, comparison, parent=None):
+        super().__init__(parent)
+        self.original = QPixmap.fromImage(to_qimage(comparison.original))
+        self.converted = QPixmap.fromImage(to_qimage(comparison.converted))
+        self.difference = (QPixmap.fromImage(to_qimage(comparison.difference))
+                           if comparison.difference else None)
+        self.mode = COMPARE_MODES[0]
+        self.split = 0.5
+        self.opacity = 0.5
+        self.setMinimumSize(300, 200)
+
+    def set_mode(self, mode):
+        """Mode box logic"""
+        self.mode = mode
+        self.update()
+
+    def set_opacity(self, value):
+        """Opacity slider logic, value in percents"""
+        self.opacity = value / 100
+        self.update()
+
+    def image_rect(self):
+        """Place of the images, scaled to the widget with the same aspect ratio"""
+        size = self.original.size().scaled(self.size(), Qt.AspectRatioMode.KeepAspectRatio)
+        rect = QRect(0, 0, size.width(), size.height())
+        rect.moveCenter(self.rect().center())
+        return rect
+
+    def mousePressEvent(self, event):  # pylint: disable=invalid-name
+        """Click moves the split line"""
+        self.move_split(event.position().x())
+
+    def mouseMoveEvent(self, event):  # pylint: disable=invalid-name
+        """Drag moves the split line"""
+        self.move_split(event.position().x())
+
+    def move_split(self, x):
+        """Split line at widget x"""
+        rect = self.image_rect()
+        if rect.width():
+            self.split = min(max((x - rect.left()) / rect.width(), 0), 1)
+            self.update()
+
+    def paintEvent(self, _event):  # pylint: disable=invalid-name
+        """Draw images of the current mode"""
+        painter = QPainter(self)
+        rect = self.image_rect()
+        if self.mode == 'Difference' and self.difference:
+            painter.drawPixmap(rect, self.difference)
+            return
+
+        painter.drawPixmap(rect, self.original)
+        if self.mode == 'Overlay':
+            painter.setOpacity(self.opacity)
+            painter.drawPixmap(rect, self.converted)
+            return
+
+        split_x = rect.left() + round(rect.width() * self.split)
+        source_x = round(self.converted.width() * self.split)
+        painter.drawPixmap(QRect(split_x, rect.top(), rect.right() - split_x + 1, rect.height()),
+                           self.converted,
+                           QRect(source_x, 0, self.converted.width() - source_x, self.converted.height()))
+        painter.setPen(QPen(Qt.GlobalColor.white, 2))
+        painter.drawLine(split_x, rect.top(), split_x, rect.bottom())
+
+
+class CompareDialog(QDialog):  # pylint: disable=too-few-public-methods
+    """Window with the compare view, its mode and the metrics"""
+
+    def __init__(self, comparison, title, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"Compare - {title}")
+        self.resize(900, 700)
+
+        self.view = SplitView(comparison, self)
+        self.metrics_label = QLabel(metrics_text(comparison))
+
+        self.mode_box = QComboBox()
+        self.mode_box.addItems(list(COMPARE_MODES))
+        self.mode_box.currentTextChanged.connect(self.on_mode_changed)
+
+        self.opacity_slider = QSlider(Qt.Orientation.Horizontal)
+        self.opacity_slider.setRange(0, 100)
+        self.opacity_slider.setValue(50)
+        self.opacity_slider.setEnabled(False)
+        self.opacity_slider.valueChanged.connect(self.view.set_opacity)
+
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("Source | Converted"))
+        controls.addWidget(self.mode_box)
+        controls.addWidget(self.opacity_slider)
+        controls.addStretch(1)
+
+        layout = QVBoxLayout()
+        layout.addLayout(controls)
+        layout.addWidget(self.view, stretch=1)
+        layout.addWidget(self.metrics_label)
+        self.setLayout(layout)
+
+    def on_mode_changed(self, mode):
+        """Opacity is used only by overlay"""
+        self.opacity_slider.setEnabled(mode == 'Overlay')
+        self.view.set_mode(mode)
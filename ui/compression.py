@@ -0,0 +1,141 @@
+"""Compression - gzip/bz2/xz/zstd text files (data.csv.gz) as sources and targets.
+Files are decompressed and compressed on the fly while they are read and
+written, no temporary files are made. Outputs can be compressed by a pool of
+threads: blocks are compressed in parallel and written as separate members"""
+
+import io
+import os
+import bz2
+import gzip
+import lzma
+from collections import deque
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+
+from ui.constants import (COMPRESSION_EXTENSIONS, COMPRESSIBLE_EXTENSIONS, COMPRESSION_LEVELS,
+                          COMPRESSION_BLOCK_SIZE)
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# compression extension -> (open(path, mode) of the binary stream, name of level argument)
+OPENERS = {
+    '.gz': (gzip.open, 'compresslevel'),
+    '.bz2': (bz2.open, 'compresslevel'),
+    '.xz': (lzma.open, 'preset'),
+}
+
+# compression extension -> compress(data) of one complete member.
+# zlib, bz2 and lzma release the GIL, so threads compress blocks in parallel
+COMPRESSORS = {
+    '.gz': partial(gzip.compress, compresslevel=COMPRESSION_LEVELS['.gz']),
+    '.bz2': partial(bz2.compress, compresslevel=COMPRESSION_LEVELS['.bz2']),
+    '.xz': partial(lzma.compress, preset=COMPRESSION_LEVELS['.xz']),
+}
+
+# Errors of the broken compressed stream
+COMPRESSION_ERRORS = (OSError, EOFError, lzma.LZMAError) + (
+    (zstandard.ZstdError,) if zstandard else ())
+
+
+def zstd_available():
+    """Check if zstandard is installed"""
+    return zstandard is not None
+
+
+def compression_of(path):
+    """Compression extension of the path or None for plain files"""
+    ext = os.path.splitext(str(path))[1].lower()
+    return ext if ext in COMPRESSION_EXTENSIONS else None
+
+
+def compressed_format(path):
+    """Extension of the compressed text format: data.csv.gz -> .csv, otherwise None"""
+    if not compression_of(path):
+        return None
+    inner = os.path.splitext(os.path.splitext(str(path))[0])[1].lower()
+    return inner if inner in COMPRESSIBLE_EXTENSIONS else None
+
+
+def open_binary(path, mode='rb', threads=1, codec=None):
+    """Binary stream of the compressed file, codec is taken from the extension if not given"""
+    codec = codec or compression_of(path)
+    if codec == '.zst':
+        return open_zstd(path, mode, threads)
+    if codec not in OPENERS:
+        raise ValueError(f"Compression {codec} is not supported")
+    opener, level_argument = OPENERS[codec]
+    if mode != 'wb':
+        return opener(path, mode)
+    if threads > 1:
+        return ParallelWriter(open(path, 'wb'), COMPRESSORS[codec], threads)  # pylint: disable=consider-using-with
+    return opener(path, mode, **{level_argument: COMPRESSION_LEVELS[codec]})
+
+
+def open_zstd(path, mode, threads):
+    """zstd stream, compression threads are managed by libzstd itself"""
+    if not zstandard:
+        raise ValueError("zstandard package is required for .zst files")
+    if mode == 'wb':
+        compressor = zstandard.ZstdCompressor(level=COMPRESSION_LEVELS['.zst'],
+                                              threads=threads if threads > 1 else 0)
+        return compressor.stream_writer(open(path, 'wb'), closefd=True)  # pylint: disable=consider-using-with
+    # Files of pzstd and other multithreaded tools have many frames
+    reader = zstandard.ZstdDecompressor().stream_reader(
+        open(path, 'rb'), read_across_frames=True, closefd=True)  # pylint: disable=consider-using-with
+    return io.BufferedReader(reader)
+
+
+def open_text(path, mode='r', encoding='utf-8', newline=None, threads=1):
+    """Text stream of the compressed file, the same as open(path, mode) for plain files"""
+    binary = open_binary(path, mode[0] + 'b', threads)
+    return io.TextIOWrapper(binary, encoding=encoding, newline=newline)
+
+
+class ParallelWriter(io.BufferedIOBase):
+    """Compress blocks in a thread pool and write them in order as separate members.
+    gzip, bz2 and xz readers decompress concatenated members as one stream"""
+
+    def __init__(self, raw, compress, threads, block_size=COMPRESSION_BLOCK_SIZE):
+        super().__init__()
+        self.raw = raw
+        self.compress = compress
+        self.threads = threads
+        self.block_size = block_size
+        self.block = bytearray()
+        self.pending = deque()
+        self.members = 0
+        self.pool = ThreadPoolExecutor(max_workers=threads)
+
+    def writable(self):
+        return True
+
+    def write(self, data):  # pylint: disable=arguments-renamed
+        self.block += data
+        while len(self.block) >= self.block_size:
+            self.submit()
+        return len(data)
+
+    def submit(self):
+        """Compress the next block, only a few blocks are kept in memory"""
+        self.pending.append(self.pool.submit(self.compress, bytes(self.block[:self.block_size])))
+        del self.block[:self.block_size]
+        self.members += 1
+        while len(self.pending) > 2 * self.threads:
+            self.raw.write(self.pending.popleft().result())
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            # Empty output still has to be a valid compressed file
+            if self.block or not self.members:
+                self.submit()
+            while self.pending:
+                self.raw.write(self.pending.popleft().result())
+        finally:
+            self.pool.shutdown()
+            self.raw.close()
+            super().close()
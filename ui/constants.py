@@ -2,13 +2,201 @@
 
 # pylint: disable=invalid-name
 
-SUPPORTED_CONVERT_EXTENSIONS_PICTURES = ['.png', '.jpg', '.jpeg', '.webp']
-SUPPORTED_CONVERT_EXTENSIONS_FILES = ['.txt', '.json', '.csv']
+SUPPORTED_CONVERT_EXTENSIONS_PICTURES = ['.png', '.jpg', '.jpeg', '.webp', '.gif', '.tiff',
+                                         '.avif', '.jxl']
+SUPPORTED_CONVERT_EXTENSIONS_FILES = ['.txt', '.json', '.csv', '.jsonl', '.ndjson',
+                                      '.parquet', '.arrow', '.feather']
 SUPPORTED_CONVERT_EXTENSIONS_VIDEO_AUDIO = ['.mp3', '.mp4', '.wav']
 
 PIC_EXTENSION_MAP = {
     "JPG": "JPEG",
     "JPEG": "JPEG",
     "PNG": "PNG",
-    "WEBP": "WEBP"
+    "WEBP": "WEBP",
+    "GIF": "GIF",
+    "TIFF": "TIFF",
+    "AVIF": "AVIF",
+    "JXL": "JXL"
 }
+
+# Formats which keep all frames of animated/multi-page images (PNG as APNG)
+MULTI_FRAME_FORMATS = ('GIF', 'WEBP', 'TIFF', 'PNG', 'AVIF')
+# Of them encoders which keep every frame in memory until the file is written
+ALL_FRAMES_FORMATS = ('GIF', 'PNG')
+
+# Encoder options of the named profiles, from the fastest to the smallest output.
+# 'smallest' is the default and the slowest
+IMAGE_PROFILES = {
+    'fast': {
+        'JPEG': {'quality': 85},
+        'PNG': {'compress_level': 1},
+        'WEBP': {'quality': 85, 'lossless': False, 'method': 0},
+        'AVIF': {'quality': 75, 'speed': 10},
+        'JXL': {'quality': 85, 'effort': 1},
+    },
+    'balanced': {
+        'JPEG': {'optimize': True, 'quality': 85},
+        'PNG': {'compress_level': 6},
+        'WEBP': {'quality': 85, 'lossless': False, 'method': 4},
+        'AVIF': {'quality': 75, 'speed': 8},
+        'JXL': {'quality': 85, 'effort': 4},
+    },
+    'smallest': {
+        'JPEG': {'optimize': True, 'quality': 85, 'progressive': True},
+        'PNG': {'optimize': True, 'compress_level': 8},
+        'WEBP': {'quality': 85, 'lossless': False, 'method': 6},
+        'AVIF': {'quality': 75, 'speed': 6},
+        'JXL': {'quality': 85, 'effort': 7},
+    },
+}
+IMAGE_PROFILE_DEFAULT = 'smallest'
+
+# Encoder speed/effort option of the format: (option name, min, max, default).
+# WebP method and JPEG XL effort are slower with higher values, AVIF speed is faster
+IMAGE_EFFORT_OPTIONS = {
+    'WEBP': ('method', 0, 6, 6),
+    'AVIF': ('speed', 0, 10, 6),
+    'JXL': ('effort', 1, 9, 7),
+}
+
+# Folder sync / batch settings
+SYNC_MANIFEST_NAME = '.converter_manifest.json'
+SYNC_MANIFEST_VERSION = 1
+SYNC_HASH_CHUNK_SIZE = 1024 * 1024
+
+# SQLite journal of batch jobs, finished jobs survive a crash of the app or
+# the machine and are not converted again by the next run
+SYNC_JOURNAL_NAME = '.converter_jobs.sqlite3'
+JOURNAL_VERSION = 1
+
+# Atomic outputs: files are written to a hidden temporary file next to the
+# output and renamed over it when complete. fsync policy: 'none' leaves data
+# to the OS, 'file' flushes every output before it is renamed, 'batch'
+# flushes all outputs of the batch run once at its end
+ATOMIC_TEMP_PREFIX = '.~converting-'
+FSYNC_POLICIES = ('none', 'file', 'batch')
+FSYNC_POLICY_DEFAULT = 'file'
+FSYNC_POLICY_BATCH_DEFAULT = 'batch'
+
+# Batch job scheduler. Estimated RSS of the running jobs is kept under
+# SCHEDULER_MEMORY_FRACTION of physical memory. Text jobs are estimated as
+# input size times the factor of the writer (measured peak RSS: csv.DictReader
+# rows, pyarrow table, whole json document), images as decoded RGBA size
+# times the factor of the encoder. Streamed writers are io jobs
+SCHEDULER_MEMORY_FRACTION = 0.5
+SCHEDULER_MEMORY_FALLBACK = 4 * 1024 * 1024 * 1024
+SCHEDULER_HEAVY_MEMORY = 512 * 1024 * 1024
+SCHEDULER_LOOKAHEAD = 64
+SCHEDULER_RSS_FACTORS = {'csv_json': 16, 'columnar': 6, 'json': 5}
+SCHEDULER_COMPRESSION_RATIO = 5
+SCHEDULER_IMAGE_RSS_FACTORS = {'WEBP': 6, 'AVIF': 7, 'JXL': 7}
+SCHEDULER_IMAGE_RSS_DEFAULT = 2
+SCHEDULER_FFMPEG_MEMORY = 384 * 1024 * 1024
+SCHEDULER_TABULAR_MEMORY = 256 * 1024 * 1024
+SCHEDULER_STREAM_MEMORY = 32 * 1024 * 1024
+
+# Hot folder settings
+HOT_FOLDER_DEBOUNCE_MS = 1000
+HOT_FOLDER_IGNORED_SUFFIXES = ('.tmp', '.part', '.crdownload', '.download')
+
+# Content sniffing settings
+SNIFF_BYTES = 4096
+SNIFF_CACHE_SIZE = 10000
+
+# Memory mapped input settings
+MMAP_MIN_SIZE = 8 * 1024 * 1024
+MMAP_BLOCK_SIZE = 1024 * 1024
+PREVIEW_MAX_LINES = 1000
+
+# Parallel CSV convertation settings
+PARALLEL_CSV_MIN_SIZE = 32 * 1024 * 1024
+PARALLEL_CSV_CHUNK_SIZE = 8 * 1024 * 1024
+
+# JSON backends in order of preference, stdlib json is the fallback
+JSON_BACKENDS = ('msgspec', 'json')
+
+# Columnar (pyarrow) CSV engine settings
+COLUMNAR_CSV_MIN_SIZE = 4 * 1024 * 1024
+COLUMNAR_BLOCK_SIZE = 4 * 1024 * 1024
+
+# Parquet/Arrow IPC settings
+TABULAR_EXTENSIONS = ('.parquet', '.arrow', '.feather')
+TABULAR_ROW_GROUP_ROWS = 128 * 1024
+PARQUET_COMPRESSION = 'zstd'
+
+# JSON Lines settings
+JSON_LINES_EXTENSIONS = ('.jsonl', '.ndjson')
+JSON_LINES_CHUNK_ROWS = 10000
+
+# Compressed text files (data.csv.gz), level is a trade of speed for size
+COMPRESSION_EXTENSIONS = ('.gz', '.bz2', '.xz', '.zst')
+COMPRESSIBLE_EXTENSIONS = ('.txt', '.csv', '.json', '.jsonl', '.ndjson')
+COMPRESSION_LEVELS = {'.gz': 6, '.bz2': 9, '.xz': 6, '.zst': 3}
+COMPRESSION_BLOCK_SIZE = 4 * 1024 * 1024
+
+# Target size encoding: formats with quality option and the lowest quality tried
+IMAGE_TARGET_SIZE_FORMATS = ('JPEG', 'WEBP', 'AVIF', 'JXL')
+IMAGE_MIN_QUALITY = 10
+IMAGE_MAX_SIZE_KB = 100000
+
+# Modes every encoder takes as they are, other modes are converted by ui.modes.
+# Every format of PIC_EXTENSION_MAP is listed, GIF quantizes RGB/RGBA to a palette itself
+IMAGE_ENCODER_MODES = {
+    'JPEG': ('RGB', 'L'),
+    'WEBP': ('RGB', 'RGBA'),
+    'AVIF': ('RGB', 'RGBA'),
+    'JXL': ('RGB', 'RGBA'),
+    'PNG': ('1', 'L', 'LA', 'P', 'RGB', 'RGBA', 'I', 'I;16'),
+    'GIF': ('P', 'L', 'RGB', 'RGBA'),
+    'TIFF': ('1', 'L', 'LA', 'P', 'RGB', 'RGBA', 'CMYK', 'YCbCr', 'LAB', 'I', 'I;16', 'F'),
+}
+# Modes QImage shows without conversion, ImageQt itself converts RGB to RGBA
+PREVIEW_MODES = ('1', 'L', 'P', 'RGBA', 'I;16')
+# Threads of preview loaders, they never wait for syncs and scans of the global pool
+PREVIEW_POOL_THREADS = 2
+ICC_TRANSFORM_CACHE_SIZE = 16
+
+# Tiled viewer: tile side in pixels, decoded tiles kept in memory, size of
+# zoom levels which are reduced once as a whole and the highest zoom
+TILE_SIZE = 256
+TILE_CACHE_SIZE = 256
+PYRAMID_LEVEL_PIXELS = 2048 * 2048
+VIEWER_MAX_ZOOM = 32
+
+# Comparison of the source and converted image: SSIM window side, rows of
+# the image processed at once, cached comparisons and size of shown images
+SSIM_WINDOW = 7
+METRICS_STRIP_ROWS = 512
+COMPARE_CACHE_SIZE = 32
+COMPARE_PREVIEW_SIZE = 1600
+COMPARE_MODES = ('Split', 'Overlay', 'Difference')
+
+# Media strips above the player slider: audio files get a waveform, video a
+# strip of keyframe thumbnails. Size of the waveform and of one thumbnail,
+# thumbnails in the strip and cached strips
+AUDIO_PREVIEW_EXTENSIONS = ('.mp3', '.wav')
+WAVEFORM_SIZE = (800, 60)
+WAVEFORM_COLOR = '#3c8dbc'
+THUMBNAIL_SIZE = (96, 54)
+THUMBNAIL_COUNT = 12
+MEDIA_STRIP_CACHE_SIZE = 16
+
+# Player position is shown at most this often (about 15 fps), slider drag
+# seeks once it stops for a moment
+PLAYER_UI_INTERVAL_MS = 66
+SEEK_DEBOUNCE_MS = 80
+
+# Counters and timings of hot GUI paths are collected when this variable is set
+INSTRUMENTATION_ENV = 'GUI_CONVERTER_INSTRUMENT'
+
+# Dropped files: threads reading file headers, how often scanned files are
+# added to the queue list and scans in flight per thread
+INGEST_WORKERS = 8
+INGEST_FLUSH_MS = 100
+INGEST_PENDING_PER_WORKER = 4
+
+# QSettings of the user choices
+SETTINGS_ORGANIZATION = 'GUI_Converter'
+SETTINGS_APPLICATION = 'GUI_Converter'
+SETTINGS_IMAGE_PROFILE = 'images/profile'
+SETTINGS_FSYNC_POLICY = 'batch/fsync'
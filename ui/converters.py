@@ -0,0 +1,338 @@
+"""Converters - headless convertation logic without any dialogs or widgets.
+Used by the GUI Converter class and by the batch/sync modes"""
+
+import csv
+import os
+import subprocess
+from functools import partial
+from pathlib import Path
+from PIL import Image
+
+from ui.codec import json_codec
+from ui.columnar import columnar_available, write_csv_columnar
+from ui.tabular import tabular_available, write_tabular, TABULAR_SOURCES, TABULAR_TARGETS
+from ui.compression import compression_of, compressed_format
+from ui.atomic import OutputSync
+from ui.frames import AnimatedImage, frame_count
+from ui.imaging import encoder_available, effort_option, encode_to_size, profile_options
+from ui.modes import prepare_image
+from ui.fileio import (open_text_lines, open_text_output, load_json, iter_json_lines,
+                       require_objects, chunked)
+from ui.parallel import write_csv_parallel
+from ui.sniffing import FormatSniffer
+from ui.constants import (SUPPORTED_CONVERT_EXTENSIONS_PICTURES, SUPPORTED_CONVERT_EXTENSIONS_VIDEO_AUDIO,
+                          PIC_EXTENSION_MAP, MULTI_FRAME_FORMATS, IMAGE_PROFILE_DEFAULT,
+                          IMAGE_TARGET_SIZE_FORMATS, IMAGE_ENCODER_MODES, PARALLEL_CSV_MIN_SIZE, COLUMNAR_CSV_MIN_SIZE,
+                          TABULAR_EXTENSIONS, JSON_LINES_EXTENSIONS, JSON_LINES_CHUNK_ROWS,
+                          FSYNC_POLICY_DEFAULT)
+
+
+class FileConverter():
+    """Convert input file to output path. Formats are taken from extensions.
+    Large csv files go to pyarrow if it is installed, with workers > 1
+    to a pool of processes otherwise. Compressed outputs (data.json.gz)
+    are compressed by compress_threads threads. Images are saved with the
+    encoder options of image_profile (see IMAGE_PROFILES), image_effort is
+    {PIL format: encoder speed/effort} which overrides the profile.
+    With max_image_bytes JPEG/WebP/AVIF/JXL quality is lowered to fit the size,
+    color_manage converts images with embedded ICC profile to sRGB.
+    Outputs of convert() are written atomically, fsync is the policy of
+    flushing them to the disk (see FSYNC_POLICIES)"""
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def __init__(self, sniffer=None, workers=1, codec=None, columnar=True, compress_threads=1,
+                 image_effort=None, image_profile=IMAGE_PROFILE_DEFAULT, max_image_bytes=None,
+                 color_manage=False, fsync=FSYNC_POLICY_DEFAULT):
+        self.sniffer = sniffer or FormatSniffer()
+        self.codec = codec or json_codec
+        self.workers = workers
+        self.compress_threads = compress_threads
+        self.image_effort = dict(image_effort or {})
+        self.image_profile = image_profile
+        self.max_image_bytes = max_image_bytes
+        self.color_manage = color_manage
+        self.columnar = columnar and columnar_available()
+        self.output_sync = OutputSync(fsync)
+
+        # (input ext, output ext) -> method writing output file
+        self.file_writers = {
+            ('.csv', '.txt'): self.write_csv_txt,
+            ('.json', '.txt'): self.write_json_txt,
+            ('.csv', '.json'): self.write_csv_json,
+            ('.json', '.csv'): self.write_json_csv,
+        }
+        self.add_json_lines_writers()
+        if tabular_available():
+            self.add_tabular_writers()
+
+    def add_json_lines_writers(self):
+        """JSON Lines pairs, every one is streamed line by line"""
+        for ext in JSON_LINES_EXTENSIONS:
+            self.file_writers.update({
+                (ext, '.csv'): self.write_json_lines_csv,
+                (ext, '.txt'): self.write_json_lines_txt,
+                (ext, '.json'): self.write_json_lines_json,
+            })
+            for inp_ext in ('.csv', '.json') + JSON_LINES_EXTENSIONS:
+                if inp_ext != ext:
+                    self.file_writers[(inp_ext, ext)] = partial(
+                        self.write_json_lines, inp_ext=inp_ext)
+
+    def add_tabular_writers(self):
+        """Parquet/arrow pairs, text pairs keep their own writers"""
+        for inp_ext in TABULAR_SOURCES:
+            for out_ext in TABULAR_TARGETS:
+                if (inp_ext != out_ext and (inp_ext, out_ext) not in self.file_writers
+                        and (inp_ext in TABULAR_EXTENSIONS or out_ext in TABULAR_EXTENSIONS)):
+                    self.file_writers[(inp_ext, out_ext)] = partial(
+                        self.write_tabular, inp_ext=inp_ext)
+
+    @staticmethod
+    def detect_extension(path):
+        """Get lowercase extension of the path or 'no extension'.
+        Compressed text files have extension of the inner format: data.csv.gz -> .csv"""
+        ext = compressed_format(path) or os.path.splitext(path)[1].lower()
+        return ext if ext else "no extension"
+
+    def detect_format(self, path):
+        """Extension of the real file format, content is checked by magic bytes"""
+        return self.sniffer.detect(path, self.detect_extension(path))
+
+    def can_convert(self, inp_ext, out_ext):
+        """Check if convertation inp_ext -> out_ext is supported"""
+        if inp_ext == out_ext:
+            return False
+        if (inp_ext, out_ext) in self.file_writers:
+            return True
+        for group in (SUPPORTED_CONVERT_EXTENSIONS_PICTURES, SUPPORTED_CONVERT_EXTENSIONS_VIDEO_AUDIO):
+            if inp_ext in group and out_ext in group:
+                return True
+        return False
+
+    def convert(self, inp, out, inp_ext=None, profile=None):
+        """Convert inp file to out file, raises ValueError for unsupported formats.
+        profile is the image profile of this job instead of image_profile.
+        out is replaced only by the complete output"""
+        inp_ext = inp_ext or self.detect_format(inp)
+        out_ext = self.detect_extension(out)
+
+        writer = self.file_writers.get((inp_ext, out_ext))
+        if not writer and not self.can_convert(inp_ext, out_ext):
+            raise ValueError(f"Convertation {inp_ext} -> {out_ext} is not supported")
+
+        with self.atomic_output(out) as tmp:
+            if writer:
+                writer(inp, tmp)
+            elif out_ext in SUPPORTED_CONVERT_EXTENSIONS_PICTURES:
+                self.write_image(inp, tmp, profile)
+            else:
+                self.write_audio_video(inp, tmp)
+        return out
+
+    def atomic_output(self, out):
+        """Context manager with temporary path which replaces out when it is written"""
+        return self.output_sync.output(out)
+
+    def write_large_csv(self, inp, out, out_format):
+        """Convert large csv with columnar or parallel engine.
+        Returns False if the file has to be read by csv.DictReader"""
+        # Both engines need random access to the plain files
+        if compression_of(inp) or compression_of(out):
+            return False
+        try:
+            size = os.path.getsize(inp)
+        except (OSError, TypeError, ValueError):
+            return False
+
+        if (self.columnar and size >= COLUMNAR_CSV_MIN_SIZE
+                and write_csv_columnar(inp, out, out_format)):
+            return True
+        if self.workers > 1 and size >= PARALLEL_CSV_MIN_SIZE:
+            write_csv_parallel(inp, out, out_format, self.workers)
+            return True
+        return False
+
+    def open_output(self, out, newline=None):
+        """Output text file, compressed by the extension of out"""
+        return open_text_output(out, newline, self.compress_threads)
+
+    def write_csv_txt(self, inp, out):
+        """Convertation logic from csv to txt"""
+        if self.write_large_csv(inp, out, '.txt'):
+            return
+
+        with open_text_lines(inp) as lines:
+            reader = csv.DictReader(lines)
+            with self.open_output(out) as out_file:
+                out_file.write('\t'.join(reader.fieldnames) + '\n')
+                for row in reader:
+                    out_file.write('\t'.join(row.values()) + '\n')
+
+    def write_json_txt(self, inp, out):
+        """Convertation logic from json to txt"""
+        reader = load_json(inp, codec=self.codec)
+        with self.open_output(out) as out_file:
+            if isinstance(reader, list):
+                for item in reader:
+                    self.write_txt_item(out_file, item)
+            elif isinstance(reader, dict):
+                for k, v in reader.items():
+                    out_file.write(f"{k}: {v}\n")
+            else:
+                out_file.write(str(reader))
+
+    @staticmethod
+    def write_txt_item(out_file, item):
+        """Write one item of json list to txt file"""
+        if isinstance(item, dict):
+            for k, v in item.items():
+                out_file.write(f"{k}: {v}\n")
+            out_file.write('\n')
+        else:
+            out_file.write(str(item) + '\n\n')
+
+    def write_csv_json(self, inp, out):
+        """Convertation logic from csv to json"""
+        if self.write_large_csv(inp, out, '.json'):
+            return
+
+        with open_text_lines(inp) as lines:
+            reader = csv.DictReader(lines)
+            data = list(reader)
+
+        with self.open_output(out) as jsonfile:
+            jsonfile.write(self.codec.dumps(data))
+
+    def write_json_csv(self, inp, out):
+        """Convertation logic from json to csv"""
+        data = load_json(inp, codec=self.codec)
+
+        if not isinstance(data, list):
+            raise ValueError("JSON must be valid")
+
+        fieldnames = data[0].keys() if data else []
+
+        with self.open_output(out, newline='') as out_file:
+            writer = csv.DictWriter(out_file, fieldnames=fieldnames)
+            writer.writeheader()
+            for row in data:
+                writer.writerow(row)
+
+    def write_json_lines(self, inp, out, inp_ext):
+        """Convertation logic from csv/json/json lines to json lines"""
+        if inp_ext == '.csv':
+            with open_text_lines(inp) as lines:
+                self.write_lines(csv.DictReader(lines), out)
+        elif inp_ext == '.json':
+            data = load_json(inp, codec=self.codec)
+            self.write_lines(data if isinstance(data, list) else [data], out)
+        else:
+            self.write_lines(iter_json_lines(inp, codec=self.codec), out)
+
+    def write_lines(self, items, out):
+        """Write every item as one line of json"""
+        with self.open_output(out) as out_file:
+            for item in items:
+                out_file.write(self.codec.dumps_line(item) + '\n')
+
+    def write_json_lines_json(self, inp, out):
+        """Convertation logic from json lines to json list"""
+        with self.open_output(out) as out_file:
+            first = True
+            for chunk in chunked(iter_json_lines(inp, codec=self.codec), JSON_LINES_CHUNK_ROWS):
+                # Items of the dumped list without '[\n' and '\n]'
+                out_file.write(('[\n' if first else ',\n') + self.codec.dumps(chunk)[2:-2])
+                first = False
+            out_file.write('[]' if first else '\n]')
+
+    def write_json_lines_csv(self, inp, out):
+        """Convertation logic from json lines to csv.
+        Rows can have different keys, so columns are collected by the first pass"""
+        rows = require_objects(iter_json_lines(inp, codec=self.codec))
+        fieldnames = dict.fromkeys(key for row in rows for key in row)
+
+        with self.open_output(out, newline='') as out_file:
+            writer = csv.DictWriter(out_file, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(iter_json_lines(inp, codec=self.codec))
+
+    def write_json_lines_txt(self, inp, out):
+        """Convertation logic from json lines to txt"""
+        with self.open_output(out) as out_file:
+            for item in iter_json_lines(inp, codec=self.codec):
+                self.write_txt_item(out_file, item)
+
+    def write_tabular(self, inp, out, inp_ext):
+        """Convertation logic from/to parquet and arrow files"""
+        write_tabular(inp, out, inp_ext, self.detect_extension(out), self.codec,
+                      self.compress_threads)
+
+    def open_image(self, input_file, target_format):
+        """Open image and convert it to the mode needed by target_format.
+        Returns (converted image, PIL format name). Animated image is returned
+        as AnimatedImage if target_format keeps frames, its frames are converted on save"""
+        clean_format = target_format.lstrip('.').upper()
+        real_format = PIC_EXTENSION_MAP.get(clean_format)
+        if not real_format:
+            raise ValueError(f"Format {target_format} is not supported")
+        if not encoder_available(real_format):
+            raise ValueError(f"Encoder for {target_format} is not installed")
+
+        with Image.open(input_file) as img:
+            n_frames = frame_count(img)
+            if n_frames > 1 and real_format in MULTI_FRAME_FORMATS:
+                return AnimatedImage(input_file, real_format, n_frames, self.color_manage), real_format
+            # Pixels stay in memory when the file is closed, no copy is needed
+            img.load()
+            converted_img = prepare_image(img, IMAGE_ENCODER_MODES.get(real_format), self.color_manage)
+        return converted_img, real_format
+
+    def image_save_options(self, img_format, profile=None):
+        """Encoder options of the profile, effort set for the format overrides the profile"""
+        real_format = PIC_EXTENSION_MAP.get(img_format.upper(), img_format.upper())
+        options = profile_options(profile or self.image_profile, real_format)
+        effort = self.image_effort.get(real_format)
+        if effort is not None and effort_option(real_format, effort):
+            name, value = effort_option(real_format, effort)
+            options[name] = value
+        return options
+
+    def uses_target_size(self, img, img_format):
+        """Check if still image img is saved by save_to_size"""
+        real_format = PIC_EXTENSION_MAP.get(img_format.upper(), img_format.upper())
+        return (bool(self.max_image_bytes) and real_format in IMAGE_TARGET_SIZE_FORMATS
+                and isinstance(img, Image.Image))
+
+    def save_to_size(self, img, out, img_format, profile=None):
+        """Save image with the highest quality which fits max_image_bytes.
+        Returns (quality, size in bytes)"""
+        real_format = PIC_EXTENSION_MAP.get(img_format.upper(), img_format.upper())
+        data, quality = encode_to_size(img, real_format, self.max_image_bytes,
+                                       self.image_save_options(real_format, profile))
+        with open(out, 'wb') as file:
+            file.write(data)
+        return quality, len(data)
+
+    def write_image(self, inp, out, profile=None):
+        """Convertation logic for images"""
+        converted_img, real_format = self.open_image(inp, Path(out).suffix)
+        if self.uses_target_size(converted_img, real_format):
+            self.save_to_size(converted_img, out, real_format, profile)
+            return
+        converted_img.save(out, format=real_format,
+                           **self.image_save_options(real_format, profile))
+
+    def ffmpeg_command(self, inp, out):
+        """Build ffmpeg command for audio/video convertation"""
+        command = ['ffmpeg', '-y', '-i', inp, out]
+        if Path(out).suffix.lower() == '.mp4':
+            command += ['-c:a', 'aac']
+        return command
+
+    def write_audio_video(self, inp, out):
+        """Convertation logic for audio/video formats"""
+        result = subprocess.run(self.ffmpeg_command(inp, out),
+                                capture_output=True, text=True, check=False)
+        if result.returncode != 0:
+            raise RuntimeError(
+                f"Error FFMPEG Failed with code {result.returncode}: {result.stderr}")
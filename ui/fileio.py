@@ -0,0 +1,210 @@
+"""Fileio - input/output layer for doc-type files.
+Large inputs are memory mapped and decoded straight from the mapping,
+compressed files (data.csv.gz) are streamed through the decompressor"""
+
+import io
+import os
+import mmap
+import hashlib
+from array import array
+from itertools import chain, islice
+from contextlib import contextmanager
+
+from ui.codec import json_codec
+from ui.compression import compression_of, open_binary, open_text
+from ui.constants import MMAP_MIN_SIZE, MMAP_BLOCK_SIZE, SYNC_HASH_CHUNK_SIZE
+
+
+class MappedInput():
+    """Read-only memory mapped file"""
+
+    def __init__(self, path, encoding='utf-8'):
+        self.path = path
+        self.encoding = encoding
+        self.offsets = None
+
+        with open(path, 'rb') as file:
+            self.size = os.fstat(file.fileno()).st_size
+            # Empty file can not be mapped
+            self.mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Unmap the file"""
+        if isinstance(self.mm, mmap.mmap):
+            self.mm.close()
+
+    def text(self):
+        """Decode the whole file without copying it to bytes first"""
+        return self.decode(0, self.size)
+
+    def decode(self, begin, end):
+        """Decode bytes range straight from the mapping"""
+        with memoryview(self.mm) as view, view[begin:end] as part:
+            return str(part, self.encoding)
+
+    def blocks(self, block_size=MMAP_BLOCK_SIZE):
+        """Yield decoded blocks, every block ends with a full line"""
+        pos = 0
+        while pos < self.size:
+            end = min(pos + block_size, self.size)
+            if end < self.size:
+                newline = self.mm.rfind(b'\n', pos, end)
+                if newline == -1:
+                    newline = self.mm.find(b'\n', end)
+                end = self.size if newline == -1 else newline + 1
+            yield self.decode(pos, end)
+            pos = end
+
+    def lines(self, block_size=MMAP_BLOCK_SIZE):
+        """Iterator of lines with the same newline handling as open(newline='')"""
+        return chain.from_iterable(
+            io.StringIO(block, newline='') for block in self.blocks(block_size))
+
+    def line_offsets(self, limit=None):
+        """Index of line start offsets, used for random access previews"""
+        if self.offsets is not None and (limit is None or len(self.offsets) >= limit):
+            return self.offsets
+
+        offsets = array('Q', [0] if self.size else [])
+        find = self.mm.find
+        pos = 0
+        while limit is None or len(offsets) < limit:
+            newline = find(b'\n', pos)
+            if newline == -1 or newline + 1 >= self.size:
+                break
+            pos = newline + 1
+            offsets.append(pos)
+        self.offsets = offsets
+        return offsets
+
+    def read_lines(self, start, count):
+        """Decode count lines starting from line number start"""
+        offsets = self.line_offsets(start + count + 1)
+        if start >= len(offsets):
+            return ''
+        begin = offsets[start]
+        end = offsets[start + count] if start + count < len(offsets) else self.size
+        return self.decode(begin, end)
+
+
+def use_mmap(path):
+    """Only large local plain files are worth mapping"""
+    if compression_of(path):
+        return False
+    try:
+        return os.path.getsize(path) >= MMAP_MIN_SIZE
+    except (OSError, TypeError, ValueError):
+        return False
+
+
+@contextmanager
+def open_text_lines(path, encoding='utf-8'):
+    """Iterable of text lines for csv module, mapped for large files"""
+    if use_mmap(path):
+        with MappedInput(path, encoding) as mapped:
+            yield mapped.lines()
+    elif compression_of(path):
+        with open_text(path, newline='', encoding=encoding) as file:
+            yield file
+    else:
+        with open(path, newline='', encoding=encoding) as file:
+            yield file
+
+
+def load_json(path, encoding='utf-8', codec=json_codec):
+    """json.load for the path, large files are decoded from the mapping"""
+    if use_mmap(path):
+        with MappedInput(path, encoding) as mapped:
+            if encoding == 'utf-8':
+                with memoryview(mapped.mm) as view:
+                    return codec.loads(view)
+            return codec.loads(mapped.text())
+
+    if compression_of(path):
+        with open_binary(path) as file:
+            data = file.read()
+        return codec.loads(data if encoding == 'utf-8' else data.decode(encoding))
+
+    with open(path, 'r', encoding=encoding) as file:
+        return codec.loads(file.read())
+
+
+def iter_json_lines(path, encoding='utf-8', codec=json_codec):
+    """Decode JSON Lines file one line at a time, blank lines are skipped"""
+    if use_mmap(path):
+        source = MappedInput(path, encoding)
+        lines = source.lines()
+    elif compression_of(path):
+        source = lines = open_text(path, newline='', encoding=encoding)
+    else:
+        source = lines = open(path, newline='', encoding=encoding)  # pylint: disable=consider-using-with
+
+    try:
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                yield codec.loads(line)
+            except ValueError as e:
+                raise ValueError(f"Line {number}: {e}") from e
+    finally:
+        source.close()
+
+
+def require_objects(rows):
+    """Pass rows through, raise ValueError for rows which are not JSON objects"""
+    for row in rows:
+        if not isinstance(row, dict):
+            raise ValueError("JSON rows must be objects")
+        yield row
+
+
+def chunked(items, size):
+    """Lists of up to size items"""
+    items = iter(items)
+    while chunk := list(islice(items, size)):
+        yield chunk
+
+
+def read_preview_text(path, max_lines, encoding='utf-8'):
+    """First max_lines lines of large file or the whole small file"""
+    if use_mmap(path):
+        with MappedInput(path, encoding) as mapped:
+            return mapped.read_lines(0, max_lines)
+
+    if compression_of(path):
+        # Only the previewed part of the file is decompressed
+        with open_text(path, encoding=encoding) as file:
+            return ''.join(islice(file, max_lines))
+
+    with open(path, 'r', encoding=encoding) as file:
+        return file.read()
+
+
+def open_text_output(path, newline=None, threads=1):
+    """utf-8 text file for writing, compressed if the path has compression extension"""
+    if compression_of(path):
+        return open_text(path, 'w', newline=newline, threads=threads)
+    if newline is None:
+        return open(path, 'w', encoding='utf-8')
+    return open(path, 'w', newline=newline, encoding='utf-8')
+
+
+def file_hash(path):
+    """Content hash of the file, read by chunks"""
+    digest = hashlib.blake2b(digest_size=20)
+    buf = bytearray(SYNC_HASH_CHUNK_SIZE)
+    view = memoryview(buf)
+    with open(path, 'rb', buffering=0) as file:
+        while True:
+            size = file.readinto(buf)
+            if not size:
+                break
+            digest.update(view[:size])
+    return digest.hexdigest()
@@ -0,0 +1,116 @@
+"""Frames - animated (GIF/WebP/APNG) and multi-page (TIFF) images.
+Every frame goes through ui.modes on its own while the writer seeks the
+source frame by frame. WebP, TIFF and AVIF writers take one frame at a time,
+GIF and APNG writers keep every converted frame in memory until the whole
+file is written. Previews decode only the requested frame"""
+
+from PIL import Image, ImageSequence
+
+from ui.constants import IMAGE_ENCODER_MODES
+from ui.modes import prepare_image
+
+
+def frame_count(img):
+    """Number of frames of the open image, 1 for still images"""
+    return getattr(img, 'n_frames', 1)
+
+
+def frame_durations(img):
+    """Duration of every frame in ms, frames are visited one at a time"""
+    durations = []
+    for frame in ImageSequence.Iterator(img):
+        # WebP sets duration only when the frame is decoded
+        if img.format == 'WEBP':
+            frame.load()
+        durations.append(frame.info.get('duration', 0))
+    img.seek(0)
+    return durations
+
+
+def converted_frame(img, modes, color_manage=False):
+    """Current frame of the open image in one of modes, as a separate image
+    which stays the same when the source is seeked further"""
+    frame = prepare_image(img, modes, color_manage)
+    return img.copy() if frame is img else frame
+
+
+class ConvertedSequence(Image.Image):
+    """Multi-frame image which Pillow writers save instead of the source.
+    seek() converts the next source frame to one of modes, so writers which
+    walk frames by n_frames/seek hold one converted frame at a time.
+    Mode, size and pixels are those of the current converted frame"""
+
+    def __init__(self, img, modes, color_manage=False):
+        super().__init__()
+        self.source = img
+        self.modes = modes
+        self.color_manage = color_manage
+        self.n_frames = frame_count(img)
+        self.frame = None
+        self.seek(0)
+
+    @property
+    def mode(self):
+        return self.frame.mode
+
+    @property
+    def size(self):
+        return self.frame.size
+
+    @property
+    def im(self):
+        return self.frame.im
+
+    def seek(self, frame):
+        self.source.seek(frame)
+        self.frame = converted_frame(self.source, self.modes, self.color_manage)
+        self.frame.load()
+        self.info = self.frame.info
+        self.palette = self.frame.palette
+
+    def tell(self):
+        return self.source.tell()
+
+
+def save_frames(path, out, real_format, options, color_manage=False):  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    """Save every frame of the image at path with their durations and loop count.
+    Frames are converted to the modes of the encoder one by one"""
+    modes = IMAGE_ENCODER_MODES.get(real_format)
+    if real_format == 'PNG':
+        # APNG writer fails on a palette first frame when other frames are RGB
+        modes = tuple(mode for mode in modes if mode != 'P')
+    with Image.open(path) as img:
+        params = {'duration': frame_durations(img)}
+        if 'loop' in img.info:
+            params['loop'] = img.info['loop']
+        ConvertedSequence(img, modes, color_manage).save(out, format=real_format, save_all=True,
+                                                         **params, **options)
+
+
+class AnimatedImage():
+    """Multi-frame image which is converted while it is saved.
+    Stands for the converted PIL image in the GUI, frames are decoded on demand"""
+
+    def __init__(self, path, real_format, n_frames, color_manage=False):
+        self.path = path
+        self.format = real_format
+        self.n_frames = n_frames
+        self.color_manage = color_manage
+        self.source = None
+
+    def frame(self, index):
+        """Decoded RGBA frame, source stays open so next frames are cheap to seek"""
+        if self.source is None:
+            self.source = Image.open(self.path)
+        self.source.seek(index)
+        return self.source.convert('RGBA')
+
+    def save(self, out, format=None, **options):  # pylint: disable=redefined-builtin
+        """Same call as Image.save, all frames are written"""
+        save_frames(self.path, out, format or self.format, options, self.color_manage)
+
+    def close(self):
+        """Close the source opened for previews"""
+        if self.source is not None:
+            self.source.close()
+            self.source = None
@@ -0,0 +1,70 @@
+"""Imaging - optional Pillow encoders (AVIF, JPEG XL), their effort options
+and encoding to the target file size.
+AVIF is built into Pillow >= 11.2, JPEG XL needs pillow-jxl-plugin"""
+
+import io
+
+from PIL import Image
+
+from ui.constants import IMAGE_EFFORT_OPTIONS, IMAGE_MIN_QUALITY, IMAGE_PROFILES
+
+try:
+    # Importing the plugin registers JXL in Pillow
+    import pillow_jxl  # pylint: disable=unused-import
+except ImportError:
+    pillow_jxl = None
+
+
+def encoder_available(real_format):
+    """Check if Pillow can save real_format"""
+    Image.init()
+    return real_format in Image.SAVE
+
+
+def effort_option(real_format, value=None):
+    """(option name, value) of the encoder speed/effort knob or None.
+    value is clamped to the range of the format, None gives the default"""
+    option = IMAGE_EFFORT_OPTIONS.get(real_format)
+    if not option:
+        return None
+    name, low, high, default = option
+    return name, default if value is None else min(max(int(value), low), high)
+
+
+def profile_options(profile, real_format):
+    """Encoder options of the image profile for real_format, raises ValueError for unknown profile"""
+    if profile not in IMAGE_PROFILES:
+        raise ValueError(f"Image profile {profile} is not supported")
+    return dict(IMAGE_PROFILES[profile].get(real_format, {}))
+
+
+def encode(img, real_format, options):
+    """Encoded image bytes, nothing is written to disk"""
+    buffer = io.BytesIO()
+    img.save(buffer, format=real_format, **options)
+    return buffer.getvalue()
+
+
+def encode_to_size(img, real_format, max_bytes, options, min_quality=IMAGE_MIN_QUALITY):
+    """Encode img with the highest quality up to options['quality'] which fits max_bytes.
+    Quality is found by bisection, every attempt encodes the same decoded image.
+    Returns (data, quality), data of min_quality if even it does not fit"""
+    quality = options.get('quality', 85)
+    data = encode(img, real_format, {**options, 'quality': quality})
+    if len(data) <= max_bytes:
+        return data, quality
+
+    best = None
+    low, high = min_quality, quality - 1
+    while low <= high:
+        middle = (low + high) // 2
+        attempt = encode(img, real_format, {**options, 'quality': middle})
+        if len(attempt) <= max_bytes:
+            best = attempt, middle
+            low = middle + 1
+        else:
+            high = middle - 1
+
+    if best:
+        return best
+    return encode(img, real_format, {**options, 'quality': min_quality}), min_quality
@@ -0,0 +1,231 @@
+"""Ingest - files and folders dropped on the main tab are queued.
+Folders are walked and file headers are read in a thread pool outside of
+the GUI thread. Scanned files are collected and added to the queue list in
+batches by a timer, so the list is updated a few times per second however
+many files are dropped"""
+
+import os
+import wave
+import threading
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from PIL import Image, UnidentifiedImageError
+from PyQt6.QtCore import (Qt, QObject, QTimer, QThreadPool, QAbstractListModel, QModelIndex,
+                          pyqtSignal)
+
+from ui.converters import FileConverter
+from ui.media import media_duration
+from ui.sniffing import FormatSniffer
+from ui.workers import Worker
+from ui.constants import (SUPPORTED_CONVERT_EXTENSIONS_PICTURES, SUPPORTED_CONVERT_EXTENSIONS_FILES,
+                          SUPPORTED_CONVERT_EXTENSIONS_VIDEO_AUDIO, INGEST_WORKERS, INGEST_FLUSH_MS,
+                          INGEST_PENDING_PER_WORKER)
+
+SUPPORTED_EXTENSIONS = set(SUPPORTED_CONVERT_EXTENSIONS_PICTURES + SUPPORTED_CONVERT_EXTENSIONS_FILES
+                           + SUPPORTED_CONVERT_EXTENSIONS_VIDEO_AUDIO)
+
+# Errors of unreadable headers, the file is still queued with the error
+SCAN_ERRORS = (OSError, ValueError, EOFError, wave.Error, UnidentifiedImageError)
+
+
+def is_supported(path):
+    """Check if the file can be converted, compressed text files by their inner format"""
+    return FileConverter.detect_extension(str(path)) in SUPPORTED_EXTENSIONS
+
+
+def expand_paths(paths):
+    """Supported files of the dropped paths, folders are walked recursively.
+    Hidden files and folders are skipped"""
+    for path in paths:
+        path = str(path)
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs[:] = sorted(name for name in dirs if not name.startswith('.'))
+                for name in sorted(files):
+                    if not name.startswith('.') and is_supported(name):
+                        yield os.path.join(root, name)
+        elif os.path.isfile(path) and is_supported(path):
+            yield path
+
+
+def format_size(size):
+    """Human readable file size"""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return None
+
+
+# pylint: disable=too-few-public-methods
+class FileInfo():
+    """Metadata of a queued file, read from its header only"""
+
+    def __init__(self, path, file_format=None, size=0):
+        self.path = path
+        self.format = file_format
+        self.size = size
+        self.dimensions = None
+        self.duration = None
+        self.error = None
+
+    def describe(self):
+        """One line of the queue list"""
+        parts = [os.path.basename(self.path), (self.format or '?').lstrip('.').upper(),
+                 format_size(self.size)]
+        if self.dimensions:
+            parts.append(f"{self.dimensions[0]}x{self.dimensions[1]}")
+        if self.duration is not None:
+            minutes, seconds = divmod(int(self.duration), 60)
+            parts.append(f"{minutes:02d}:{seconds:02d}")
+        if self.error:
+            parts.append(f"error: {self.error}")
+        return "  ".join(parts)
+
+
+def scan_file(path, sniffer):
+    """FileInfo of the file, content is checked by magic bytes"""
+    info = FileInfo(path)
+    try:
+        info.size = os.path.getsize(path)
+        info.format = sniffer.detect(path, FileConverter.detect_extension(path))
+        if info.format in SUPPORTED_CONVERT_EXTENSIONS_PICTURES:
+            # Image.open reads the header, pixels are not decoded
+            with Image.open(path) as img:
+                info.dimensions = img.size
+        elif info.format in SUPPORTED_CONVERT_EXTENSIONS_VIDEO_AUDIO:
+            info.duration = media_duration(path)
+    except SCAN_ERRORS as e:
+        info.error = str(e)
+    return info
+
+
+class IngestScanner(QObject):
+    """Scan dropped paths in background and hand scanned files over in batches.
+    The same file is queued once"""
+
+    scanned = pyqtSignal(list)
+    finished = pyqtSignal(int)
+
+    def __init__(self, workers=INGEST_WORKERS, flush_ms=INGEST_FLUSH_MS, parent=None):
+        super().__init__(parent)
+        self.workers = workers
+        self.sniffer = FormatSniffer()
+        self.pool = QThreadPool.globalInstance()
+
+        self.lock = threading.Lock()
+        self.seen = set()
+        self.results = []
+        self.scans = set()
+        self.found = 0
+        # Scans started before the last clear are dropped
+        self.generation = 0
+
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setInterval(flush_ms)
+        self.flush_timer.timeout.connect(self.flush)
+
+    def enqueue(self, paths):
+        """Start scanning of dropped files and folders"""
+        worker = Worker(self.scan, list(paths), self.generation)
+        worker.signals.finished.connect(partial(self.on_scan_finished, worker))
+        worker.signals.error.connect(partial(self.on_scan_finished, worker))
+        self.scans.add(worker)
+        self.pool.start(worker)
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def scan(self, paths, generation):
+        """Walk paths and read headers in a thread pool, runs in a worker thread.
+        Only a few scans per thread are in flight, so walking huge folders keeps memory flat"""
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = set()
+            for path in expand_paths(paths):
+                if generation != self.generation:
+                    break
+                path = os.path.abspath(path)
+                with self.lock:
+                    if path in self.seen:
+                        continue
+                    self.seen.add(path)
+                    self.found += 1
+                pending.add(executor.submit(scan_file, path, self.sniffer))
+                if len(pending) >= self.workers * INGEST_PENDING_PER_WORKER:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    self.collect(done, generation)
+            self.collect(wait(pending).done, generation)
+
+    def collect(self, futures, generation):
+        """Keep results until the next flush"""
+        infos = [future.result() for future in futures]
+        with self.lock:
+            if generation == self.generation:
+                self.results.extend(infos)
+
+    def on_scan_finished(self, worker, _result=None):
+        """One drop is scanned, runs in the GUI thread"""
+        self.scans.discard(worker)
+
+    def flush(self):
+        """Hand scanned files over, runs in the GUI thread on timer"""
+        with self.lock:
+            batch, self.results = self.results, []
+        done = not self.scans
+        if batch:
+            self.scanned.emit(batch)
+        if done:
+            self.flush_timer.stop()
+            self.finished.emit(self.found)
+
+    def is_scanning(self):
+        """Check if dropped files are still scanned"""
+        return self.flush_timer.isActive()
+
+    def clear(self):
+        """Forget queued files, running scans are stopped"""
+        with self.lock:
+            self.generation += 1
+            self.seen.clear()
+            self.results = []
+            self.found = 0
+
+
+class IngestModel(QAbstractListModel):
+    """Queued files for QListView, rows are inserted in batches"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.infos = []
+
+    def rowCount(self, parent=QModelIndex()):  # pylint: disable=invalid-name
+        """Number of queued files"""
+        return 0 if parent.isValid() else len(self.infos)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        """Text, tooltip and path of the row"""
+        if not index.isValid():
+            return None
+        info = self.infos[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return info.describe()
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return info.path
+        if role == Qt.ItemDataRole.UserRole:
+            return info
+        return None
+
+    def add_batch(self, infos):
+        """Append scanned files with one insert"""
+        if not infos:
+            return
+        first = len(self.infos)
+        self.beginInsertRows(QModelIndex(), first, first + len(infos) - 1)
+        self.infos.extend(infos)
+        self.endInsertRows()
+
+    def clear(self):
+        """Remove all rows"""
+        self.beginResetModel()
+        self.infos = []
+        self.endResetModel()
@@ -0,0 +1,62 @@
+"""Instrumentation - counts and timings of hot GUI paths.
+Turned on by the GUI_CONVERTER_INSTRUMENT environment variable, the report
+is printed when the application exits. Only totals are kept per name, so
+memory does not grow with the number of events"""
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+from ui.constants import INSTRUMENTATION_ENV
+
+
+class Instrumentation():
+    """Number of events, total and longest time per name"""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def count(self, name, seconds=0.0):
+        """Record one event which took seconds"""
+        if not self.enabled:
+            return
+        with self.lock:
+            stat = self.stats.setdefault(name, [0, 0.0, 0.0])
+            stat[0] += 1
+            stat[1] += seconds
+            stat[2] = max(stat[2], seconds)
+
+    @contextmanager
+    def timed(self, name):
+        """Record the time of the with block"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.count(name, time.perf_counter() - start)
+
+    def snapshot(self):
+        """{name: (count, total seconds, max seconds)}"""
+        with self.lock:
+            return {name: tuple(stat) for name, stat in self.stats.items()}
+
+    def report(self):
+        """Stats as text table"""
+        lines = [f"{'name':<28} {'count':>8} {'total ms':>10} {'max ms':>8}"]
+        for name, (calls, total, longest) in sorted(self.snapshot().items()):
+            lines.append(f"{name:<28} {calls:>8} {total * 1000:>10.2f} {longest * 1000:>8.3f}")
+        return "\n".join(lines)
+
+    def reset(self):
+        """Drop collected stats"""
+        with self.lock:
+            self.stats.clear()
+
+
+INSTRUMENTS = Instrumentation(bool(os.environ.get(INSTRUMENTATION_ENV)))
@@ -0,0 +1,143 @@
+"""Journal - batch jobs persisted in SQLite.
+Every job is written before it runs and updated when it finishes, with the
+checksum of its output. Commits are synced to disk, so after a crash of the
+app or the machine the next run converts only jobs which did not finish"""
+
+import os
+import json
+import time
+import sqlite3
+
+from ui.batch import BatchJob
+from ui.fileio import file_hash
+from ui.constants import JOURNAL_VERSION
+
+JOURNAL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    inp TEXT NOT NULL,
+    out TEXT NOT NULL,
+    options TEXT NOT NULL,
+    inp_size INTEGER,
+    inp_mtime_ns INTEGER,
+    status TEXT NOT NULL,
+    error TEXT,
+    out_size INTEGER,
+    out_mtime_ns INTEGER,
+    checksum TEXT,
+    updated REAL NOT NULL,
+    UNIQUE (inp, out, options)
+)
+"""
+
+
+def job_spec(job):
+    """(inp, out, options) which identify the job in the journal"""
+    return job.inp, job.out, json.dumps(job.options, sort_keys=True, default=str)
+
+
+def stat_of(path):
+    """(size, mtime_ns) of the file or (None, None) if it is missing"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None, None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class JobJournal():
+    """SQLite journal of batch jobs. Connection belongs to the thread which opened it"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.connection = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def open(self):
+        """Open or create the journal, journal of other version is started anew"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.connection = sqlite3.connect(self.path)
+        # WAL keeps readers unblocked, FULL syncs every commit to disk
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=FULL")
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        with self.connection:
+            if version != JOURNAL_VERSION:
+                self.connection.execute("DROP TABLE IF EXISTS jobs")
+                self.connection.execute(f"PRAGMA user_version={JOURNAL_VERSION}")
+            self.connection.execute(JOURNAL_SCHEMA)
+
+    def close(self):
+        """Close connection"""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def add(self, jobs):
+        """Write jobs as pending in one commit. Jobs which are done with the same
+        input and intact output are marked done and resumed, the others are returned"""
+        to_run = []
+        now = time.time()
+        with self.connection:
+            for job in jobs:
+                spec = job_spec(job)
+                inp_size, inp_mtime_ns = stat_of(job.inp)
+                row = self.connection.execute(
+                    "SELECT status, inp_size, inp_mtime_ns, out_size, out_mtime_ns, checksum "
+                    "FROM jobs WHERE inp = ? AND out = ? AND options = ?", spec).fetchone()
+                if (row and row[0] == 'done' and row[1:3] == (inp_size, inp_mtime_ns)
+                        and self.output_intact(job.out, *row[3:])):
+                    job.status = 'done'
+                    job.resumed = True
+                    continue
+
+                self.connection.execute(
+                    "INSERT INTO jobs (inp, out, options, inp_size, inp_mtime_ns, status, updated) "
+                    "VALUES (?, ?, ?, ?, ?, 'pending', ?) "
+                    "ON CONFLICT (inp, out, options) DO UPDATE SET "
+                    "inp_size = excluded.inp_size, inp_mtime_ns = excluded.inp_mtime_ns, "
+                    "status = 'pending', error = NULL, out_size = NULL, out_mtime_ns = NULL, "
+                    "checksum = NULL, updated = excluded.updated",
+                    (*spec, inp_size, inp_mtime_ns, now))
+                to_run.append(job)
+        return to_run
+
+    @staticmethod
+    def output_intact(out, size, mtime_ns, checksum):
+        """Check if the output is the one written by the job, content is hashed
+        only when its stat changed"""
+        out_size, out_mtime_ns = stat_of(out)
+        if out_size is None or out_size != size:
+            return False
+        return out_mtime_ns == mtime_ns or file_hash(out) == checksum
+
+    def finish(self, job):
+        """Save status of the finished job and checksum of its output"""
+        out_size = out_mtime_ns = checksum = None
+        if job.status == 'done':
+            out_size, out_mtime_ns = stat_of(job.out)
+            if out_size is not None:
+                checksum = file_hash(job.out)
+        with self.connection:
+            self.connection.execute(
+                "UPDATE jobs SET status = ?, error = ?, out_size = ?, out_mtime_ns = ?, "
+                "checksum = ?, updated = ? WHERE inp = ? AND out = ? AND options = ?",
+                (job.status, job.error, out_size, out_mtime_ns, checksum, time.time(),
+                 *job_spec(job)))
+
+    def unfinished(self):
+        """Jobs which were written but did not finish, in the order they were added.
+        Jobs stay 'pending' until they finish, a job started before a crash is pending too"""
+        rows = self.connection.execute(
+            "SELECT inp, out, options FROM jobs WHERE status = 'pending' ORDER BY id")
+        return [BatchJob(inp, out, json.loads(options)) for inp, out, options in rows]
+
+    def counts(self):
+        """{status: number of jobs}"""
+        return dict(self.connection.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"))
@@ -4,9 +4,12 @@ Containing class ConverterTab, AboutTab and class logic"""
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont
 from PyQt6.QtWidgets import (QWidget, QLabel, QPushButton, QVBoxLayout, QHBoxLayout,
-                             QFrame, QComboBox, QLineEdit, QSizePolicy, QDialog)
+                             QFrame, QComboBox, QLineEdit, QSizePolicy, QDialog, QSlider,
+                             QSpinBox, QProgressBar, QListView)
 
 from .utils import Converter, Previewer, SideMethods
+from .ingest import IngestScanner, IngestModel
+from .constants import IMAGE_PROFILES, IMAGE_MAX_SIZE_KB
 
 
 class ConverterTab(QWidget):
@@ -23,7 +26,9 @@ class ConverterTab(QWidget):
         self.setup_widgets_to_layout()
         self.init_frame()
         self.init_box_layout()
+        self.init_queue()
         self.init_preview_area()
+        self.setAcceptDrops(True)
 
     def setup_default_values(self):
         """Values by default"""
@@ -69,6 +74,16 @@ class ConverterTab(QWidget):
         self.show_btn.setFixedSize(100, 40)
         self.show_btn.clicked.connect(self.previewer.preview_object)
 
+        self.zoom_btn = QPushButton("Zoom")
+        self.zoom_btn.setFixedSize(100, 30)
+        self.zoom_btn.setToolTip("Inspect image pixel by pixel")
+        self.zoom_btn.clicked.connect(self.previewer.open_zoom_view)
+
+        self.compare_btn = QPushButton("Compare")
+        self.compare_btn.setFixedSize(100, 30)
+        self.compare_btn.setToolTip("Source and converted image side by side with PSNR/SSIM")
+        self.compare_btn.clicked.connect(self.previewer.open_compare_view)
+
         self.save_converted_btn = QPushButton("Save as")
         self.save_converted_btn.setFixedSize(100, 40)
         self.save_converted_btn.clicked.connect(
@@ -128,9 +143,73 @@ class ConverterTab(QWidget):
         self.drop_down_list.setFixedSize(100, 30)
         row_layout.addWidget(self.drop_down_list)
 
+        # Image encoder profile and speed/effort for WebP/AVIF/JPEG XL outputs
+        image_row_layout = QHBoxLayout()
+        image_row_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        image_row_layout.addWidget(QLabel("Profile "))
+        self.profile_box = QComboBox()
+        self.profile_box.addItems(list(IMAGE_PROFILES))
+        self.profile_box.setCurrentText(self.converter.file_converter.image_profile)
+        self.profile_box.setFixedSize(100, 30)
+        self.profile_box.setToolTip("Image encoder settings: faster convertation or smaller files")
+        self.profile_box.currentTextChanged.connect(self.side_funcs.set_image_profile)
+        image_row_layout.addWidget(self.profile_box)
+
+        image_row_layout.addWidget(QLabel("Effort "))
+        self.effort_box = QSpinBox()
+        self.effort_box.setFixedSize(60, 30)
+        self.effort_box.setEnabled(False)
+        self.effort_box.valueChanged.connect(self.side_funcs.set_image_effort)
+        self.drop_down_list.currentTextChanged.connect(self.side_funcs.update_effort_box)
+        image_row_layout.addWidget(self.effort_box)
+
+        # Lossy outputs can be limited by file size, 0 is no limit
+        image_row_layout.addWidget(QLabel("Max size "))
+        self.max_size_box = QSpinBox()
+        self.max_size_box.setRange(0, IMAGE_MAX_SIZE_KB)
+        self.max_size_box.setSuffix(" KB")
+        self.max_size_box.setSpecialValueText("Off")
+        self.max_size_box.setFixedSize(90, 30)
+        self.max_size_box.setToolTip("Highest JPEG/WebP/AVIF/JPEG XL quality which fits the size")
+        self.max_size_box.valueChanged.connect(self.side_funcs.set_max_image_size)
+        image_row_layout.addWidget(self.max_size_box)
+
         frame_layout.addLayout(row_layout)
+        frame_layout.addLayout(image_row_layout)
         self.frame.setLayout(frame_layout)
 
+    def init_queue(self):
+        """Creating list of dropped files, their headers are scanned in background"""
+        self.ingest = IngestScanner(parent=self)
+        self.ingest.scanned.connect(self.side_funcs.on_files_scanned)
+        self.ingest.finished.connect(self.side_funcs.on_scan_finished)
+
+        self.queue_model = IngestModel(self)
+        self.queue_view = QListView()
+        self.queue_view.setModel(self.queue_model)
+        # Rows of one height are laid out without measuring every row
+        self.queue_view.setUniformItemSizes(True)
+        self.queue_view.setFixedHeight(110)
+        self.queue_view.setToolTip("Double click to open the file")
+        self.queue_view.doubleClicked.connect(self.side_funcs.open_queued_file)
+        self.queue_view.hide()
+
+        self.clear_queue_btn = QPushButton("Clear queue")
+        self.clear_queue_btn.setFixedSize(100, 30)
+        self.clear_queue_btn.clicked.connect(self.side_funcs.clear_queue)
+        self.clear_queue_btn.hide()
+
+    def dragEnterEvent(self, event):  # pylint: disable=invalid-name
+        """Accept dragged files and folders"""
+        if event.mimeData().hasUrls():
+            event.acceptProposedAction()
+
+    def dropEvent(self, event):  # pylint: disable=invalid-name
+        """Queue dropped files and folders"""
+        paths = [url.toLocalFile() for url in event.mimeData().urls() if url.isLocalFile()]
+        self.side_funcs.enqueue_files(paths)
+        event.acceptProposedAction()
+
     def init_preview_area(self):
         """Createing preview window"""
         self.pre_show_window_frame = QFrame()
@@ -156,6 +235,21 @@ class ConverterTab(QWidget):
         self.preview_label.setScaledContents(True)
         pre_show_window_frame_layout.addWidget(self.preview_label)
 
+        # Busy indicator while preview is loaded in background
+        self.loading_bar = QProgressBar()
+        self.loading_bar.setRange(0, 0)
+        self.loading_bar.setFixedHeight(8)
+        self.loading_bar.setTextVisible(False)
+        self.loading_bar.hide()
+        pre_show_window_frame_layout.addWidget(self.loading_bar)
+
+        # Frames of animated images are decoded one at a time on demand
+        self.frame_slider = QSlider(Qt.Orientation.Horizontal)
+        self.frame_slider.setToolTip("Frame of animated image")
+        self.frame_slider.valueChanged.connect(self.previewer.show_frame)
+        self.frame_slider.hide()
+        pre_show_window_frame_layout.addWidget(self.frame_slider)
+
         self.pre_show_window_frame.setSizePolicy(
             QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         self.pre_show_window_frame.setLayout(pre_show_window_frame_layout)
@@ -164,6 +258,15 @@ class ConverterTab(QWidget):
         self.layout.addWidget(
             self.frame, alignment=Qt.AlignmentFlag.AlignCenter)
         self.layout.addWidget(self.pre_show_window_frame)
+        self.layout.addWidget(self.queue_view)
+
+        # Image inspection tools under the preview
+        tools_layout = QHBoxLayout()
+        tools_layout.addWidget(self.clear_queue_btn)
+        tools_layout.addStretch(1)
+        tools_layout.addWidget(self.zoom_btn)
+        tools_layout.addWidget(self.compare_btn)
+        self.layout.addLayout(tools_layout)
         self.setLayout(self.layout)
 
     def show_help_dialog(self):
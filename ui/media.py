@@ -0,0 +1,213 @@
+"""Media - waveform and thumbnail strip previews of audio/video files.
+Every strip is made by one ffmpeg pass: audio is drawn by the showwavespic
+filter, video keyframes are scaled by ffmpeg and read as raw frames of which
+only evenly spaced ones are kept. Strips are cached per file, ffmpeg of a
+cancelled strip is killed"""
+
+import io
+import os
+import shutil
+import wave
+import threading
+import subprocess
+
+from PIL import Image
+
+from ui.cache import LRUCache, MISSING
+from ui.constants import (AUDIO_PREVIEW_EXTENSIONS, WAVEFORM_SIZE, WAVEFORM_COLOR, THUMBNAIL_SIZE,
+                          THUMBNAIL_COUNT, MEDIA_STRIP_CACHE_SIZE)
+
+
+def ffmpeg_available():
+    """Check if ffmpeg is on PATH"""
+    return shutil.which('ffmpeg') is not None
+
+
+def media_duration(path):
+    """Duration in seconds, wav header is read directly, other files by ffprobe.
+    None if it is unknown"""
+    if str(path).lower().endswith('.wav'):
+        with wave.open(str(path), 'rb') as wav:
+            return wav.getnframes() / wav.getframerate()
+    if not shutil.which('ffprobe'):
+        return None
+    result = subprocess.run(['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+                             '-of', 'default=noprint_wrappers=1:nokey=1', str(path)],
+                            capture_output=True, text=True, check=False)
+    try:
+        return float(result.stdout.strip())
+    except ValueError:
+        return None
+
+
+def waveform_command(path, size=WAVEFORM_SIZE):
+    """ffmpeg command which writes waveform of all channels mixed down as PNG to stdout"""
+    width, height = size
+    return ['ffmpeg', '-v', 'error', '-i', str(path), '-filter_complex',
+            f"aformat=channel_layouts=mono,showwavespic=s={width}x{height}:colors={WAVEFORM_COLOR}",
+            '-frames:v', '1', '-f', 'image2pipe', '-c:v', 'png', '-']
+
+
+def thumbnails_command(path, size=THUMBNAIL_SIZE):
+    """ffmpeg command which writes keyframes letterboxed to size as raw RGB to stdout.
+    Only keyframes are decoded, so long files are read quickly"""
+    width, height = size
+    return ['ffmpeg', '-v', 'error', '-skip_frame', 'nokey', '-i', str(path), '-an', '-vf',
+            f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2",
+            '-vsync', '0', '-f', 'rawvideo', '-pix_fmt', 'rgb24', '-']
+
+
+def waveform(path, size=WAVEFORM_SIZE, runs=None):
+    """Waveform image of the audio file, ffmpeg is added to FfmpegRuns runs"""
+    with subprocess.Popen(waveform_command(path, size), stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE) as process:
+        if runs:
+            runs.add(process)
+        try:
+            stdout, stderr = process.communicate()
+        finally:
+            if runs:
+                runs.discard(process)
+    if process.returncode != 0 or not stdout:
+        raise RuntimeError(f"Error FFMPEG Failed with code {process.returncode}: "
+                           f"{stderr.decode('utf-8', 'replace')}")
+    with Image.open(io.BytesIO(stdout)) as img:
+        return img.convert('RGBA')
+
+
+def thumbnail_strip(path, count=THUMBNAIL_COUNT, size=THUMBNAIL_SIZE, runs=None):
+    """Strip of count evenly spaced keyframes, None if the file has no video.
+    ffmpeg is added to FfmpegRuns runs"""
+    width, height = size
+    frame_bytes = width * height * 3
+    sampler = FrameSampler(count)
+    with subprocess.Popen(thumbnails_command(path, size), stdout=subprocess.PIPE,
+                          stderr=subprocess.DEVNULL) as process:
+        if runs:
+            runs.add(process)
+        try:
+            while True:
+                frame = process.stdout.read(frame_bytes)
+                if len(frame) < frame_bytes:
+                    break
+                sampler.add(frame)
+        finally:
+            if runs:
+                runs.discard(process)
+    frames = sampler.picked()
+    if not frames:
+        return None
+
+    strip = Image.new('RGB', (width * len(frames), height))
+    for index, frame in enumerate(frames):
+        strip.paste(Image.frombytes('RGB', size, frame), (index * width, 0))
+    return strip
+
+
+class FrameSampler():
+    """Evenly spaced frames of a stream of unknown length.
+    At most 2 * count frames are kept: when the list is full every other
+    frame is dropped and the step between kept frames is doubled"""
+
+    def __init__(self, count):
+        self.count = count
+        self.frames = []
+        self.step = 1
+        self.seen = 0
+
+    def add(self, frame):
+        """Take the next frame of the stream"""
+        if self.seen % self.step == 0:
+            self.frames.append(frame)
+            if len(self.frames) >= 2 * self.count:
+                del self.frames[1::2]
+                self.step *= 2
+        self.seen += 1
+
+    def picked(self):
+        """At most count frames spread over the whole stream"""
+        total = len(self.frames)
+        if total <= self.count:
+            return list(self.frames)
+        return [self.frames[index * total // self.count] for index in range(self.count)]
+
+
+class FfmpegRuns():
+    """ffmpeg processes of one strip, they are killed together when it is cancelled"""
+
+    def __init__(self):
+        self.processes = set()
+        self.killed = False
+        self.lock = threading.Lock()
+
+    def add(self, process):
+        """Track started process, it is killed at once if the strip is already cancelled"""
+        with self.lock:
+            if self.killed:
+                process.kill()
+            self.processes.add(process)
+
+    def discard(self, process):
+        """Forget finished process"""
+        with self.lock:
+            self.processes.discard(process)
+
+    def kill(self):
+        """Kill running processes and the ones started later"""
+        with self.lock:
+            self.killed = True
+            for process in self.processes:
+                process.kill()
+
+
+class MediaStrips():
+    """Waveforms and thumbnail strips of media files, kept in LRU cache"""
+
+    def __init__(self, cache_size=MEDIA_STRIP_CACHE_SIZE):
+        self.cache = LRUCache(cache_size)
+        self.runs = set()
+        self.lock = threading.Lock()
+
+    def strip(self, path):
+        """Waveform of audio file, keyframes of video file or waveform of video without picture.
+        None for files ffmpeg can not read, RuntimeError if the strip was cancelled"""
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        # Strip is None for files ffmpeg can not read, it is cached too
+        cached = self.cache.get(key, MISSING)
+        if cached is not MISSING:
+            return cached
+
+        runs = FfmpegRuns()
+        with self.lock:
+            self.runs.add(runs)
+        try:
+            result = self.make_strip(path, runs)
+        finally:
+            with self.lock:
+                self.runs.discard(runs)
+        if runs.killed:
+            raise RuntimeError("Media strip cancelled")
+
+        self.cache.put(key, result)
+        return result
+
+    @staticmethod
+    def make_strip(path, runs):
+        """Strip made by ffmpeg processes of runs, None if ffmpeg failed"""
+        result = None
+        if os.path.splitext(str(path))[1].lower() not in AUDIO_PREVIEW_EXTENSIONS:
+            result = thumbnail_strip(path, runs=runs)
+        if result is None and not runs.killed:
+            try:
+                result = waveform(path, runs=runs)
+            except RuntimeError:
+                result = None
+        return result
+
+    def cancel(self):
+        """Kill ffmpeg of the strips being made, they are not cached"""
+        with self.lock:
+            for runs in self.runs:
+                runs.kill()
@@ -0,0 +1,141 @@
+"""Metrics - quality of the converted image against its source.
+The converted image is encoded with the save options, decoded back and
+compared with the source: PSNR over RGB, SSIM over luma and the size ratio.
+NumPy does the math on strips of rows, so memory does not grow with the
+image height. Results are cached per source file, converted pixels and options"""
+
+import io
+import os
+import math
+import hashlib
+
+from PIL import Image, ImageChops, ImageOps
+
+from ui.cache import LRUCache
+from ui.constants import SSIM_WINDOW, METRICS_STRIP_ROWS, COMPARE_CACHE_SIZE, COMPARE_PREVIEW_SIZE
+from ui.imaging import encode, encode_to_size
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Stabilizing constants of SSIM for 8-bit images
+SSIM_C1 = (0.01 * 255) ** 2
+SSIM_C2 = (0.03 * 255) ** 2
+
+
+def numpy_available():
+    """Check if numpy is installed"""
+    return numpy is not None
+
+
+def psnr(reference, distorted, strip_rows=METRICS_STRIP_ROWS):
+    """Peak signal-to-noise ratio of two RGB images in dB, inf for equal images"""
+    ref, dist = numpy.asarray(reference), numpy.asarray(distorted)
+    squared = 0.0
+    for start in range(0, ref.shape[0], strip_rows):
+        diff = ref[start:start + strip_rows].astype(numpy.float64) - dist[start:start + strip_rows]
+        squared += float(numpy.square(diff).sum())
+    mse = squared / ref.size
+    return math.inf if mse == 0 else 10 * math.log10(255 ** 2 / mse)
+
+
+def window_means(values, size):
+    """Mean of every size x size window, integral image makes it one pass"""
+    integral = numpy.pad(values.cumsum(0).cumsum(1), ((1, 0), (1, 0)))
+    total = (integral[size:, size:] - integral[:-size, size:]
+             - integral[size:, :-size] + integral[:-size, :-size])
+    return total / (size * size)
+
+
+def ssim(reference, distorted, size=SSIM_WINDOW, strip_rows=METRICS_STRIP_ROWS):  # pylint: disable=too-many-locals
+    """Mean structural similarity of two L images over size x size windows"""
+    ref, dist = numpy.asarray(reference), numpy.asarray(distorted)
+    height, width = ref.shape
+    if height < size or width < size:
+        return 1.0 if numpy.array_equal(ref, dist) else 0.0
+
+    total, windows = 0.0, 0
+    # Strips overlap by size - 1 rows, so every window is counted once
+    for start in range(0, height - size + 1, strip_rows):
+        x = ref[start:start + strip_rows + size - 1].astype(numpy.float64)
+        y = dist[start:start + strip_rows + size - 1].astype(numpy.float64)
+        mean_x, mean_y = window_means(x, size), window_means(y, size)
+        var_x = window_means(x * x, size) - mean_x ** 2
+        var_y = window_means(y * y, size) - mean_y ** 2
+        cov = window_means(x * y, size) - mean_x * mean_y
+        ssim_map = (((2 * mean_x * mean_y + SSIM_C1) * (2 * cov + SSIM_C2))
+                    / ((mean_x ** 2 + mean_y ** 2 + SSIM_C1) * (var_x + var_y + SSIM_C2)))
+        total += float(ssim_map.sum())
+        windows += ssim_map.size
+    return total / windows
+
+
+def preview_of(img):
+    """Image made small enough to be shown"""
+    preview = img.copy()
+    preview.thumbnail((COMPARE_PREVIEW_SIZE, COMPARE_PREVIEW_SIZE))
+    return preview
+
+
+class Comparison():  # pylint: disable=too-few-public-methods
+    """Source and converted image with their quality metrics.
+    psnr and ssim are None when numpy is not installed"""
+
+    def __init__(self, original_size, size, psnr_db=None, ssim_index=None):
+        self.original_size = original_size
+        self.size = size
+        self.size_ratio = size / original_size if original_size else None
+        self.psnr = psnr_db
+        self.ssim = ssim_index
+
+        # Downscaled images for the compare view
+        self.original = None
+        self.converted = None
+        self.difference = None
+
+
+class ImageComparer():
+    """Compare source files with converted images, results are kept in LRU cache"""
+
+    def __init__(self, cache_size=COMPARE_CACHE_SIZE):
+        self.cache = LRUCache(cache_size)
+
+    def compare(self, path, converted, real_format, options, max_bytes=None):
+        """Comparison of the source file and converted image saved with options,
+        with max_bytes quality is lowered the same way as on save"""
+        stat = os.stat(path)
+        digest = hashlib.blake2b(converted.tobytes(), digest_size=16).hexdigest()
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns, digest, converted.mode,
+               converted.size, real_format, tuple(sorted(options.items())), max_bytes)
+        result = self.cache.get(key)
+        if result is None:
+            result = self.measure(path, converted, real_format, options, stat.st_size, max_bytes)
+            self.cache.put(key, result)
+        return result
+
+    @staticmethod
+    def measure(path, converted, real_format, options, original_size, max_bytes=None):  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        """Encode, decode back and measure against the source"""
+        if max_bytes:
+            data, _quality = encode_to_size(converted, real_format, max_bytes, options)
+        else:
+            data = encode(converted, real_format, options)
+        with Image.open(path) as source:
+            original = source.convert('RGB')
+        with Image.open(io.BytesIO(data)) as encoded:
+            decoded = encoded.convert('RGB')
+
+        result = Comparison(original_size, len(data))
+        if numpy_available() and original.size == decoded.size:
+            result.psnr = psnr(original, decoded)
+            result.ssim = ssim(original.convert('L'), decoded.convert('L'))
+
+        result.original = preview_of(original)
+        result.converted = preview_of(decoded)
+        if original.size == decoded.size:
+            # Differences are stretched to the full range to be visible
+            result.difference = ImageOps.autocontrast(
+                ImageChops.difference(result.original, result.converted).convert('L'))
+        return result
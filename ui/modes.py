@@ -0,0 +1,86 @@
+"""Modes - mode-aware conversion stage between decoding and encoding.
+Images already in a mode the target takes are passed as they are, other
+modes are converted with the cheapest path which keeps grey, alpha and
+16-bit content. Embedded ICC profiles can be applied with ImageCms, the
+transforms are built once per profile"""
+
+import io
+from functools import lru_cache
+
+from PIL import Image
+try:
+    from PIL import ImageCms
+except ImportError:
+    ImageCms = None
+
+from ui.constants import ICC_TRANSFORM_CACHE_SIZE
+
+# Grey modes with more than 8 bits, convert('L') clips them at 255
+HIGH_BIT_MODES = ('I', 'I;16', 'I;16B', 'I;16L', 'I;16N')
+
+
+def cms_available():
+    """Check if Pillow is built with littlecms"""
+    return ImageCms is not None
+
+
+def wanted_mode(img, modes):
+    """Mode of modes which keeps grey, alpha and colour of img"""
+    alpha = img.has_transparency_data
+    if Image.getmodebase(img.mode) == 'L':
+        order = ('LA', 'RGBA', 'L', 'RGB') if alpha else ('L', 'RGB', 'RGBA', 'LA')
+    else:
+        order = ('RGBA', 'RGB') if alpha else ('RGB', 'RGBA')
+    return next((mode for mode in order if mode in modes), modes[0])
+
+
+def to_8bit(img):
+    """High bit grey image scaled down to L"""
+    if img.mode != 'I':
+        img = img.convert('I')
+    return img.point(lambda value: value * (1 / 256)).convert('L')
+
+
+@lru_cache(maxsize=ICC_TRANSFORM_CACHE_SIZE)
+def srgb_transform(icc_profile, in_mode, out_mode):
+    """Transform from the embedded profile to sRGB, built once per profile and modes"""
+    return ImageCms.buildTransform(ImageCms.ImageCmsProfile(io.BytesIO(icc_profile)),
+                                   ImageCms.createProfile('sRGB'), in_mode, out_mode)
+
+
+def apply_icc(img, out_mode):
+    """img transformed to sRGB by its embedded profile, None if it can not be done"""
+    icc_profile = img.info.get('icc_profile')
+    if (not ImageCms or not icc_profile or img.mode not in ('RGB', 'RGBA', 'CMYK')
+            or out_mode not in ('RGB', 'RGBA')):
+        return None
+    try:
+        managed = ImageCms.applyTransform(img, srgb_transform(icc_profile, img.mode, out_mode))
+    except (ImageCms.PyCMSError, OSError, ValueError):
+        return None
+    managed.info.pop('icc_profile', None)
+    return managed
+
+
+def prepare_image(img, modes, color_manage=False, palette_alpha=True):
+    """img in one of modes, img itself if it already fits. modes None keeps every mode.
+    palette_alpha=False converts P images with transparency as if P was not in modes"""
+    if modes is None:
+        return img
+    fits = img.mode in modes and (palette_alpha or img.mode != 'P' or not img.has_transparency_data)
+    mode = img.mode if fits else wanted_mode(img, [m for m in modes if m != 'P'] or modes)
+
+    if color_manage:
+        managed = apply_icc(img, mode)
+        if managed is not None:
+            return managed
+    if mode == img.mode:
+        return img
+
+    converted = to_8bit(img) if img.mode in HIGH_BIT_MODES else img
+    if converted.mode != mode:
+        converted = converted.convert(mode)
+    # Profile of the source colour space does not describe the converted pixels
+    if Image.getmodebase(mode) != Image.getmodebase(img.mode):
+        converted.info.pop('icc_profile', None)
+    return converted
@@ -0,0 +1,157 @@
+"""Parallel - chunked csv -> json/txt convertation in a process pool.
+
+CSV is split at row boundaries by the quoting of the excel dialect used by csv.DictReader,
+so quoted newlines are never cut. When every quote opens a field at its start, newline is
+a boundary if the number of quote chars before it is even. Files with quotes inside of
+unquoted fields (5" screen) are split by a regex of whole csv records.
+Chunks are converted by worker processes and written in the original order,
+output is the same as FileConverter.write_csv_json/write_csv_txt"""
+
+import io
+import os
+import re
+import csv
+import json
+import mmap
+from json.encoder import encode_basestring
+from concurrent.futures import ProcessPoolExecutor
+
+from ui.fileio import open_text_lines
+from ui.constants import PARALLEL_CSV_CHUNK_SIZE
+
+INDENT = ' ' * 4
+
+
+def quoted_field(group):
+    """Regex of a quoted csv field and the text after its closing quote.
+    Closing quote is never the first one of doubled "". Quoted part is matched
+    atomically by lookahead and backreference, failed matches never backtrack into it"""
+    return rf'(?=("[^"]*(?:""[^"]*)*"(?!")))\{group}[^,\r\n]*'.encode('ascii')
+
+
+# One csv record with its line end, as csv module reads it (excel dialect, not strict).
+# Runs without quotes take many fields at once. Quote opens a field only at the
+# start of the record or after a comma, other quotes are text of unquoted fields
+CSV_RECORD = (b'(?:' + quoted_field(1) + rb'|(?!"))(?:[^"\r\n]*(?:(?<=,)' + quoted_field(2)
+              + rb'|(?<!,)"[^,\r\n]*))*[^"\r\n]*(?:\r\n|\n|\r)')
+# As many whole records as fit before endpos
+CSV_RECORDS = re.compile(b'(?:' + CSV_RECORD + b')*')
+CSV_RECORD = re.compile(CSV_RECORD)
+# Quoted fields (pairs of quote chars) which all begin at the start of a field,
+# right after the closing quote of the previous one for doubled ""
+CSV_FIELD_QUOTES = re.compile(rb'(?:"[^"]*")?(?:[^"]*(?<=[,\r\n"])"[^"]*")*[^"]*')
+
+
+def quote_bounds(mm, size, chunk_size):
+    """Chunk bounds at newlines with an even number of quote chars before them"""
+    bounds = []
+    begin = 0
+    while begin < size:
+        end = mm.find(b'\n', min(begin + chunk_size, size) - 1)
+        quotes = mm[begin:size if end == -1 else end].count(b'"')
+        # Newline inside of the quoted field, move to the next one
+        while end != -1 and quotes % 2:
+            next_end = mm.find(b'\n', end + 1)
+            quotes += mm[end:size if next_end == -1 else next_end].count(b'"')
+            end = next_end
+        end = size if end == -1 else end + 1
+
+        bounds.append((begin, end))
+        begin = end
+    return bounds
+
+
+def record_bounds(mm, size, chunk_size):
+    """Chunk bounds after whole csv records which end with a newline"""
+    bounds = []
+    begin = 0
+    while begin < size:
+        # Whole records before the target, then records up to the next '\n' line end
+        target = min(begin + chunk_size, size)
+        end = CSV_RECORDS.match(mm, begin, target).end()
+        while end < size and (end < target or mm[end - 1] != ord('\n')):
+            record = CSV_RECORD.match(mm, end)
+            # Last record has no line end or its quoted field is not closed
+            end = record.end() if record else size
+
+        bounds.append((begin, end))
+        begin = end
+    return bounds
+
+
+def csv_chunk_bounds(path, chunk_size=PARALLEL_CSV_CHUNK_SIZE):
+    """List of (begin, end) byte ranges of about chunk_size, cut at row boundaries.
+    Records are found by the quoting rules of csv module, so quoted newlines are never cut"""
+    with open(path, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        if size <= chunk_size:
+            return [(0, size)] if size else []
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if CSV_FIELD_QUOTES.fullmatch(mm):
+                return quote_bounds(mm, size, chunk_size)
+            return record_bounds(mm, size, chunk_size)
+
+
+def json_row(row, encoder):
+    """Row as an item of the json list dumped with indent=4.
+    Rows of strings are formatted directly, the rest goes through encoder"""
+    if row and all(isinstance(v, str) for v in row.values()):
+        fields = ',\n'.join(f"{INDENT * 2}{encode_basestring(k)}: {encode_basestring(v)}"
+                            for k, v in row.items())
+        return f"{INDENT}{{\n{fields}\n{INDENT}}}"
+    return INDENT + encoder.encode(row).replace('\n', '\n' + INDENT)
+
+
+def read_range(path, begin, end, encoding='utf-8'):
+    """Decode byte range of the file"""
+    with open(path, 'rb') as file:
+        file.seek(begin)
+        return file.read(end - begin).decode(encoding)
+
+
+def convert_csv_chunk(path, begin, end, fieldnames, out_format):
+    """Convert rows of the byte range to text of the output file.
+    First chunk has fieldnames=None and reads the header by itself"""
+    lines = io.StringIO(read_range(path, begin, end), newline='')
+    reader = csv.DictReader(lines, fieldnames=fieldnames)
+
+    if out_format == '.json':
+        encoder = json.JSONEncoder(ensure_ascii=False, indent=4)
+        return ',\n'.join(json_row(row, encoder) for row in reader)
+
+    parts = [] if fieldnames else ['\t'.join(reader.fieldnames) + '\n']
+    parts.extend('\t'.join(row.values()) + '\n' for row in reader)
+    return ''.join(parts)
+
+
+def read_fieldnames(path, encoding='utf-8'):
+    """Header of the csv file the same way as csv.DictReader reads it"""
+    with open_text_lines(path, encoding) as lines:
+        return csv.DictReader(lines).fieldnames
+
+
+def write_csv_parallel(inp, out, out_format, workers, chunk_size=PARALLEL_CSV_CHUNK_SIZE):
+    """Convert csv file to .json or .txt with a pool of worker processes"""
+    fieldnames = read_fieldnames(inp)
+    if fieldnames is None and out_format == '.txt':
+        raise TypeError("CSV file has no header")
+
+    bounds = csv_chunk_bounds(inp, chunk_size)
+    count = len(bounds)
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, count))) as pool:
+        results = pool.map(convert_csv_chunk, [inp] * count, *zip(*bounds),
+                           [None] + [fieldnames] * (count - 1), [out_format] * count)
+
+        with open(out, 'w', encoding='utf-8') as out_file:
+            if out_format == '.txt':
+                out_file.writelines(results)
+                return
+
+            first = True
+            for text in results:
+                if not text:
+                    continue
+                out_file.write(('[\n' if first else ',\n') + text)
+                first = False
+            out_file.write('[]' if first else '\n]')
@@ -0,0 +1,42 @@
+"""Pool - preview widgets of every kind (text, image, video) are made once and reused.
+Only one kind is shown at a time, the others are hidden and reset, so the
+next file of their kind only sets new content. The media player and its
+backend stay alive for the whole session"""
+
+
+class PreviewPool():
+    """Shown preview kind and reset of the hidden ones"""
+
+    def __init__(self):
+        self.kinds = {}
+        self.active = None
+
+    def register(self, kind, widgets, reset):
+        """widgets() returns widgets of the kind made so far, reset() clears their state"""
+        self.kinds[kind] = (widgets, reset)
+
+    def activate(self, kind):
+        """Show widgets of the kind, other kinds are released"""
+        for other in self.kinds:
+            if other != kind:
+                self.release(other)
+        widgets, _reset = self.kinds[kind]
+        for widget in widgets():
+            if widget is not None:
+                widget.show()
+        self.active = kind
+
+    def release(self, kind):
+        """Reset and hide widgets of the kind, they are kept for the next file"""
+        widgets, reset = self.kinds[kind]
+        reset()
+        for widget in widgets():
+            if widget is not None:
+                widget.hide()
+        if self.active == kind:
+            self.active = None
+
+    def release_all(self):
+        """Nothing is shown"""
+        for kind in self.kinds:
+            self.release(kind)
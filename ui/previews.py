@@ -0,0 +1,66 @@
+"""Previews - loading preview content outside of the GUI thread.
+Loaders return QImage or text, QPixmap is made from QImage in the GUI thread only"""
+
+from pathlib import Path
+
+from PIL import Image
+from PIL.ImageQt import ImageQt
+from PyQt6.QtGui import QImage
+
+from ui.constants import PREVIEW_MODES, PREVIEW_MAX_LINES, TABULAR_EXTENSIONS
+from ui.fileio import read_preview_text
+from ui.frames import AnimatedImage
+from ui.modes import prepare_image
+from ui.tabular import preview_text
+from ui.tiles import TilePyramid
+
+
+def to_qimage(pil_img):
+    """QImage of PIL image, L, P and 16-bit images are not converted"""
+    return ImageQt(prepare_image(pil_img, PREVIEW_MODES, palette_alpha=False))
+
+
+def load_picture(convert_file, curr_file):
+    """(identifier, QImage) of the converted image or of the source file.
+    Animated image is opened once more, its own source belongs to the frame slider"""
+    if isinstance(convert_file, AnimatedImage):
+        with Image.open(convert_file.path) as img:
+            image = to_qimage(img)
+        return f"Converted_{convert_file.path}_{convert_file.format}", image
+    if convert_file:
+        return f"Converted_{hash(convert_file.tobytes())}", to_qimage(convert_file)
+    return curr_file, QImage(str(curr_file))
+
+
+def load_media_strip(strips, path):
+    """QImage of the waveform or thumbnail strip of the media file"""
+    strip = strips.strip(path)
+    if strip is None:
+        raise RuntimeError("ffmpeg can not read the file")
+    return to_qimage(strip)
+
+
+def load_document(target_file):
+    """First lines of text or tabular file"""
+    ext = Path(target_file).suffix.lower()
+    if ext in TABULAR_EXTENSIONS:
+        return preview_text(target_file, ext, PREVIEW_MAX_LINES)
+    return read_preview_text(target_file, PREVIEW_MAX_LINES)
+
+
+def load_pyramid(convert_file, curr_file, frame=0):
+    """TilePyramid of the converted image, of the animated image frame or of the source file.
+    The whole image is decoded and its coarse levels are reduced here, tiles later on demand"""
+    if isinstance(convert_file, AnimatedImage):
+        with Image.open(convert_file.path) as img:
+            img.seek(frame)
+            source = img.convert('RGBA')
+    elif convert_file:
+        source = convert_file
+    else:
+        with Image.open(curr_file) as img:
+            img.load()
+            source = img
+    pyramid = TilePyramid(source)
+    pyramid.tile(pyramid.levels - 1, 0, 0)
+    return pyramid
@@ -0,0 +1,202 @@
+"""Scheduler - batch jobs are started by the resources they need, not N at once.
+Every job is classified by its converter and input size: 'io' (streamed text
+writers), 'cpu' (images, ffmpeg, in-memory text writers) or 'memory' (cpu jobs
+with a large estimated RSS). cpu and memory jobs share CPU slots, io jobs have
+their own slots, and a job waits while the estimated RSS of the running jobs
+and its own would go over the memory budget. Loads are estimated lazily, only
+for SCHEDULER_LOOKAHEAD jobs at the head of the queues"""
+
+import os
+from itertools import islice
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from PIL import Image, UnidentifiedImageError
+
+from ui.compression import compression_of
+from ui.constants import (SUPPORTED_CONVERT_EXTENSIONS_PICTURES, SUPPORTED_CONVERT_EXTENSIONS_VIDEO_AUDIO,
+                          PIC_EXTENSION_MAP, TABULAR_EXTENSIONS, COLUMNAR_CSV_MIN_SIZE, PARALLEL_CSV_MIN_SIZE,
+                          SCHEDULER_MEMORY_FRACTION, SCHEDULER_MEMORY_FALLBACK, SCHEDULER_HEAVY_MEMORY,
+                          SCHEDULER_LOOKAHEAD, SCHEDULER_RSS_FACTORS, SCHEDULER_COMPRESSION_RATIO,
+                          SCHEDULER_IMAGE_RSS_FACTORS, SCHEDULER_IMAGE_RSS_DEFAULT, SCHEDULER_FFMPEG_MEMORY,
+                          SCHEDULER_TABULAR_MEMORY, SCHEDULER_STREAM_MEMORY, ALL_FRAMES_FORMATS)
+from ui.frames import frame_count
+
+
+def total_memory():
+    """Physical memory in bytes or None if it is unknown"""
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def memory_budget():
+    """Memory which running jobs can take together"""
+    total = total_memory()
+    return int(total * SCHEDULER_MEMORY_FRACTION) if total else SCHEDULER_MEMORY_FALLBACK
+
+
+# pylint: disable=too-few-public-methods
+class JobLoad():
+    """Resources of one job: kind, estimated RSS in bytes and CPU slots"""
+
+    def __init__(self, kind, memory, slots=1):
+        if kind == 'cpu' and memory >= SCHEDULER_HEAVY_MEMORY:
+            kind = 'memory'
+        self.kind = kind
+        self.memory = memory
+        self.slots = slots
+
+
+def image_memory(path, out_ext):
+    """Estimated RSS of decoding the image and encoding it to out_ext"""
+    real_format = PIC_EXTENSION_MAP.get(out_ext.lstrip('.').upper())
+    factor = SCHEDULER_IMAGE_RSS_FACTORS.get(real_format, SCHEDULER_IMAGE_RSS_DEFAULT)
+    try:
+        # Only the header is read. Animations are decoded one frame at a time,
+        # but GIF and APNG encoders hold all of them
+        with Image.open(path) as img:
+            frames = frame_count(img) if real_format in ALL_FRAMES_FORMATS else 1
+            return img.width * img.height * 4 * factor * frames
+    except (OSError, UnidentifiedImageError, ValueError):
+        return SCHEDULER_STREAM_MEMORY
+
+
+def text_factor(inp_ext, out_ext, size, converter):
+    """RSS of the text writer as a multiple of input size, 0 for streamed writers"""
+    if inp_ext == '.json':
+        return SCHEDULER_RSS_FACTORS['json']
+    if (inp_ext, out_ext) == ('.csv', '.json'):
+        if converter.columnar and size >= COLUMNAR_CSV_MIN_SIZE:
+            return SCHEDULER_RSS_FACTORS['columnar']
+        return SCHEDULER_RSS_FACTORS['csv_json']
+    return 0
+
+
+def estimate_load(job, converter, cpu_slots=1):
+    """JobLoad of the job converted by FileConverter converter"""
+    try:
+        inp_ext = converter.detect_format(job.inp)
+        size = os.path.getsize(job.inp)
+    except OSError:
+        # Job fails at once, it takes no memory
+        return JobLoad('io', 0)
+    out_ext = converter.detect_extension(job.out)
+    compressed = compression_of(job.inp) or compression_of(job.out)
+    if compression_of(job.inp):
+        size *= SCHEDULER_COMPRESSION_RATIO
+
+    if out_ext in SUPPORTED_CONVERT_EXTENSIONS_PICTURES:
+        return JobLoad('cpu', image_memory(job.inp, out_ext))
+    if out_ext in SUPPORTED_CONVERT_EXTENSIONS_VIDEO_AUDIO:
+        # ffmpeg encoders use every core
+        return JobLoad('cpu', SCHEDULER_FFMPEG_MEMORY, cpu_slots)
+
+    factor = text_factor(inp_ext, out_ext, size, converter)
+    if factor:
+        # Large csv without pyarrow is converted by a pool of processes
+        slots = 1
+        if (factor == SCHEDULER_RSS_FACTORS['csv_json'] and not compressed
+                and converter.workers > 1 and size >= PARALLEL_CSV_MIN_SIZE):
+            slots = min(converter.workers, cpu_slots)
+        return JobLoad('cpu', size * factor, slots)
+    if inp_ext in TABULAR_EXTENSIONS or out_ext in TABULAR_EXTENSIONS:
+        # Record batches keep memory bounded
+        return JobLoad('cpu', SCHEDULER_TABULAR_MEMORY)
+    return JobLoad('io', SCHEDULER_STREAM_MEMORY)
+
+
+class JobScheduler():
+    """Runs jobs in a thread pool within CPU slots, io slots and memory budget.
+    Jobs of a queue start in order, a job which does not fit the memory keeps
+    it reserved for itself, so smaller cpu jobs behind it never starve it.
+    io jobs are small and few, they run beside it. Job larger than the whole
+    budget runs alone"""
+
+    def __init__(self, cpu_slots=None, io_slots=None, memory=None):
+        self.cpu_slots = cpu_slots or os.cpu_count() or 1
+        self.io_slots = io_slots or self.cpu_slots
+        self.memory = memory or memory_budget()
+
+        self.used_slots = 0
+        self.io_running = 0
+        self.reserved = 0
+        self.peak_memory = 0
+        self.peak_running = 0
+
+    def run(self, jobs, run_job, load_of):
+        """Yield jobs finished by run_job(job) as they finish, load_of(job) gives JobLoad"""
+        pending = iter(jobs)
+        queues = {'cpu': deque(), 'io': deque()}
+        running = {}
+        try:
+            with ThreadPoolExecutor(max_workers=self.cpu_slots + self.io_slots) as pool:
+                while self.fill(queues, pending, load_of) or running:
+                    started = self.admit(queues['cpu'], bool(running))
+                    started += self.admit(queues['io'], bool(running or started))
+                    for job, load in started:
+                        running[pool.submit(run_job, job)] = load
+                    self.peak_running = max(self.peak_running, len(running))
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self.release(running.pop(future))
+                        yield future.result()
+        finally:
+            # Consumer failed or stopped the run, pool shutdown waited for the running jobs
+            for load in running.values():
+                self.release(load)
+
+    @staticmethod
+    def fill(queues, pending, load_of):
+        """Estimate loads of the next pending jobs until the queues hold
+        SCHEDULER_LOOKAHEAD jobs, returns the number of queued jobs"""
+        queued = len(queues['cpu']) + len(queues['io'])
+        for job in islice(pending, max(SCHEDULER_LOOKAHEAD - queued, 0)):
+            load = load_of(job)
+            queues['io' if load.kind == 'io' else 'cpu'].append((job, load))
+        return len(queues['cpu']) + len(queues['io'])
+
+    def admit(self, queue, busy):
+        """Take jobs from the head of the queue which fit free slots and memory"""
+        started = []
+        skipped = []
+        held = 0
+        while queue and len(skipped) < SCHEDULER_LOOKAHEAD and self.has_slot(queue[0][1]):
+            job, load = queue.popleft()
+            idle = not busy and not started and not held
+            if not idle and self.reserved + held + load.memory > self.memory:
+                # Memory is kept for the first job of the queue which does not fit
+                held = held or load.memory
+                skipped.append((job, load))
+                continue
+            self.take(load)
+            started.append((job, load))
+
+        # Skipped jobs stay at the head of the queue in their order
+        queue.extendleft(reversed(skipped))
+        return started
+
+    def has_slot(self, load):
+        """Check if there is a free slot for the job"""
+        if load.kind == 'io':
+            return self.io_running < self.io_slots
+        return self.used_slots == 0 or self.used_slots + load.slots <= self.cpu_slots
+
+    def take(self, load):
+        """Reserve resources of the started job"""
+        if load.kind == 'io':
+            self.io_running += 1
+        else:
+            self.used_slots += load.slots
+        self.reserved += load.memory
+        self.peak_memory = max(self.peak_memory, self.reserved)
+
+    def release(self, load):
+        """Free resources of the finished job"""
+        if load.kind == 'io':
+            self.io_running -= 1
+        else:
+            self.used_slots -= load.slots
+        self.reserved -= load.memory
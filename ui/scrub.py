@@ -0,0 +1,74 @@
+"""Scrub strip - waveform or thumbnail strip above the player slider.
+Click or drag on the strip seeks the player, played part is marked by a line"""
+
+from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtGui import QPixmap, QPainter, QPen
+from PyQt6.QtWidgets import QLabel
+
+from ui.constants import WAVEFORM_SIZE
+
+
+class ScrubStrip(QLabel):
+    """Strip image stretched to the player width, emits position in ms on click"""
+    position_picked = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFixedHeight(WAVEFORM_SIZE[1])
+        self.setScaledContents(True)
+        self.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.setToolTip("Click or drag to seek")
+        self.duration = 0
+        self.position = 0
+        self.hide()
+
+    def set_strip(self, image):
+        """Show strip QImage"""
+        self.setPixmap(QPixmap.fromImage(image))
+        self.show()
+
+    def clear_strip(self):
+        """Hide strip until the next file is loaded"""
+        self.clear()
+        self.duration = 0
+        self.position = 0
+        self.hide()
+
+    def set_duration(self, duration):
+        """Duration of the media in ms"""
+        self.duration = max(duration, 0)
+        self.update()
+
+    def set_position(self, position):
+        """Played position in ms"""
+        self.position = position
+        self.update()
+
+    def position_at(self, x):
+        """Media position under widget x"""
+        fraction = min(max(x / self.width(), 0), 1) if self.width() else 0
+        return round(self.duration * fraction)
+
+    def mousePressEvent(self, event):  # pylint: disable=invalid-name
+        """Click seeks"""
+        self.pick(event.position().x())
+
+    def mouseMoveEvent(self, event):  # pylint: disable=invalid-name
+        """Drag seeks"""
+        self.pick(event.position().x())
+
+    def pick(self, x):
+        """Seek to widget x if duration is known"""
+        if self.duration:
+            self.set_position(self.position_at(x))
+            self.position_picked.emit(self.position)
+
+    def paintEvent(self, event):  # pylint: disable=invalid-name
+        """Strip with the position line"""
+        super().paintEvent(event)
+        if not self.duration:
+            return
+        x = round(self.width() * min(self.position / self.duration, 1))
+        painter = QPainter(self)
+        painter.setPen(QPen(Qt.GlobalColor.red, 2))
+        painter.drawLine(x, 0, x, self.height())
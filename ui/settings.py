@@ -0,0 +1,36 @@
+"""Settings - user choices kept between runs with QSettings"""
+
+from PyQt6.QtCore import QSettings
+
+from ui.constants import (SETTINGS_ORGANIZATION, SETTINGS_APPLICATION, SETTINGS_IMAGE_PROFILE,
+                          SETTINGS_FSYNC_POLICY, IMAGE_PROFILES, IMAGE_PROFILE_DEFAULT,
+                          FSYNC_POLICIES, FSYNC_POLICY_BATCH_DEFAULT)
+
+
+def app_settings():
+    """QSettings of the application"""
+    return QSettings(SETTINGS_ORGANIZATION, SETTINGS_APPLICATION)
+
+
+def load_image_profile():
+    """Saved image profile, unknown values give the default profile"""
+    profile = app_settings().value(SETTINGS_IMAGE_PROFILE, IMAGE_PROFILE_DEFAULT)
+    return profile if profile in IMAGE_PROFILES else IMAGE_PROFILE_DEFAULT
+
+
+def save_image_profile(profile):
+    """Save image profile chosen by user"""
+    if profile in IMAGE_PROFILES:
+        app_settings().setValue(SETTINGS_IMAGE_PROFILE, profile)
+
+
+def load_fsync_policy():
+    """Saved fsync policy of batch runs, unknown values give the default policy"""
+    policy = app_settings().value(SETTINGS_FSYNC_POLICY, FSYNC_POLICY_BATCH_DEFAULT)
+    return policy if policy in FSYNC_POLICIES else FSYNC_POLICY_BATCH_DEFAULT
+
+
+def save_fsync_policy(policy):
+    """Save fsync policy chosen by user"""
+    if policy in FSYNC_POLICIES:
+        app_settings().setValue(SETTINGS_FSYNC_POLICY, policy)
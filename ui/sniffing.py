@@ -0,0 +1,231 @@
+"""Sniffing - detect file format by content (magic bytes) instead of extension"""
+
+import os
+import csv
+import json
+import re
+import codecs
+
+from ui.cache import LRUCache
+from ui.compression import compression_of, open_binary, COMPRESSION_ERRORS
+from ui.constants import SNIFF_BYTES, SNIFF_CACHE_SIZE, COMPRESSION_EXTENSIONS
+
+
+# Extensions which are the same format
+EQUIVALENT_EXTENSIONS = {
+    '.jpeg': '.jpg',
+    '.tif': '.tiff',
+    '.feather': '.arrow',
+    '.ndjson': '.jsonl',
+}
+
+# (prefix, extension) of formats with magic bytes at the start of the file
+MAGIC_PREFIXES = (
+    (b'\x89PNG\r\n\x1a\n', '.png'),
+    (b'\xff\xd8\xff', '.jpg'),
+    (b'GIF87a', '.gif'),
+    (b'GIF89a', '.gif'),
+    (b'II*\x00', '.tiff'),
+    (b'MM\x00*', '.tiff'),
+    (b'\xff\x0a', '.jxl'),
+    (b'\x00\x00\x00\x0cJXL \r\n\x87\n', '.jxl'),
+    (b'PAR1', '.parquet'),
+    (b'ARROW1', '.arrow'),
+    (b'FEA1', '.feather'),
+)
+
+# Formats of RIFF containers by the form type
+RIFF_FORMATS = {
+    b'WEBP': '.webp',
+    b'WAVE': '.wav',
+}
+
+# MPEG audio frame header: kbit/s by bitrate index for (MPEG-1, layer) and
+# (MPEG-2/2.5, layer), Hz by sample rate index for version bits 0 (2.5), 2 (2), 3 (1)
+MPEG_BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+MPEG_SAMPLE_RATES = {0: (11025, 12000, 8000), 2: (22050, 24000, 16000), 3: (44100, 48000, 32000)}
+
+# Text formats, one can be saved with the extension of another
+TEXT_EXTENSIONS = ('.txt', '.csv', '.json', '.jsonl', '.ndjson')
+
+
+class FormatSniffer():
+    """Detect format from the first SNIFF_BYTES of the file.
+    Compressed file named by its codec (data.csv.gz) is sniffed by decompressed head.
+    Results are cached per file and invalidated by size/mtime change"""
+
+    def __init__(self, cache_size=SNIFF_CACHE_SIZE):
+        self.cache = LRUCache(cache_size)
+
+    def sniff(self, path):
+        """Extension of the detected format or None if content is unknown"""
+        try:
+            stat = os.stat(path)
+        except (OSError, TypeError, ValueError):
+            return None
+
+        key = os.path.abspath(path)
+        cached = self.cache.get(key)
+        if cached and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+            return cached[2]
+
+        try:
+            with open(path, 'rb') as file:
+                head = file.read(SNIFF_BYTES)
+        except OSError:
+            return None
+
+        result = self.sniff_bytes(head)
+        if result in COMPRESSION_EXTENSIONS and compression_of(path) == result:
+            result = self.sniff_compressed(path, result)
+        self.cache.put(key, (stat.st_size, stat.st_mtime_ns, result))
+        return result
+
+    def sniff_compressed(self, path, codec):
+        """Format of the decompressed content, only the head is decompressed"""
+        try:
+            with open_binary(path, codec=codec) as file:
+                head = file.read(SNIFF_BYTES)
+        except (ValueError,) + COMPRESSION_ERRORS:
+            return None
+        return self.sniff_bytes(head)
+
+    def sniff_bytes(self, head):
+        """Detect format from the first bytes of the file"""
+        return self.sniff_binary(head) or self.sniff_compression(head) or self.sniff_text(head)
+
+    @staticmethod
+    def sniff_binary(head):
+        """Magic bytes of images, media containers and columnar files"""
+        for prefix, ext in MAGIC_PREFIXES:
+            if head.startswith(prefix):
+                return ext
+        if head[:4] == b'RIFF':
+            return RIFF_FORMATS.get(head[8:12])
+        if head[4:8] == b'ftyp':
+            # ISO media files, AVIF is told by the major brand
+            return '.avif' if head[8:12] in (b'avif', b'avis') else '.mp4'
+        if head.startswith(b'ID3'):
+            return '.mp3'
+        # MP3 without a tag: two frames one after another. One header is not enough,
+        # UTF-16 BOM (FF FE) and the first char are a valid header too
+        length = FormatSniffer.mpeg_frame_length(head)
+        if length and FormatSniffer.mpeg_frame_length(head[length:]):
+            return '.mp3'
+        return None
+
+    @staticmethod
+    def mpeg_frame_length(head):
+        """Length in bytes of the MPEG audio frame at the start of head,
+        None if there is no valid frame header"""
+        if len(head) < 4 or head[0] != 0xFF or head[1] & 0xE0 != 0xE0:
+            return None
+        version, layer = (head[1] >> 3) & 3, 4 - ((head[1] >> 1) & 3)
+        bitrate_index, rate_index, padding = head[2] >> 4, (head[2] >> 2) & 3, (head[2] >> 1) & 1
+        # Reserved version, layer, sample rate, and bad or free bitrate
+        if version == 1 or layer == 4 or rate_index == 3 or bitrate_index in (0, 15):
+            return None
+
+        bitrate = MPEG_BITRATES[(version == 3, layer)][bitrate_index] * 1000
+        sample_rate = MPEG_SAMPLE_RATES[version][rate_index]
+        if layer == 1:
+            return (12 * bitrate // sample_rate + padding) * 4
+        if layer == 3 and version != 3:
+            return 72 * bitrate // sample_rate + padding
+        return 144 * bitrate // sample_rate + padding
+
+    @staticmethod
+    def sniff_compression(head):
+        """Magic bytes of gzip/bz2/xz/zstd streams"""
+        result = None
+        if head.startswith(b'\x1f\x8b'):
+            result = '.gz'
+        elif head[:3] == b'BZh' and head[4:10] in (b'1AY&SY', b'\x17rE8P\x90'):
+            result = '.bz2'
+        elif head.startswith(b'\xfd7zXZ\x00'):
+            result = '.xz'
+        elif head.startswith(b'\x28\xb5\x2f\xfd'):
+            result = '.zst'
+        return result
+
+    @staticmethod
+    def sniff_text(head):
+        """JSON/CSV/TXT detection for utf-8 text"""
+        if not head or b'\x00' in head:
+            return None
+
+        try:
+            # Incremental decoder does not fail on the cut multibyte char at the end
+            text = codecs.getincrementaldecoder('utf-8-sig')().decode(head)
+        except UnicodeDecodeError:
+            return None
+
+        stripped = text.lstrip()
+        lines = [line for line in stripped.splitlines() if line.strip()]
+        if len(head) >= SNIFF_BYTES and len(lines) > 1:
+            # Last line can be cut in the middle
+            lines = lines[:-1]
+
+        if stripped[:1] in ('{', '['):
+            if FormatSniffer.is_json_lines(lines):
+                return '.jsonl'
+            if FormatSniffer.is_json_head(stripped, len(head) < SNIFF_BYTES):
+                return '.json'
+        if len(lines) > 1:
+            try:
+                dialect = csv.Sniffer().sniff('\n'.join(lines), delimiters=',;\t')
+                widths = {len(row) for row in csv.reader(lines, dialect)}
+                if len(widths) == 1 and widths.pop() > 1:
+                    return '.csv'
+            except csv.Error:
+                pass
+        return '.txt'
+
+    @staticmethod
+    def is_json_lines(lines):
+        """At least two lines and every one is a complete json value"""
+        if len(lines) < 2:
+            return False
+        try:
+            for line in lines:
+                json.loads(line)
+        except ValueError:
+            return False
+        return True
+
+    @staticmethod
+    def is_json_head(text, complete):
+        """Check if text is a json document, or its beginning when it is not complete"""
+        try:
+            json.loads(text)
+        except json.JSONDecodeError as e:
+            # Head of a longer document fails only where it is cut: in its last
+            # number or literal, or in the string which is not closed before the end
+            return not complete and (re.fullmatch(r'[\w.+-]*\s*', text[e.pos:]) is not None
+                                     or e.msg.startswith(('Unterminated string', 'Invalid \\uXXXX')))
+        return True
+
+    def detect(self, path, ext):
+        """Resolve format of the file named with extension ext.
+        Extension is trusted if content is unknown or it is the same format"""
+        sniffed = self.sniff(path)
+        if not sniffed:
+            return ext
+
+        ext_norm = EQUIVALENT_EXTENSIONS.get(ext, ext)
+        if sniffed == ext_norm:
+            return ext
+        # CSV/TXT/JSON detection by content is only a guess, text extensions are trusted
+        if ext in TEXT_EXTENSIONS and sniffed in ('.txt', '.csv'):
+            return ext
+        # One line JSON Lines file is a json document too
+        if ext_norm == '.jsonl' and sniffed == '.json':
+            return ext
+        return sniffed
@@ -0,0 +1,251 @@
+"""Sync - mirror source folder into converted output folder.
+Persistent manifest is used to convert only new or modified files"""
+
+import os
+import json
+from pathlib import Path
+
+from ui.atomic import remove_temps
+from ui.batch import BatchJob, BatchRunner
+from ui.fileio import file_hash
+from ui.journal import JobJournal
+from ui.constants import SYNC_MANIFEST_NAME, SYNC_MANIFEST_VERSION, SYNC_JOURNAL_NAME
+
+
+class FolderSync():
+    """Mirror source_dir into output_dir.
+
+    targets - {source extension: output extension}, files with other
+    extensions are ignored. Files which would have the same output
+    (a.png and a.jpg -> a.webp) keep their extension: a.png.webp. Manifest entries keep size, mtime, content hash,
+    options and output path of every converted file"""
+
+    def __init__(self, source_dir, output_dir, targets, runner=None, options=None):
+        self.source_dir = Path(source_dir).resolve()
+        self.output_dir = Path(output_dir).resolve()
+        self.targets = {ext.lower(): out.lower() for ext, out in targets.items()}
+        self.runner = runner or BatchRunner()
+        self.options = options or {}
+
+        self.manifest_path = self.output_dir / SYNC_MANIFEST_NAME
+        self.journal_path = self.output_dir / SYNC_JOURNAL_NAME
+        self.manifest = {}
+
+    def load_manifest(self):
+        """Load manifest from output folder, broken manifest means full sync"""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            data = {}
+
+        if isinstance(data, dict) and data.get('version') == SYNC_MANIFEST_VERSION:
+            self.manifest = data.get('files', {})
+        else:
+            self.manifest = {}
+        return self.manifest
+
+    def save_manifest(self):
+        """Save manifest next to converted files"""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_name(self.manifest_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump({'version': SYNC_MANIFEST_VERSION, 'files': self.manifest}, file)
+        os.replace(tmp_path, self.manifest_path)
+
+    def scan(self):
+        """Yield (relative posix path, stat) for every file in source folder"""
+        dirs = [self.source_dir]
+        while dirs:
+            current = dirs.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if Path(entry.path) != self.output_dir:
+                                dirs.append(entry.path)
+                        elif entry.is_file():
+                            rel = Path(entry.path).relative_to(self.source_dir).as_posix()
+                            yield rel, entry.stat()
+            except OSError:
+                continue
+
+    def output_path(self, rel, target, collides=False):
+        """Path of converted file in output folder, colliding files keep source extension"""
+        if collides:
+            return self.output_dir / (rel + target)
+        return self.output_dir / Path(rel).with_suffix(target)
+
+    def colliding(self, rels):
+        """Mapped relative paths which have the same output path as another file"""
+        outputs = {}
+        for rel in rels:
+            target = self.target_for(rel)
+            if target:
+                outputs.setdefault(Path(rel).with_suffix(target), []).append(rel)
+        return {rel for group in outputs.values() if len(group) > 1 for rel in group}
+
+    def siblings(self, rel):
+        """Relative paths of source files with the same name as rel but another extension"""
+        folder = Path(rel).parent
+        try:
+            names = os.listdir(self.source_dir / folder)
+        except OSError:
+            return []
+        return [(folder / name).as_posix() for name in names if Path(name).stem == Path(rel).stem]
+
+    def job_options(self, source_ext, target):
+        """Options saved to the manifest, changing them forces reconvertation"""
+        return {'source_ext': source_ext, 'target': target, **self.options}
+
+    def target_for(self, rel):
+        """Output extension for the relative path or None if file is not mapped"""
+        source_ext = os.path.splitext(rel)[1].lower()
+        target = self.targets.get(source_ext)
+        if not target or target == source_ext:
+            return None
+        return target
+
+    def plan_file(self, rel, stat, target, collides=False):
+        """Create job for one file or return None if it is unchanged"""
+        source_ext = os.path.splitext(rel)[1].lower()
+        inp = self.source_dir / rel
+        out = self.output_path(rel, target, collides)
+        options = self.job_options(source_ext, target)
+        entry = self.manifest.get(rel)
+
+        if entry and entry.get('options') == options and out.exists():
+            if entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+                return None
+            digest = file_hash(inp)
+            if digest == entry['hash']:
+                # Touched but not modified, only stat values are updated
+                entry['size'] = stat.st_size
+                entry['mtime_ns'] = stat.st_mtime_ns
+                return None
+        else:
+            digest = file_hash(inp)
+
+        job = BatchJob(inp, out, options)
+        job.rel = rel
+        job.manifest_entry = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'hash': digest,
+            'options': options,
+            'output': Path(out).relative_to(self.output_dir).as_posix(),
+        }
+        return job
+
+    def plan(self):
+        """Compare source folder with manifest.
+        Returns (jobs to run, removed relative paths, unchanged files count)"""
+        jobs = []
+        seen = set()
+        unchanged = 0
+
+        files = list(self.scan())
+        collisions = self.colliding(rel for rel, _ in files)
+        for rel, stat in files:
+            target = self.target_for(rel)
+            if not target:
+                continue
+
+            seen.add(rel)
+            job = self.plan_file(rel, stat, target, rel in collisions)
+            if job:
+                jobs.append(job)
+            else:
+                unchanged += 1
+
+        removed = [rel for rel in self.manifest if rel not in seen]
+        return jobs, removed, unchanged
+
+    def remove_output(self, rel_output):
+        """Remove converted file and empty folders left after it"""
+        out = self.output_dir / rel_output
+        try:
+            out.unlink()
+        except FileNotFoundError:
+            pass
+
+        parent = out.parent
+        while parent != self.output_dir and self.output_dir in parent.parents:
+            try:
+                parent.rmdir()
+            except OSError:
+                break
+            parent = parent.parent
+
+    def record_job(self, job):
+        """Save finished job to manifest"""
+        old_entry = self.manifest.pop(job.rel, None)
+        if job.status != 'done':
+            return
+
+        new_entry = job.manifest_entry
+        if old_entry and old_entry.get('output') != new_entry['output']:
+            self.remove_output(old_entry['output'])
+        self.manifest[job.rel] = new_entry
+
+    def run_jobs(self, jobs, removed, unchanged):
+        """Remove outputs of deleted files, run jobs and save manifest"""
+        removed_count = 0
+        for rel in removed:
+            entry = self.manifest.pop(rel, None)
+            if entry:
+                self.remove_output(entry['output'])
+                removed_count += 1
+
+        # Temporary outputs of a killed run are never renamed to the outputs
+        for folder in {os.path.dirname(job.out) for job in jobs}:
+            remove_temps(folder)
+
+        # Jobs are journaled one by one, manifest is saved only at the end of the run
+        try:
+            with JobJournal(self.journal_path) as journal:
+                self.runner.run(jobs, on_done=self.record_job, journal=journal)
+        finally:
+            self.save_manifest()
+
+        failed = [(job.inp, job.error) for job in jobs if job.status != 'done']
+        resumed = sum(1 for job in jobs if job.resumed)
+        return {
+            'converted': len(jobs) - len(failed) - resumed,
+            'resumed': resumed,
+            'removed': removed_count,
+            'unchanged': unchanged,
+            'failed': failed,
+        }
+
+    def run(self):
+        """Sync folders. Returns summary dict"""
+        self.load_manifest()
+        jobs, removed, unchanged = self.plan()
+        return self.run_jobs(jobs, removed, unchanged)
+
+    def sync_paths(self, rels, removed=()):
+        """Sync only given relative paths without scanning the whole folder.
+        Manifest must be loaded by run() or load_manifest() before"""
+        jobs = []
+        removed = list(removed)
+        unchanged = 0
+
+        collisions = self.colliding({sibling for rel in rels for sibling in self.siblings(rel)})
+        for rel in rels:
+            target = self.target_for(rel)
+            if not target:
+                continue
+            try:
+                stat = (self.source_dir / rel).stat()
+            except FileNotFoundError:
+                removed.append(rel)
+                continue
+
+            job = self.plan_file(rel, stat, target, rel in collisions)
+            if job:
+                jobs.append(job)
+            else:
+                unchanged += 1
+
+        return self.run_jobs(jobs, removed, unchanged)
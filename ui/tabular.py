@@ -0,0 +1,221 @@
+"""Tabular - parquet and arrow IPC (feather) files as sources and targets.
+Data goes through pyarrow record batches and is written one row group at a
+time, so csv/parquet/arrow convertations keep memory bounded"""
+
+import csv
+from contextlib import contextmanager, nullcontext
+
+from ui.codec import json_codec
+from ui.compression import compression_of, open_binary
+from ui.fileio import load_json, iter_json_lines, require_objects, chunked, open_text_output
+from ui.parallel import read_fieldnames
+from ui.constants import TABULAR_ROW_GROUP_ROWS, PARQUET_COMPRESSION, JSON_LINES_EXTENSIONS
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    from pyarrow import feather
+except ImportError:
+    pa = None
+
+# Sources which can be read as record batches
+TABULAR_SOURCES = ('.csv', '.json', '.jsonl', '.ndjson', '.parquet', '.arrow', '.feather')
+# Targets which can be written from record batches
+TABULAR_TARGETS = ('.csv', '.json', '.jsonl', '.ndjson', '.txt', '.parquet', '.arrow', '.feather')
+
+
+def tabular_available():
+    """Check if pyarrow is installed"""
+    return pa is not None
+
+
+@contextmanager
+def open_batches(path, ext):
+    """(schema, iterator of record batches) for csv/json/parquet/arrow file"""
+    if ext == '.csv':
+        # pyarrow drops BOM of the header, csv module has to do the same
+        fieldnames = read_fieldnames(path, encoding='utf-8-sig') or []
+        # Compressed csv is decompressed by python stream, pyarrow has no xz
+        stream = open_binary(path) if compression_of(path) else nullcontext(path)
+        with stream as source, pa_csv.open_csv(
+                source,
+                parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+                convert_options=pa_csv.ConvertOptions(
+                    column_types={name: pa.string() for name in fieldnames},
+                    strings_can_be_null=False, quoted_strings_can_be_null=False)) as reader:
+            yield reader.schema, reader
+
+    elif ext == '.json':
+        data = load_json(path)
+        if not isinstance(data, list):
+            raise ValueError("JSON must be a list of objects")
+        schema = rows_schema(chunked(require_objects(data), TABULAR_ROW_GROUP_ROWS))
+        yield schema, rows_batches(schema, data)
+
+    elif ext in JSON_LINES_EXTENSIONS:
+        # Two passes over the file: types of all rows first, then the batches
+        schema = rows_schema(chunked(require_objects(iter_json_lines(path)),
+                                     TABULAR_ROW_GROUP_ROWS))
+        yield schema, rows_batches(schema, iter_json_lines(path))
+
+    elif ext == '.parquet':
+        parquet_file = pq.ParquetFile(path, memory_map=True)
+        try:
+            yield (parquet_file.schema_arrow,
+                   parquet_file.iter_batches(batch_size=TABULAR_ROW_GROUP_ROWS))
+        finally:
+            parquet_file.close()
+
+    else:
+        with pa.memory_map(str(path)) as source:
+            try:
+                reader = pa.ipc.open_file(source)
+                batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+            except pa.ArrowInvalid:
+                # Feather v1 files are not arrow IPC files
+                table = feather.read_table(source)
+                reader, batches = table, table.to_batches(max_chunksize=TABULAR_ROW_GROUP_ROWS)
+            yield reader.schema, batches
+
+
+def rows_schema(chunks):
+    """Schema of json objects: columns in order of appearance, types merged over all chunks"""
+    schema = pa.schema([])
+    for rows in chunks:
+        columns = dict.fromkeys(key for row in rows for key in row)
+        chunk_schema = pa.Table.from_pydict(
+            {key: [row.get(key) for row in rows] for key in columns}).schema
+        schema = pa.unify_schemas([schema, chunk_schema], promote_options='permissive')
+    return schema
+
+
+def rows_batches(schema, rows):
+    """Record batches of json objects, missing keys are nulls"""
+    for chunk in chunked(rows, TABULAR_ROW_GROUP_ROWS):
+        yield pa.RecordBatch.from_pylist(chunk, schema=schema)
+
+
+def row_groups(schema, batches, rows):
+    """Join small batches to tables of about rows rows"""
+    pending, count = [], 0
+    for batch in batches:
+        pending.append(batch)
+        count += batch.num_rows
+        if count >= rows:
+            yield pa.Table.from_batches(pending, schema)
+            pending, count = [], 0
+    if pending:
+        yield pa.Table.from_batches(pending, schema)
+
+
+def json_safe(batch):
+    """Batch with dates, decimals and binary values cast to strings for json"""
+    columns = []
+    for column in batch.columns:
+        kind = column.type
+        if (pa.types.is_temporal(kind) or pa.types.is_decimal(kind)
+                or pa.types.is_binary(kind) or pa.types.is_dictionary(kind)):
+            column = pc.cast(column, pa.string())
+        columns.append(column)
+    return pa.RecordBatch.from_arrays(columns, names=batch.schema.names)
+
+
+def text_value(value):
+    """Value of the txt file cell"""
+    return '' if value is None else str(value)
+
+
+def write_parquet(schema, batches, out, _codec, _threads):
+    """Parquet file, one row group per TABULAR_ROW_GROUP_ROWS rows"""
+    with pq.ParquetWriter(out, schema, compression=PARQUET_COMPRESSION) as writer:
+        for table in row_groups(schema, batches, TABULAR_ROW_GROUP_ROWS):
+            writer.write_table(table, row_group_size=TABULAR_ROW_GROUP_ROWS)
+
+
+def write_ipc(schema, batches, out, _codec, _threads):
+    """Arrow IPC file (feather v2), readable with zero copy memory map"""
+    with pa.ipc.new_file(str(out), schema) as writer:
+        for table in row_groups(schema, batches, TABULAR_ROW_GROUP_ROWS):
+            writer.write_table(table, max_chunksize=TABULAR_ROW_GROUP_ROWS)
+
+
+def write_csv(schema, batches, out, _codec, threads):
+    """Csv file the same as json -> csv writes"""
+    with open_text_output(out, '', threads) as out_file:
+        writer = csv.writer(out_file)
+        writer.writerow(schema.names)
+        for batch in batches:
+            writer.writerows(zip(*(column.to_pylist() for column in batch.columns)))
+
+
+def write_txt(schema, batches, out, _codec, threads):
+    """Tab separated txt file the same as csv -> txt writes"""
+    with open_text_output(out, threads=threads) as out_file:
+        out_file.write('\t'.join(schema.names) + '\n')
+        for batch in batches:
+            for row in zip(*(column.to_pylist() for column in batch.columns)):
+                out_file.write('\t'.join(map(text_value, row)) + '\n')
+
+
+def write_json(_schema, batches, out, codec, threads):
+    """Json list of objects the same as csv -> json writes"""
+    with open_text_output(out, threads=threads) as out_file:
+        first = True
+        for batch in batches:
+            if not batch.num_rows:
+                continue
+            # Items of the dumped list without '[\n' and '\n]'
+            items = codec.dumps(json_safe(batch).to_pylist())[2:-2]
+            out_file.write(('[\n' if first else ',\n') + items)
+            first = False
+        out_file.write('[]' if first else '\n]')
+
+
+def write_json_lines(_schema, batches, out, codec, threads):
+    """JSON Lines file, one object per row"""
+    with open_text_output(out, threads=threads) as out_file:
+        for batch in batches:
+            out_file.writelines(codec.dumps_line(row) + '\n'
+                                for row in json_safe(batch).to_pylist())
+
+
+# output extension -> writer(schema, batches, out, codec, compress threads)
+BATCH_WRITERS = {
+    '.jsonl': write_json_lines,
+    '.ndjson': write_json_lines,
+    '.parquet': write_parquet,
+    '.arrow': write_ipc,
+    '.feather': write_ipc,
+    '.csv': write_csv,
+    '.txt': write_txt,
+    '.json': write_json,
+}
+
+
+def write_batches(schema, batches, out, out_ext, codec=json_codec, threads=1):  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    """Write record batches to csv/json/txt/parquet/arrow file"""
+    writer = BATCH_WRITERS.get(out_ext)
+    if not writer:
+        raise ValueError(f"Convertation to {out_ext} is not supported")
+    writer(schema, batches, out, codec, threads)
+
+
+def write_tabular(inp, out, inp_ext, out_ext, codec=json_codec, threads=1):  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    """Convert tabular file inp to out through record batches"""
+    with open_batches(inp, inp_ext) as (schema, batches):
+        write_batches(schema, batches, out, out_ext, codec, threads)
+
+
+def preview_text(path, ext, max_rows):
+    """First max_rows rows of parquet/arrow file as tab separated text"""
+    with open_batches(path, ext) as (schema, batches):
+        lines = ['\t'.join(f"{field.name} ({field.type})" for field in schema)]
+        for batch in batches:
+            batch = batch.slice(0, max_rows - len(lines) + 1)
+            lines.extend('\t'.join(map(text_value, row))
+                         for row in zip(*(column.to_pylist() for column in batch.columns)))
+            if len(lines) > max_rows:
+                break
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,70 @@
+"""Throttle - fewer GUI updates for signals which fire many times per second.
+Coalescer shows only the latest value at a fixed rate, Debouncer applies
+the latest value once the values stop coming"""
+
+from PyQt6.QtCore import QObject, QTimer
+
+
+class Coalescer(QObject):
+    """Latest pushed value is applied at most once per interval.
+    Timer runs only while values come, the first tick without a new value stops it"""
+
+    def __init__(self, interval_ms, apply, parent=None):
+        super().__init__(parent)
+        self.apply = apply
+        self.pending = None
+        self.has_pending = False
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.on_tick)
+
+    def push(self, value):
+        """Remember value, it replaces the one which is not applied yet"""
+        self.pending = value
+        self.has_pending = True
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def on_tick(self):
+        """Apply the latest value or sleep until the next push"""
+        if not self.has_pending:
+            self.timer.stop()
+            return
+        self.flush()
+
+    def flush(self):
+        """Apply the latest value now"""
+        if self.has_pending:
+            value = self.pending
+            self.cancel_pending()
+            self.apply(value)
+
+    def cancel_pending(self):
+        """Forget the value which is not applied yet"""
+        self.pending = None
+        self.has_pending = False
+
+    def cancel(self):
+        """Forget the pending value and stop the timer"""
+        self.cancel_pending()
+        self.timer.stop()
+
+
+class Debouncer(Coalescer):
+    """Latest pushed value is applied once no value came for delay"""
+
+    def __init__(self, delay_ms, apply, parent=None):
+        super().__init__(delay_ms, apply, parent)
+        self.timer.setSingleShot(True)
+
+    def push(self, value):
+        """Remember value and start waiting again"""
+        self.pending = value
+        self.has_pending = True
+        self.timer.start()
+
+    def flush(self):
+        """Apply the latest value now, used when the drag ends"""
+        self.timer.stop()
+        super().flush()
@@ -0,0 +1,94 @@
+"""Tiles - image pyramid for the zoomable viewer.
+Level 0 is the image itself, every next level is two times smaller. Tiles
+are decoded only when the viewer asks for them and the latest ones are kept
+in a bounded cache. Coarse levels which fit PYRAMID_LEVEL_PIXELS are reduced
+once as a whole, so zooming out of a huge image does not scan it for every tile"""
+
+import math
+from collections import OrderedDict
+
+from ui.constants import TILE_SIZE, TILE_CACHE_SIZE, PYRAMID_LEVEL_PIXELS
+from ui.modes import prepare_image
+
+# Modes Image.reduce works with, every other mode is converted first
+REDUCE_MODES = ('L', 'LA', 'RGB', 'RGBA')
+
+
+class TilePyramid():
+    """Tiles of the image at zoom 1, 1/2, 1/4 ... until the level fits one tile"""
+
+    def __init__(self, img, tile_size=TILE_SIZE, cache_size=TILE_CACHE_SIZE,
+                 level_pixels=PYRAMID_LEVEL_PIXELS):
+        self.img = img
+        self.tile_size = tile_size
+        self.cache_size = cache_size
+        self.level_pixels = level_pixels
+        self.levels = max(math.ceil(math.log2(max(img.size) / tile_size)), 0) + 1
+        self.cache = OrderedDict()
+        self.level_images = {}
+
+    @property
+    def size(self):
+        """Size of level 0"""
+        return self.img.size
+
+    def level_size(self, level):
+        """Size of the image at the level"""
+        factor = 2 ** level
+        return math.ceil(self.img.width / factor), math.ceil(self.img.height / factor)
+
+    def grid(self, level):
+        """Number of tile columns and rows of the level"""
+        width, height = self.level_size(level)
+        return math.ceil(width / self.tile_size), math.ceil(height / self.tile_size)
+
+    def level_for_scale(self, scale):
+        """Coarsest level which still has at least one pixel per screen pixel"""
+        if scale >= 1:
+            return 0
+        return min(int(math.log2(1 / scale)), self.levels - 1)
+
+    def is_coarse(self, level):
+        """Check if the whole level is small enough to be kept"""
+        width, height = self.level_size(level)
+        return level > 0 and width * height <= self.level_pixels
+
+    def level_image(self, level):
+        """Whole coarse level, made from the finer coarse level when there is one"""
+        if level not in self.level_images:
+            if self.is_coarse(level - 1):
+                finer = self.level_image(level - 1)
+                self.level_images[level] = finer.reduce(2)
+            else:
+                self.level_images[level] = prepare_image(self.img, REDUCE_MODES).reduce(2 ** level)
+        return self.level_images[level]
+
+    def tile(self, level, col, row):
+        """Tile image, decoded at the first request and then taken from the cache"""
+        key = (level, col, row)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+
+        side = self.tile_size
+        if self.is_coarse(level):
+            source, factor = self.level_image(level), 1
+        else:
+            source, factor = self.img, 2 ** level
+        width, height = source.size
+        box = (col * side * factor, row * side * factor,
+               min((col + 1) * side * factor, width), min((row + 1) * side * factor, height))
+        tile = source.crop(box)
+        if factor > 1:
+            tile = prepare_image(tile, REDUCE_MODES).reduce(factor)
+
+        self.cache[key] = tile
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return tile
+
+    def pixel(self, x, y):
+        """Value of the level 0 pixel, None outside of the image"""
+        if 0 <= x < self.img.width and 0 <= y < self.img.height:
+            return self.img.getpixel((x, y))
+        return None
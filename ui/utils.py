@@ -1,11 +1,11 @@
 """Module with all help classes and methods"""
 
 # pylint: disable=protected-access
+# pylint: disable=too-many-lines
 
 import os
-import csv
-import json
 import subprocess
+from functools import partial
 from pathlib import Path
 from PIL import Image, UnidentifiedImageError
 from PIL.ImageQt import ImageQt
@@ -16,8 +16,23 @@ from PyQt6.QtMultimediaWidgets import QVideoWidget
 from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
 from PyQt6.QtWidgets import QPlainTextEdit, QPushButton, QHBoxLayout, QSlider, QLabel, QFileDialog
 
+from ui.converters import FileConverter
+from ui.frames import AnimatedImage
+from ui.modes import prepare_image, cms_available
+from ui.settings import load_image_profile, save_image_profile
+from ui.previews import load_picture, load_document, load_pyramid, load_media_strip
+from ui.viewer import ImageViewerDialog
+from ui.compare import CompareDialog, metrics_text
+from ui.metrics import ImageComparer
+from ui.media import MediaStrips, ffmpeg_available
+from ui.scrub import ScrubStrip
+from ui.pool import PreviewPool
+from ui.throttle import Coalescer, Debouncer
+from ui.instrumentation import INSTRUMENTS
+from ui.workers import PreviewLoader
 from ui.constants import (SUPPORTED_CONVERT_EXTENSIONS_PICTURES, SUPPORTED_CONVERT_EXTENSIONS_FILES,
-                          SUPPORTED_CONVERT_EXTENSIONS_VIDEO_AUDIO, PIC_EXTENSION_MAP)
+                          SUPPORTED_CONVERT_EXTENSIONS_VIDEO_AUDIO, PIC_EXTENSION_MAP,
+                          IMAGE_EFFORT_OPTIONS, PREVIEW_MODES, PLAYER_UI_INTERVAL_MS, SEEK_DEBOUNCE_MS)
 
 
 class Converter():
@@ -37,6 +52,11 @@ class Converter():
         self.converted_output_image = None
         self.converted_output_image_format = None
 
+        self.file_converter = FileConverter(workers=os.cpu_count() or 1,
+                                            compress_threads=os.cpu_count() or 1,
+                                            image_profile=load_image_profile(),
+                                            color_manage=cms_available())
+
     def convert_csv_txt(self, inp):
         """Convertation logic from csv to txt"""
         get_filename = self.get_save_filename(
@@ -44,13 +64,9 @@ class Converter():
         if not get_filename:
             return
 
-        with open(inp, newline='', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            with open(get_filename, 'w', encoding='utf-8') as out_file:
-                out_file.write('\t'.join(reader.fieldnames) + '\n')
-                for row in reader:
-                    out_file.write('\t'.join(row.values()) + '\n')
-            self.main_window.statusBar().showMessage("Finished converting csv to txt")
+        with self.file_converter.atomic_output(get_filename) as tmp:
+            self.file_converter.write_csv_txt(inp, tmp)
+        self.main_window.statusBar().showMessage("Finished converting csv to txt")
 
     def convert_json_txt(self, inp):
         """Convertation logic from json to txt"""
@@ -59,22 +75,8 @@ class Converter():
         if not get_filename:
             return
 
-        with open(inp, 'r', encoding='utf-8') as file:
-            reader = json.load(file)
-            with open(get_filename, 'w', encoding='utf-8') as out_file:
-                if isinstance(reader, list):
-                    for item in reader:
-                        if isinstance(item, dict):
-                            for k, v in item.items():
-                                out_file.write(f"{k}: {v}\n")
-                            out_file.write('\n')
-                        else:
-                            out_file.write(str(item) + '\n\n')
-                elif isinstance(reader, dict):
-                    for k, v in reader.items():
-                        out_file.write(f"{k}: {v}\n")
-                else:
-                    out_file.write(str(reader))
+        with self.file_converter.atomic_output(get_filename) as tmp:
+            self.file_converter.write_json_txt(inp, tmp)
         self.main_window.statusBar().showMessage("Finished converting json to txt")
 
     def convert_csv_json(self, inp):
@@ -84,13 +86,9 @@ class Converter():
         if not get_filename:
             return
 
-        with open(inp, newline='', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            data = list(reader)
-
-        with open(get_filename, 'w', encoding='utf-8') as jsonfile:
-            json.dump(data, jsonfile, ensure_ascii=False, indent=4)
-            self.main_window.statusBar().showMessage("Finished converting csv to json")
+        with self.file_converter.atomic_output(get_filename) as tmp:
+            self.file_converter.write_csv_json(inp, tmp)
+        self.main_window.statusBar().showMessage("Finished converting csv to json")
 
     def convert_json_csv(self, inp):
         """Convertation logic from json to csv"""
@@ -99,20 +97,23 @@ class Converter():
         if not get_filename:
             return
 
-        with open(inp, 'r', encoding='utf-8') as in_file:
-            data = json.load(in_file)
-
-        if not isinstance(data, list):
-            raise ValueError("JSON must be valid")
+        with self.file_converter.atomic_output(get_filename) as tmp:
+            self.file_converter.write_json_csv(inp, tmp)
+        self.main_window.statusBar().showMessage("Finished converting json to csv")
 
-        fieldnames = data[0].keys() if data else []
+    def convert_tabular(self, inp, out_ext):
+        """Convertation logic for parquet/arrow and json lines files"""
+        get_filename = self.get_save_filename(
+            f'untitled{out_ext}', f"Tabular Files (*{out_ext})")
+        if not get_filename:
+            return
 
-        with open(get_filename, 'w', newline='', encoding='utf-8') as out_file:
-            writer = csv.DictWriter(out_file, fieldnames=fieldnames)
-            writer.writeheader()
-            for row in data:
-                writer.writerow(row)
-            self.main_window.statusBar().showMessage("Finished converting json to csv")
+        try:
+            self.file_converter.convert(inp, get_filename)
+        except (ValueError, TypeError) as e:
+            self.main_window.statusBar().showMessage(f"Error: {str(e)}")
+            return
+        self.main_window.statusBar().showMessage(f"Finished converting to {out_ext}")
 
     # pylint: disable=inconsistent-return-statements
     def convert_audio_formats(self, inp, out):
@@ -132,19 +133,17 @@ class Converter():
             msg = f"File with {out} path already exists. Scipping"
             return msg
 
-        command = ['ffmpeg', '-y', '-i', inp, get_filename]
-        # print(f"Command for ffmpeg: {command}")
+        with self.file_converter.atomic_output(get_filename) as tmp:
+            command = self.file_converter.ffmpeg_command(inp, tmp)
+            # print(f"Command for ffmpeg: {command}")
 
-        if ext_out == 'mp4':
-            command += ['-c:a', 'aac']
-
-        result = subprocess.run(
-            command, capture_output=True, text=True, check=True)
-        if result.returncode != 0:
-            self.main_window.statusBar().showMessage(
-                f"FFMPEG ERROR: {result.stderr}")
-            raise RuntimeError(
-                f"Error FFMPEG Failed witd code {result.returncode}")
+            result = subprocess.run(
+                command, capture_output=True, text=True, check=True)
+            if result.returncode != 0:
+                self.main_window.statusBar().showMessage(
+                    f"FFMPEG ERROR: {result.stderr}")
+                raise RuntimeError(
+                    f"Error FFMPEG Failed witd code {result.returncode}")
 
         self.main_window.statusBar().showMessage("Finished ffmpeg")
 
@@ -165,25 +164,28 @@ class Converter():
 
     def _convert_image(self, input_file, target_format):
         """Convertation logic for images"""
-        try:
-            img = Image.open(input_file)
-            clean_format = target_format.lstrip('.').upper()
-            real_format = PIC_EXTENSION_MAP.get(clean_format)
-
-            if not real_format:
-                return self.main_window.statusBar().showMessage(
-                    f"Format {target_format} is not supported")
+        clean_format = target_format.lstrip('.').upper()
+        if not PIC_EXTENSION_MAP.get(clean_format):
+            return self.main_window.statusBar().showMessage(
+                f"Format {target_format} is not supported")
 
-            converted_img = img.convert('RGB') if real_format in (
-                'JPEG', 'JPG', 'WEBP') else img.copy()
+        try:
+            converted_img, real_format = self.file_converter.open_image(
+                input_file, target_format)
 
+            if isinstance(self.converted_output_image, AnimatedImage):
+                self.converted_output_image.close()
             self.converted_output_image = converted_img
             self.converted_output_image_format = real_format
+            if (self.file_converter.max_image_bytes
+                    and not self.file_converter.uses_target_size(converted_img, real_format)):
+                self.main_window.statusBar().showMessage(
+                    "Max size is used only for still JPEG/WebP/AVIF/JPEG XL images")
             return converted_img
 
         except UnidentifiedImageError:
             return self.main_window.statusBar().showMessage("Can not open image file")
-        except OSError as e:
+        except (OSError, ValueError) as e:
             return self.main_window.statusBar().showMessage(str(e))
 
     # pylint: disable=broad-exception-caught
@@ -229,7 +231,7 @@ class Converter():
         f = None
         extension = convtd_out_img_format.lower()
         ext_for_better_quality = extension.upper()
-        ext_filters = "Images (*.png *.jpg *.jpeg *.webp)"
+        ext_filters = "Images (*.png *.jpg *.jpeg *.webp *.gif *.tiff *.avif *.jxl)"
 
         try:
             f, _ = QFileDialog.getSaveFileName(
@@ -242,17 +244,17 @@ class Converter():
             return
 
         try:
-            if ext_for_better_quality in ('JPEG', 'JPG'):
-                convt_out_img.save(f, format=convtd_out_img_format,
-                                   optimize=True, quality=85, progressive=True)
-            elif ext_for_better_quality == 'PNG':
-                convt_out_img.save(f, format=convtd_out_img_format,
-                                   optimize=True, compress_level=8)
-            elif ext_for_better_quality == 'WEBP':
-                convt_out_img.save(f, format=convtd_out_img_format,
-                                   quality=85, lossless=False, method=6)
-            else:
-                convt_out_img.save(f, format=convtd_out_img_format)
+            # Quality is searched on the image decoded by _convert_image, nothing is decoded again
+            if self.file_converter.uses_target_size(convt_out_img, ext_for_better_quality):
+                with self.file_converter.atomic_output(f) as tmp:
+                    quality, size = self.file_converter.save_to_size(
+                        convt_out_img, tmp, ext_for_better_quality)
+                self.main_window.statusBar().showMessage(
+                    f"Successfully saved as: {f} (quality {quality}, {size // 1024} KB)")
+                return
+            with self.file_converter.atomic_output(f) as tmp:
+                convt_out_img.save(tmp, format=convtd_out_img_format,
+                                   **self.file_converter.image_save_options(ext_for_better_quality))
             self.main_window.statusBar().showMessage(
                 f"Successfully saved as: {f}")
         except (FileNotFoundError, PermissionError, OSError, ValueError, TypeError) as e:
@@ -277,8 +279,10 @@ class Converter():
                     and target_format in SUPPORTED_CONVERT_EXTENSIONS_PICTURES):
                 self._convert_image(input_file, target_format)
 
+            # Parquet/arrow pairs are unsupported without pyarrow
             elif (ext_format in SUPPORTED_CONVERT_EXTENSIONS_FILES
-                  and target_format in SUPPORTED_CONVERT_EXTENSIONS_FILES):
+                  and target_format in SUPPORTED_CONVERT_EXTENSIONS_FILES
+                  and self.file_converter.can_convert(ext_format, target_format)):
                 self.side_funcs._convert_files(input_file, target_format)
 
             elif (ext_format in SUPPORTED_CONVERT_EXTENSIONS_VIDEO_AUDIO
@@ -298,6 +302,7 @@ class Converter():
 
 
 # pylint: disable=attribute-defined-outside-init
+# pylint: disable=too-many-instance-attributes,too-many-public-methods
 class Previewer:
     """Previewer class logic"""
 
@@ -310,6 +315,7 @@ class Previewer:
         self.init_all_default_attributes()
         self.init_all_ui_elements_needed()
         self.setup_all_widgets_needed()
+        self.register_preview_widgets()
 
     def init_all_default_attributes(self):
         """Initializing some attributes before using in class methods"""
@@ -320,6 +326,7 @@ class Previewer:
         self.slider_added = False
         self.buttons_layout_added = False
         self.current_vid_source = None
+        self.shown_second = None
 
         self.last_loaded_file = None
         self.text_file_prev = None
@@ -327,8 +334,20 @@ class Previewer:
 
         self.current_loaded_file = None
         self.new_pixmap = None
+        self.pool = PreviewPool()
         self.current_pixmap = None
         self.current_pixmap_id = None
+        self.animated_image = None
+
+        # Files are read and decoded in background, only the latest request is shown
+        self.preview_loader = PreviewLoader()
+        self.zoom_loader = PreviewLoader()
+        self.zoom_dialog = None
+        self.compare_loader = PreviewLoader()
+        self.compare_dialog = None
+        self.comparer = ImageComparer()
+        self.strip_loader = PreviewLoader()
+        self.media_strips = MediaStrips()
 
         self.ct = None
         self.sf = None
@@ -359,7 +378,17 @@ class Previewer:
         self.video_slider.setRange(0, 0)
         self.player.positionChanged.connect(self.update_slider_pos)
         self.player.durationChanged.connect(self.update_duration)
-        self.video_slider.sliderMoved.connect(self.seek)
+
+        # Player reports position many times per second, widgets are redrawn at a fixed rate.
+        # Dragging seeks once the slider stops for a moment and when it is released
+        self.position_updates = Coalescer(PLAYER_UI_INTERVAL_MS, self.show_position)
+        self.seeks = Debouncer(SEEK_DEBOUNCE_MS, self.seek)
+        self.video_slider.sliderMoved.connect(self.seeks.push)
+        self.video_slider.sliderReleased.connect(self.seeks.flush)
+
+        # Waveform or keyframes above the slider, made by ffmpeg in background
+        self.scrub_strip = ScrubStrip()
+        self.scrub_strip.position_picked.connect(self.seeks.push)
 
     def setup_all_widgets_needed(self):
         """Add all widgets to layouts"""
@@ -400,26 +429,44 @@ class Previewer:
             self.main_window.statusBar().showMessage("This file is already loaded")
             return
 
-        # Read converted data from doc-type files
-        self.read_convtd_data_from_doc_type_files(target_file=target_file)
+        # Read converted data from doc-type files in background
+        self.show_loading(target_file)
+        self.preview_loader.load(load_document, (target_file,),
+                                 partial(self.on_file_loaded, prev_title, prev_info, prev_label,
+                                         target_file),
+                                 self.on_preview_error)
+
+    # pylint: disable=too-many-positional-arguments
+    def on_file_loaded(self, prev_title, prev_info, prev_label, target_file, content):
+        """Show loaded doc-type file, runs in the GUI thread"""
+        self.hide_loading()
+        self.read_convtd_data_from_doc_type_files(target_file=target_file, content=content)
 
         # Show up the UI with loaded doc-type-file
-        # pylint: disable=too-many-positional-arguments
         self.show_ui_for_doc_type_files(prev_title=prev_title, prev_info=prev_info,
                                         prev_label=prev_label, content=self.convtd_file_content)
 
     # pylint: disable=too-many-positional-arguments
     def preview_picture(self, prev_title, prev_info, prev_label, curr_file, convert_file):
-        """Preview picture logic"""
-        # Give hash-id for current running picture
-        identifier = self.get_hashid_for_picture(
-            convert_file=convert_file, curr_file=curr_file)
-
+        """Preview picture logic, picture is decoded in background"""
         # Checking if exists
         if not curr_file or not Path(curr_file).exists():
             self.main_window.statusBar().showMessage("No file loaded")
             return
 
+        self.show_loading(curr_file)
+        self.preview_loader.load(load_picture, (convert_file, curr_file),
+                                 partial(self.on_picture_loaded, prev_title, prev_info, prev_label,
+                                         curr_file, convert_file),
+                                 self.on_preview_error)
+
+    # pylint: disable=too-many-positional-arguments
+    def on_picture_loaded(self, prev_title, prev_info, prev_label, curr_file, convert_file, loaded):
+        """Show decoded picture, runs in the GUI thread"""
+        self.hide_loading()
+        # Give hash-id for current running picture
+        identifier = self.get_hashid_for_picture(loaded)
+
         # Checking for duplicates
         if hasattr(self, 'current_pixmap_id') and self.current_pixmap_id == identifier:
             self.main_window.statusBar().showMessage("This image is already loaded")
@@ -433,6 +480,7 @@ class Previewer:
         # Set up the UI
         self.setup_ui_preview_picture(prev_title=prev_title, prev_info=prev_info,
                                       prev_label=prev_label, identifier=identifier, curr_file=curr_file)
+        self.setup_frame_slider(convert_file)
 
     def preview_video(self, prev_title, prev_info, prev_label, curr_file):
         """Preview video logic"""
@@ -462,13 +510,20 @@ class Previewer:
                 prev_info.hide()
                 prev_label.hide()
 
-                # Creating QVideoWidget if it wasn't created
-                if not hasattr(self, 'video_preview_widget'):
+                # Creating QVideoWidget once, it is reused for every next file
+                if self.video_preview_widget is None:
                     self.video_preview_widget = QVideoWidget(
                         prev_label.parent())
                     self.player.setVideoOutput(self.video_preview_widget)
                     parent_layout.addWidget(self.video_preview_widget)
 
+                # Checking to do not dublicate UI buttons
+                if not self.buttons_layout_added:
+                    parent_layout.addWidget(self.scrub_strip)
+                    parent_layout.addLayout(self.vid_prev_buttons_layout)
+                    self.buttons_layout_added = True
+                self.pool.activate('video')
+
                 # Check file to play
                 file_to_play = self.check_file_to_play(curr_file=curr_file)
 
@@ -483,11 +538,7 @@ class Previewer:
 
                 # Trying to set output video/audio file for video/audio player
                 self.set_up_video_audio_output(file_to_play=file_to_play)
-
-                # Checking to do not dublicate UI buttons
-                if not self.buttons_layout_added:
-                    parent_layout.addLayout(self.vid_prev_buttons_layout)
-                    self.buttons_layout_added = True
+                self.load_media_strip(file_to_play)
 
             except (AttributeError, RuntimeError, TypeError, ValueError, OSError) as e:
                 self.main_window.statusBar().showMessage(f"Error: {str(e)}")
@@ -499,6 +550,25 @@ class Previewer:
 
     # Support methods for preview_video
 
+    def load_media_strip(self, file_to_play):
+        """Waveform or thumbnail strip is made in background, player is usable meanwhile"""
+        self.scrub_strip.clear_strip()
+        # ffmpeg of the superseded strip is killed
+        self.cancel_media_strip()
+        if not ffmpeg_available():
+            return
+        self.strip_loader.load(load_media_strip, (self.media_strips, file_to_play),
+                               self.scrub_strip.set_strip, self.on_strip_error)
+
+    def cancel_media_strip(self):
+        """Drop the strip being loaded and kill its ffmpeg"""
+        self.strip_loader.cancel()
+        self.media_strips.cancel()
+
+    def on_strip_error(self, message):
+        """Strip failed, the player still works without it"""
+        self.main_window.statusBar().showMessage(f"Failed to load media strip: {message}")
+
     def play_vid(self):
         """Play video method"""
         self.player.play()
@@ -508,9 +578,21 @@ class Previewer:
         self.player.pause()
 
     def update_slider_pos(self, position):
-        """Update slider postion method"""
-        self.video_slider.setValue(position)
-        self.current_vid_time.setText(self.format_time(position))
+        """Update slider postion method, only the latest position is shown on the next tick"""
+        INSTRUMENTS.count('player.position')
+        self.position_updates.push(position)
+
+    def show_position(self, position):
+        """Move slider and strip, time label is changed only when the second changes"""
+        with INSTRUMENTS.timed('player.show_position'):
+            # Slider under the mouse belongs to the user
+            if not self.video_slider.isSliderDown():
+                self.video_slider.setValue(position)
+            self.scrub_strip.set_position(position)
+            second = position // 1000
+            if second != self.shown_second:
+                self.shown_second = second
+                self.current_vid_time.setText(self.format_time(position))
 
     def update_duration(self, duration):
         """Update duration method"""
@@ -520,10 +602,12 @@ class Previewer:
                 "Error while getting duration of the video")
             return
         self.video_slider.setRange(0, duration)
+        self.scrub_strip.set_duration(duration)
         self.total_vid_time.setText(self.format_time(duration))
 
     def seek(self, position):
         """Seek postion method"""
+        INSTRUMENTS.count('player.seek')
         if not isinstance(position, (int, float)) or position < 0:
             position = 0
         self.player.setPosition(position)
@@ -537,42 +621,61 @@ class Previewer:
         seconds = seconds % 60
         return f"{minutes:02d}:{seconds:02d}"
 
-    # pylint: disable=inconsistent-return-statements
     def clear_vid_preview(self):
-        """Clear preview title, widgets, layouts"""
-        video_preview_widgets = [self.video_preview_widget, self.video_slider, self.play_btn,
-                                self.pause_btn, self.current_vid_time, self.total_vid_time, self.vid_slider_layout]
+        """Stop the player and hide its widgets, player and widgets are kept for the next file"""
+        self.pool.release('video')
+
+    # Pooled preview widgets
+
+    def register_preview_widgets(self):
+        """Widgets of every preview kind, only one kind is shown"""
+        self.pool.register('text', lambda: [self.text_file_prev], self.reset_text_preview)
+        self.pool.register('image', lambda: [self.convert_tab.preview_label], self.reset_image_preview)
+        self.pool.register('video', self.video_widgets, self.reset_video_preview)
+
+    def video_widgets(self):
+        """Player widgets, strip is shown by itself when it is loaded"""
+        return [self.video_preview_widget, self.video_slider, self.play_btn, self.pause_btn,
+                self.current_vid_time, self.total_vid_time]
+
+    def reset_text_preview(self):
+        """Text is dropped, the same file is read again next time"""
+        if self.text_file_prev is not None:
+            self.text_file_prev.clear()
+        self.convtd_file_content = None
+        self.last_loaded_file = None
 
+    def reset_image_preview(self):
+        """Pixmap is dropped, the same image is shown again next time"""
+        self.convert_tab.preview_label.clear()
+        self.convert_tab.frame_slider.hide()
+        self.current_pixmap = None
+        self.current_pixmap_id = None
+        self.animated_image = None
+
+    def reset_video_preview(self):
+        """Player is stopped and emptied, its outputs and signals stay connected"""
+        self.cancel_media_strip()
+        self.scrub_strip.clear_strip()
+        self.position_updates.cancel()
+        self.seeks.cancel()
         self.player.stop()
-        self.player.setVideoOutput(None)
-        self.player.setAudioOutput(None)
         self.player.setSource(QUrl())
-
-        try:
-            self.player.positionChanged.disconnect()
-            self.player.durationChanged.disconnect()
-        except (TypeError, RuntimeError):
-            return None
-
-        for elem in video_preview_widgets:
-            if elem:
-                elem.setParent(None)
-                elem.deleteLater()
-
-        for elem in video_preview_widgets:
-            elem = None
-
-        self.player.disconnect()
+        self.current_vid_source = None
+        self.shown_second = None
+        self.video_slider.setRange(0, 0)
+        self.current_vid_time.setText(self.format_time(0))
+        self.total_vid_time.setText(self.format_time(0))
 
     # Help funcs for preview_file method
     # pylint: disable=broad-exception-caught
     # pylint: disable=inconsistent-return-statements
     # pylint: disable=useless-return
-    def read_convtd_data_from_doc_type_files(self, target_file):
-        """Reading converted data from doc-type files"""
+    def read_convtd_data_from_doc_type_files(self, target_file, content=None):
+        """Reading converted data from doc-type files, content loaded in background is only set"""
         try:
-            with open(target_file, 'r', encoding='utf-8') as file:
-                self.convtd_file_content = file.read()
+            # Large files are mapped and only first lines are shown
+            self.convtd_file_content = load_document(target_file) if content is None else content
             self.main_window.statusBar().showMessage(
                 f"Got content from: {target_file}")
             self.last_loaded_file = target_file
@@ -595,32 +698,105 @@ class Previewer:
                 prev_info.hide()
                 prev_label.hide()
 
+            self.pool.activate('text')
             self.text_file_prev.setPlainText(content)
-            self.text_file_prev.show()
 
         except (AttributeError, RuntimeError, ValueError) as e:
             self.main_window.statusBar().showMessage(
                 f"Failed to load file: {str(e)}")
             return None
 
-    def get_hashid_for_picture(self, convert_file, curr_file):
-        """Help method for preview_picture"""
-        if convert_file:
-            self.new_pixmap = self.pil_to_pixmap(convert_file)
-            identifier = f"Converted_{hash(convert_file.tobytes())}"
-        elif curr_file:
-            self.new_pixmap = QPixmap(curr_file)
-            identifier = curr_file
-            return identifier
-        else:
-            self.main_window.statusBar().showMessage("No file loaded")
-            return None
+    def get_hashid_for_picture(self, loaded):
+        """Help method for preview_picture, pixmap is made from the image decoded by load_picture"""
+        identifier, image = loaded
+        self.new_pixmap = QPixmap.fromImage(image)
+        return identifier
+
+    def show_loading(self, target_file):
+        """Placeholder while preview is loaded, current preview stays visible"""
+        self.convert_tab.loading_bar.show()
+        self.main_window.statusBar().showMessage(f"Loading preview: {target_file}")
+
+    def hide_loading(self):
+        """Hide placeholder"""
+        self.convert_tab.loading_bar.hide()
+
+    def on_preview_error(self, message):
+        """Loading failed, runs in the GUI thread"""
+        self.hide_loading()
+        self.main_window.statusBar().showMessage(f"Failed to load preview: {message}")
+
+    def open_zoom_view(self):
+        """Zoom button logic, image pyramid is made in background"""
+        curr_file = self.side_funcs.current_file
+        if not curr_file or self.side_funcs.extension_format not in SUPPORTED_CONVERT_EXTENSIONS_PICTURES:
+            self.main_window.statusBar().showMessage("Upload image first")
+            return
+
+        convert_file = self.converter.converted_output_image
+        title = "converted image" if convert_file else curr_file
+        self.show_loading(title)
+        self.zoom_loader.load(load_pyramid, (convert_file, curr_file, self.convert_tab.frame_slider.value()),
+                              partial(self.show_zoom_view, title), self.on_preview_error)
+
+    def show_zoom_view(self, title, pyramid):
+        """Open viewer window, runs in the GUI thread"""
+        self.hide_loading()
+        if self.zoom_dialog:
+            self.zoom_dialog.close()
+        self.zoom_dialog = ImageViewerDialog(pyramid, title, self.main_window)
+        self.zoom_dialog.show()
+        width, height = pyramid.size
+        self.main_window.statusBar().showMessage(f"Zoom: {width}x{height}, {pyramid.levels} levels")
+
+    def open_compare_view(self):
+        """Compare button logic, metrics are measured in background"""
+        curr_file = self.side_funcs.current_file
+        converted = self.converter.converted_output_image
+        if not curr_file or self.side_funcs.extension_format not in SUPPORTED_CONVERT_EXTENSIONS_PICTURES:
+            self.main_window.statusBar().showMessage("Upload image first")
+            return
+        if converted is None:
+            self.main_window.statusBar().showMessage("Convert image first")
+            return
+        if not isinstance(converted, Image.Image):
+            self.main_window.statusBar().showMessage("Compare works with still images")
+            return
+
+        file_converter = self.converter.file_converter
+        real_format = self.converter.converted_output_image_format
+        max_bytes = file_converter.max_image_bytes if file_converter.uses_target_size(converted, real_format) else None
+        self.show_loading("comparison")
+        self.compare_loader.load(self.comparer.compare,
+                                 (curr_file, converted, real_format,
+                                  file_converter.image_save_options(real_format), max_bytes),
+                                 partial(self.show_compare_view, Path(curr_file).name), self.on_preview_error)
+
+    def show_compare_view(self, title, comparison):
+        """Open compare window, runs in the GUI thread"""
+        self.hide_loading()
+        if self.compare_dialog:
+            self.compare_dialog.close()
+        self.compare_dialog = CompareDialog(comparison, title, self.main_window)
+        self.compare_dialog.show()
+        self.main_window.statusBar().showMessage(metrics_text(comparison))
+
+    def cancel_preview(self):
+        """Drop preview which is still loading, used on file switch and reset"""
+        if self.preview_loader.is_loading():
+            self.main_window.statusBar().showMessage("Preview loading cancelled")
+        self.preview_loader.cancel()
+        self.zoom_loader.cancel()
+        self.compare_loader.cancel()
+        self.cancel_media_strip()
+        self.hide_loading()
 
     # pylint: disable=too-many-positional-arguments
     def setup_ui_preview_picture(self, prev_title, prev_info, prev_label, identifier, curr_file):
         """Setting up the UI"""
         prev_title.hide()
         prev_info.hide()
+        self.pool.activate('image')
 
         prev_label.setPixmap(self.new_pixmap)
         prev_label.repaint()
@@ -632,14 +808,44 @@ class Previewer:
         self.main_window.statusBar().showMessage(
             f"Successfully loaded image: {msg}")
 
+    def setup_frame_slider(self, convert_file):
+        """Frame slider is shown only for converted animated images"""
+        slider = self.convert_tab.frame_slider
+        self.animated_image = convert_file if isinstance(convert_file, AnimatedImage) else None
+        if not self.animated_image:
+            slider.hide()
+            return
+
+        slider.blockSignals(True)
+        slider.setRange(0, self.animated_image.n_frames - 1)
+        slider.setValue(0)
+        slider.blockSignals(False)
+        slider.show()
+
+    def show_frame(self, index):
+        """Frame slider logic, only the chosen frame is decoded"""
+        if not self.animated_image:
+            return
+
+        try:
+            pixmap = self.pil_to_pixmap(self.animated_image.frame(index))
+        except (OSError, EOFError, ValueError) as e:
+            self.main_window.statusBar().showMessage(f"Can not load frame: {str(e)}")
+            return
+
+        self.convert_tab.preview_label.setPixmap(pixmap)
+        self.current_pixmap = pixmap
+        self.main_window.statusBar().showMessage(
+            f"Frame {index + 1} of {self.animated_image.n_frames}")
+
     def pil_to_pixmap(self, pil_img):
         """Convert image to QPixmap object"""
         if not isinstance(pil_img, Image.Image):
             raise TypeError(
                 f"Expected PIL.Image object, got {type(pil_img).__name__}")
 
-        if pil_img.mode != 'RGBA':
-            pil_img = pil_img.convert('RGBA')
+        # L, P and 16-bit images are shown as they are, transparent palette needs RGBA
+        pil_img = prepare_image(pil_img, PREVIEW_MODES, palette_alpha=False)
 
         qt_image = ImageQt(pil_img)
         pixmap = QPixmap.fromImage(qt_image)
@@ -719,10 +925,11 @@ class SideMethods():
         """Automaticly get extension format"""
         self.main_window.statusBar().showMessage("get ext format func started")
 
+        ext = None
         try:
-            ext = os.path.splitext(inpt_f)[1].lower()
-            if not ext:
-                ext = "no extension"
+            name_ext = FileConverter.detect_extension(inpt_f)
+            # Content is checked too, mislabelled files are routed by real format
+            ext = self.converter.file_converter.detect_format(inpt_f)
             self.extension_format = ext
             self.convert_tab.format_field.setText(ext)
         except (AttributeError, TypeError, ValueError) as e:
@@ -730,7 +937,11 @@ class SideMethods():
             return ext
 
         self.convert_tab.format_field.setText(self.extension_format)
-        self.main_window.statusBar().showMessage("Successfully got format")
+        if ext != name_ext:
+            self.main_window.statusBar().showMessage(
+                f"File content is {ext}, not {name_ext}")
+        else:
+            self.main_window.statusBar().showMessage("Successfully got format")
         return self.extension_format
 
     def get_output_file_format_list(self):
@@ -740,15 +951,15 @@ class SideMethods():
         ext_format = self.extension_format
 
         sce_pictures_copy = SUPPORTED_CONVERT_EXTENSIONS_PICTURES.copy()
-        sce_files_copy = SUPPORTED_CONVERT_EXTENSIONS_FILES.copy()
         sce_videos_copy = SUPPORTED_CONVERT_EXTENSIONS_VIDEO_AUDIO.copy()
 
         if ext_format in SUPPORTED_CONVERT_EXTENSIONS_PICTURES:
             sce_pictures_copy.remove(ext_format)
             return sce_pictures_copy
         if ext_format in SUPPORTED_CONVERT_EXTENSIONS_FILES and ext_format != '.txt':
-            sce_files_copy.remove(ext_format)
-            return sce_files_copy
+            # Without pyarrow parquet/arrow targets are not offered
+            return [ext for ext in SUPPORTED_CONVERT_EXTENSIONS_FILES
+                    if self.converter.file_converter.can_convert(ext_format, ext)]
         if ext_format in SUPPORTED_CONVERT_EXTENSIONS_VIDEO_AUDIO:
             sce_videos_copy.remove(ext_format)
             return sce_videos_copy
@@ -760,6 +971,44 @@ class SideMethods():
         else:
             return [str(ext_format)]
 
+    def update_effort_box(self, target_format):
+        """Show encoder speed/effort of the chosen output format"""
+        box = self.convert_tab.effort_box
+        real_format = PIC_EXTENSION_MAP.get(target_format.lstrip('.').upper())
+        option = IMAGE_EFFORT_OPTIONS.get(real_format)
+        if not option:
+            box.setEnabled(False)
+            return
+
+        name, low, high, default = option
+        box.blockSignals(True)
+        box.setRange(low, high)
+        # Effort of the profile until it is changed by user
+        box.setValue(self.converter.file_converter.image_save_options(real_format).get(name, default))
+        box.blockSignals(False)
+        box.setToolTip(f"{real_format} encoder {name}: {low}-{high}")
+        box.setEnabled(True)
+
+    def set_image_effort(self, value):
+        """Effort box logic, value is used for the chosen output format"""
+        target_format = self.convert_tab.drop_down_list.currentText()
+        real_format = PIC_EXTENSION_MAP.get(target_format.lstrip('.').upper())
+        if real_format in IMAGE_EFFORT_OPTIONS:
+            self.converter.file_converter.image_effort[real_format] = value
+
+    def set_max_image_size(self, kilobytes):
+        """Max size box logic, 0 turns the target size off"""
+        self.converter.file_converter.max_image_bytes = kilobytes * 1024 or None
+
+    def set_image_profile(self, profile):
+        """Profile box logic, effort values chosen before are reset to the profile"""
+        file_converter = self.converter.file_converter
+        file_converter.image_profile = profile
+        file_converter.image_effort.clear()
+        save_image_profile(profile)
+        self.update_effort_box(self.convert_tab.drop_down_list.currentText())
+        self.main_window.statusBar().showMessage(f"Image profile: {profile}")
+
     # pylint: disable=broad-exception-caught
     def upload_inpt_file(self):
         """Upload button logic"""
@@ -769,7 +1018,9 @@ class SideMethods():
         try:
             file, _ = QFileDialog.getOpenFileName(
                 self.main_window, "Select File", "", ("Files "
-                                "(*.txt *.mp3 *.mp4 *.docx *.jpg *.jpeg *.png *.webp *.json *.csv *.wav)"))
+                                "(*.txt *.mp3 *.mp4 *.docx *.jpg *.jpeg *.png *.webp *.gif *.tiff *.avif *.jxl "
+                                "*.json *.csv *.wav "
+                                "*.gz *.bz2 *.xz *.zst)"))
         except Exception as e:
             self.main_window.statusBar().showMessage(str(e))
 
@@ -777,6 +1028,12 @@ class SideMethods():
             self.main_window.statusBar().showMessage("File is not choosen")
             return
 
+        self.open_file(file)
+
+    def open_file(self, file):
+        """Make file the current file, used by upload, drop and the queue list"""
+        # Preview of the previous file is not needed anymore
+        self.previewer.cancel_preview()
         self.current_file = file
         self.get_extension_format(file)
 
@@ -784,6 +1041,45 @@ class SideMethods():
         self.convert_tab.drop_down_list.clear()
         self.convert_tab.drop_down_list.addItems(formats)
 
+    def enqueue_files(self, paths):
+        """Dropped files and folders are scanned in background, one dropped file is opened"""
+        if not paths:
+            self.main_window.statusBar().showMessage("Only local files can be dropped")
+            return
+        if len(paths) == 1 and Path(paths[0]).is_file():
+            self.open_file(paths[0])
+        self.convert_tab.ingest.enqueue(paths)
+        self.main_window.statusBar().showMessage("Scanning dropped files...")
+
+    def on_files_scanned(self, infos):
+        """Batch of scanned files is added to the queue list"""
+        self.convert_tab.queue_model.add_batch(infos)
+        self.convert_tab.queue_view.show()
+        self.convert_tab.clear_queue_btn.show()
+        self.main_window.statusBar().showMessage(
+            f"Scanning dropped files: {self.convert_tab.queue_model.rowCount()} queued")
+
+    def on_scan_finished(self, found):
+        """All dropped files are scanned"""
+        if not found:
+            self.main_window.statusBar().showMessage("No supported files dropped")
+            return
+        self.main_window.statusBar().showMessage(f"Queued {found} files")
+
+    def open_queued_file(self, index):
+        """Double click on the queue list opens the file"""
+        info = index.data(Qt.ItemDataRole.UserRole)
+        self.open_file(info.path)
+        self.main_window.statusBar().showMessage(f"Opened: {info.path}")
+
+    def clear_queue(self):
+        """Clear queue button logic"""
+        self.convert_tab.ingest.clear()
+        self.convert_tab.queue_model.clear()
+        self.convert_tab.queue_view.hide()
+        self.convert_tab.clear_queue_btn.hide()
+        self.main_window.statusBar().showMessage("Queue cleared")
+
     def clear_all_fields(self):
         """Clear button logic"""
         self.main_window.statusBar().showMessage("Clear all clicked")
@@ -806,6 +1102,8 @@ class SideMethods():
             cleared = True
 
         if cleared:
+            # Pooled previews of every kind are emptied, widgets are kept
+            p.pool.release_all()
             self.main_window.statusBar().showMessage("Successfully cleared")
         else:
             self.main_window.statusBar().showMessage("Nothing to clear")
@@ -817,6 +1115,7 @@ class SideMethods():
     def reset_current_file(self):
         """Delete current file"""
         try:
+            self.previewer.cancel_preview()
             self.current_file = None
             self.convert_tab.format_field.setText("No file loaded")
             self.convert_tab.preview_label.clear()
@@ -839,6 +1138,8 @@ class SideMethods():
             self.previewer.current_pixmap_id = None
             self.convert_tab.preview_label.setPixmap(QPixmap())
             self.convert_tab.preview_label.clear()
+            self.convert_tab.frame_slider.hide()
+            self.previewer.animated_image = None
             self.convert_tab.preview_label.repaint()
         except (AttributeError, RuntimeError):
             self.main_window.statusBar().showMessage("Error during clearing image preview")
@@ -880,6 +1181,7 @@ class SideMethods():
                 "Error happened during saving output file")
             return None
 
+    # pylint: disable=too-many-return-statements
     def _convert_files(self, inp_file, outpt_format):
         """Main convert files logic"""
         self.main_window.statusBar().showMessage("Convert files initialized")
@@ -907,6 +1209,12 @@ class SideMethods():
             if file_ext == "json" and out_file_ext == "txt":
                 self.converter.convert_json_txt(inp=inp_file)
                 return None
+            # Parquet/arrow and json lines pairs
+            if self.converter.file_converter.can_convert(f".{file_ext}", f".{out_file_ext}"):
+                self.converter.convert_tabular(inp=inp_file, out_ext=f".{out_file_ext}")
+                return None
+            self.main_window.statusBar().showMessage(
+                f"Convertation .{file_ext} -> .{out_file_ext} is not supported")
 
         # pylint: disable=no-else-return
         else:
@@ -0,0 +1,133 @@
+"""Viewer - zoomable and pannable view of large images for pixel inspection.
+Only tiles under the viewport are on the scene, they are taken from
+TilePyramid at the level matching the zoom, so memory does not grow with
+the image size"""
+
+from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtGui import QPixmap, QPainter
+from PyQt6.QtWidgets import QGraphicsView, QGraphicsScene, QDialog, QVBoxLayout, QLabel
+
+from ui.constants import VIEWER_MAX_ZOOM
+from ui.previews import to_qimage
+
+
+class TiledImageView(QGraphicsView):
+    """QGraphicsView of TilePyramid, mouse wheel zooms, drag pans"""
+    pixel_hovered = pyqtSignal(int, int)
+
+    def __init__(self, pyramid, parent=None):
+        super().__init__(parent)
+        self.pyramid = pyramid
+        self.items = {}
+        self.level = None
+
+        self.setScene(QGraphicsScene(self))
+        self.scene().setSceneRect(0, 0, *pyramid.size)
+        self.setDragMode(QGraphicsView.DragMode.ScrollHandDrag)
+        self.setTransformationAnchor(QGraphicsView.ViewportAnchor.AnchorUnderMouse)
+        self.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, False)
+        self.setBackgroundBrush(Qt.GlobalColor.darkGray)
+        self.setMouseTracking(True)
+
+        self.horizontalScrollBar().valueChanged.connect(self.update_tiles)
+        self.verticalScrollBar().valueChanged.connect(self.update_tiles)
+
+    def scale_factor(self):
+        """Screen pixels per image pixel"""
+        return self.transform().m11()
+
+    def fit(self):
+        """Show the whole image"""
+        self.fitInView(self.scene().sceneRect(), Qt.AspectRatioMode.KeepAspectRatio)
+        self.update_tiles()
+
+    def zoom(self, factor):
+        """Zoom around the mouse, from the whole image up to VIEWER_MAX_ZOOM"""
+        viewport = self.viewport().rect()
+        width, height = self.pyramid.size
+        lowest = min(viewport.width() / width, viewport.height() / height, 1)
+        new_scale = min(max(self.scale_factor() * factor, lowest), VIEWER_MAX_ZOOM)
+        self.scale(new_scale / self.scale_factor(), new_scale / self.scale_factor())
+        self.update_tiles()
+
+    def wheelEvent(self, event):  # pylint: disable=invalid-name
+        """Every wheel step zooms by 25 %"""
+        self.zoom(1.25 ** (event.angleDelta().y() / 120))
+
+    def keyPressEvent(self, event):  # pylint: disable=invalid-name
+        """0 fits the image, 1 shows it pixel to pixel"""
+        if event.key() == Qt.Key.Key_0:
+            self.fit()
+        elif event.key() == Qt.Key.Key_1:
+            self.zoom(1 / self.scale_factor())
+        else:
+            super().keyPressEvent(event)
+
+    def mouseMoveEvent(self, event):  # pylint: disable=invalid-name
+        """Report the image pixel under the mouse"""
+        point = self.mapToScene(event.position().toPoint())
+        self.pixel_hovered.emit(int(point.x()), int(point.y()))
+        super().mouseMoveEvent(event)
+
+    def resizeEvent(self, event):  # pylint: disable=invalid-name
+        """More tiles can be visible after resize"""
+        super().resizeEvent(event)
+        self.update_tiles()
+
+    def visible_tiles(self, level):
+        """Keys of the level tiles under the viewport"""
+        side = self.pyramid.tile_size * 2 ** level
+        area = self.mapToScene(self.viewport().rect()).boundingRect()
+        cols, rows = self.pyramid.grid(level)
+        first_col, first_row = max(int(area.left() // side), 0), max(int(area.top() // side), 0)
+        last_col = min(int(area.right() // side), cols - 1)
+        last_row = min(int(area.bottom() // side), rows - 1)
+        return {(level, col, row) for col in range(first_col, last_col + 1)
+                for row in range(first_row, last_row + 1)}
+
+    def update_tiles(self):
+        """Put visible tiles of the current level on the scene and remove the others"""
+        self.level = self.pyramid.level_for_scale(self.scale_factor())
+        needed = self.visible_tiles(self.level)
+
+        for key in set(self.items) - needed:
+            self.scene().removeItem(self.items.pop(key))
+
+        for key in needed - set(self.items):
+            level, col, row = key
+            item = self.scene().addPixmap(QPixmap.fromImage(to_qimage(self.pyramid.tile(*key))))
+            factor = 2 ** level
+            item.setPos(col * self.pyramid.tile_size * factor, row * self.pyramid.tile_size * factor)
+            item.setScale(factor)
+            # Pixels are shown as squares at high zoom
+            item.setTransformationMode(Qt.TransformationMode.FastTransformation)
+            self.items[key] = item
+
+
+class ImageViewerDialog(QDialog):
+    """Window with the tiled view and value of the pixel under the mouse"""
+
+    def __init__(self, pyramid, title, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"Zoom - {title}")
+        self.resize(900, 700)
+
+        self.view = TiledImageView(pyramid, self)
+        self.info = QLabel("Wheel - zoom, drag - move, 0 - fit, 1 - 100 %")
+        self.view.pixel_hovered.connect(self.show_pixel)
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.view)
+        layout.addWidget(self.info)
+        self.setLayout(layout)
+
+    def showEvent(self, event):  # pylint: disable=invalid-name
+        """Whole image is shown first"""
+        super().showEvent(event)
+        self.view.fit()
+
+    def show_pixel(self, x, y):
+        """Pixel coordinates and value"""
+        value = self.view.pyramid.pixel(x, y)
+        if value is not None:
+            self.info.setText(f"x: {x}  y: {y}  value: {value}  zoom: {self.view.scale_factor():.2f}x")
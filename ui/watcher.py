@@ -0,0 +1,204 @@
+"""Watcher - hot folder, files dropped into input folder are converted automatically"""
+
+import os
+from pathlib import Path
+
+from PyQt6.QtCore import QObject, QFileSystemWatcher, QTimer, QThreadPool, pyqtSignal
+
+from ui.workers import Worker
+from ui.constants import HOT_FOLDER_DEBOUNCE_MS, HOT_FOLDER_IGNORED_SUFFIXES
+
+
+class HotFolderWatcher(QObject):
+    """Watch FolderSync source folder and sync changed files.
+
+    Only the folder reported by QFileSystemWatcher is listed on every event.
+    New files are converted when their size and mtime did not change
+    between two checks, so files which are still being written are skipped"""
+
+    synced = pyqtSignal(object)
+    error = pyqtSignal(str)
+    stopped = pyqtSignal()
+
+    def __init__(self, folder_sync, debounce_ms=HOT_FOLDER_DEBOUNCE_MS, parent=None):
+        super().__init__(parent)
+        self.folder_sync = folder_sync
+        self.source_dir = folder_sync.source_dir
+        self.output_dir = folder_sync.output_dir
+
+        # Values by default
+        self.snapshots = {}
+        self.dirty_dirs = set()
+        self.pending = {}
+        self.ready = set()
+        self.removed = set()
+        self.worker = None
+        self.started = False
+
+        self.fs_watcher = QFileSystemWatcher(self)
+        self.fs_watcher.directoryChanged.connect(self.on_directory_changed)
+
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(debounce_ms)
+        self.debounce_timer.timeout.connect(self.process_changes)
+
+    def start(self):
+        """Watch all folders and sync files existing before start"""
+        self.watch_dir(self.source_dir)
+        self.started = True
+        self.submit(full_sync=True)
+
+    def stop(self):
+        """Stop watching. Running sync is not interrupted,
+        stopped is emitted when it is finished"""
+        self.debounce_timer.stop()
+        watched = self.fs_watcher.directories()
+        if watched:
+            self.fs_watcher.removePaths(watched)
+        self.snapshots.clear()
+        self.dirty_dirs.clear()
+        self.pending.clear()
+        self.ready.clear()
+        self.removed.clear()
+        self.started = False
+        if not self.worker:
+            self.stopped.emit()
+
+    def is_ignored(self, name):
+        """Hidden and partially downloaded files are ignored"""
+        return name.startswith('.') or name.lower().endswith(HOT_FOLDER_IGNORED_SUFFIXES)
+
+    def list_dir(self, directory):
+        """Get {name: (size, mtime_ns)} of files in directory, subfolders are watched"""
+        files = {}
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        path = Path(entry.path)
+                        if path != self.output_dir and entry.path not in self.snapshots:
+                            self.watch_dir(path)
+                    elif entry.is_file() and not self.is_ignored(entry.name):
+                        stat = entry.stat()
+                        files[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            pass
+        return files
+
+    def watch_dir(self, directory):
+        """Add folder with all subfolders to QFileSystemWatcher.
+        Files of folders which appear after start are converted too"""
+        directory = str(directory)
+        self.fs_watcher.addPath(directory)
+        self.snapshots[directory] = {}
+        files = self.list_dir(directory)
+        self.snapshots[directory] = files
+
+        if self.started:
+            for name, state in files.items():
+                self.pending[self.relative(directory, name)] = state
+
+    def on_directory_changed(self, directory):
+        """Mark folder as changed and start debounce timer.
+        Running timer is not restarted, so files arriving all the time
+        are still checked once per interval"""
+        self.dirty_dirs.add(directory)
+        if not self.debounce_timer.isActive():
+            self.debounce_timer.start()
+
+    def relative(self, directory, name):
+        """Path relative to source folder"""
+        return (Path(directory) / name).relative_to(self.source_dir).as_posix()
+
+    def process_changes(self):
+        """List changed folders, check pending files and submit stable ones"""
+        dirty_dirs, self.dirty_dirs = self.dirty_dirs, set()
+        checked = dict(self.pending)
+
+        for directory in dirty_dirs:
+            if directory not in self.snapshots:
+                continue
+            if not os.path.isdir(directory):
+                self.forget_dir(directory)
+                continue
+
+            old_files = self.snapshots[directory]
+            new_files = self.list_dir(directory)
+            self.snapshots[directory] = new_files
+
+            for name, state in new_files.items():
+                if old_files.get(name) != state:
+                    self.pending[self.relative(directory, name)] = state
+            for name in old_files.keys() - new_files.keys():
+                rel = self.relative(directory, name)
+                self.pending.pop(rel, None)
+                self.removed.add(rel)
+
+        self.check_pending(checked)
+        if self.ready or self.removed:
+            self.submit()
+
+    def check_pending(self, checked):
+        """Move files with the same size and mtime as on previous check to ready.
+        checked - pending files before this round, new ones wait for the next check"""
+        for rel, state in checked.items():
+            if self.pending.get(rel) != state:
+                continue
+            try:
+                stat = (self.source_dir / rel).stat()
+            except FileNotFoundError:
+                del self.pending[rel]
+                continue
+
+            new_state = (stat.st_size, stat.st_mtime_ns)
+            if new_state == state:
+                del self.pending[rel]
+                self.ready.add(rel)
+            else:
+                self.pending[rel] = new_state
+
+        # Files are still being written, check them again later
+        if self.pending:
+            self.debounce_timer.start()
+
+    def forget_dir(self, directory):
+        """Folder was removed, outputs of its files are removed too"""
+        prefix = directory.rstrip(os.sep) + os.sep
+        for watched in [d for d in self.snapshots if d == directory or d.startswith(prefix)]:
+            for name in self.snapshots.pop(watched):
+                self.removed.add(self.relative(watched, name))
+            self.fs_watcher.removePath(watched)
+
+    def submit(self, full_sync=False):
+        """Sync ready files in QThreadPool, one sync at a time"""
+        if self.worker or not self.started:
+            return
+
+        if full_sync:
+            self.worker = Worker(self.folder_sync.run)
+        else:
+            ready, self.ready = sorted(self.ready), set()
+            removed, self.removed = sorted(self.removed), set()
+            self.worker = Worker(self.folder_sync.sync_paths, ready, removed)
+
+        self.worker.signals.finished.connect(self.on_sync_finished)
+        self.worker.signals.error.connect(self.on_sync_error)
+        QThreadPool.globalInstance().start(self.worker)
+
+    def on_sync_finished(self, summary):
+        """Sync is finished, files collected while it was running are synced next"""
+        self.worker = None
+        self.synced.emit(summary)
+        if not self.started:
+            self.stopped.emit()
+            return
+        if self.ready or self.removed:
+            self.submit()
+
+    def on_sync_error(self, error):
+        """Sync failed"""
+        self.worker = None
+        self.error.emit(error)
+        if not self.started:
+            self.stopped.emit()
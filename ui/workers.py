@@ -0,0 +1,89 @@
+"""Workers - running long tasks outside of the GUI thread"""
+
+from functools import partial, lru_cache
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QCoreApplication, pyqtSignal
+
+from ui.constants import PREVIEW_POOL_THREADS
+
+
+# pylint: disable=too-few-public-methods
+class WorkerSignals(QObject):
+    """Signals of Worker, delivered to the GUI thread"""
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+
+class Worker(QRunnable):
+    """Run fn(*args, **kwargs) in QThreadPool and emit result or error"""
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        # Worker cancelled while it is queued does not call fn
+        self.cancelled = False
+
+    # pylint: disable=broad-exception-caught
+    def run(self):
+        """Runs in a pool thread"""
+        if self.cancelled:
+            return
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.error.emit(str(e))
+            return
+        self.signals.finished.emit(result)
+
+
+@lru_cache(maxsize=None)
+def preview_pool():
+    """QThreadPool shared by preview loaders. Batch syncs, hot folder syncs and
+    scans of dropped files run in the global pool and can take all of its threads"""
+    pool = QThreadPool()
+    pool.setMaxThreadCount(PREVIEW_POOL_THREADS)
+    return pool
+
+
+class PreviewLoader():
+    """Run one loading at a time in the preview pool, only the latest result reaches the GUI.
+    Every load() or cancel() starts a new generation, results of older ones are dropped"""
+
+    def __init__(self, pool=None):
+        self.pool = pool or preview_pool()
+        self.generation = 0
+        self.worker = None
+
+    def load(self, fn, args, on_done, on_error):
+        """Start fn(*args), on_done(result) or on_error(message) run in the GUI thread"""
+        self.cancel()
+        self.worker = Worker(fn, *args)
+        self.worker.signals.finished.connect(partial(self.deliver, self.generation, on_done))
+        self.worker.signals.error.connect(partial(self.deliver, self.generation, on_error))
+        self.pool.start(self.worker)
+
+    def cancel(self):
+        """Drop the running loading, the queued one does not run at all"""
+        if self.worker is not None:
+            self.worker.cancelled = True
+            self.worker = None
+        self.generation += 1
+
+    def is_loading(self):
+        """Check if result is still awaited"""
+        return self.worker is not None
+
+    def deliver(self, generation, callback, value):
+        """Pass result of the current generation only"""
+        if generation != self.generation:
+            return
+        self.worker = None
+        callback(value)
+
+    def wait(self, msecs=-1):
+        """Wait for the pool and deliver queued results"""
+        self.pool.waitForDone(msecs)
+        QCoreApplication.processEvents()